@@ -10,20 +10,9 @@ from alembic import context
 # Ajouter le chemin de l'app pour les imports
 sys.path.append(os.path.dirname(os.path.abspath(__file__)) + "/..")
 
-# Import des modèles SQLModel
-from app.domain.entities.user import User
-from app.domain.entities.activity import Activity
-from app.domain.entities.workout_plan import WorkoutPlan
-from app.domain.entities.enrichment_queue import EnrichmentQueue
-from app.domain.entities.segment import Segment
-from app.domain.entities.segment_features import SegmentFeatures
-from app.domain.entities.activity_weather import ActivityWeather
-from app.domain.entities.user import GarminAuth
-from app.domain.entities.garmin_daily import GarminDaily
-from app.domain.entities.training_load import TrainingLoad
-from app.domain.entities.fit_metrics import FitMetrics
-from app.core.database import engine
-from sqlmodel import SQLModel
+# Tables SQLModel (peuple la metadata sans importer les services)
+from app.domain.entities._registry import metadata
+from app.core.settings import get_settings
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -35,13 +24,38 @@ if config.config_file_name is not None:
     fileConfig(config.config_file_name)
 
 # Utiliser les métadonnées SQLModel pour l'autogenerate
-target_metadata = SQLModel.metadata
+target_metadata = metadata
 
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
 # ... etc.
 
+# URL de la base, lue une seule fois par process
+_DATABASE_URL = get_settings().DATABASE_URL
+
+# Engine créé au premier passage en mode online, puis réutilisé dans le process
+_engine = None
+
+
+def _get_engine():
+    """Retourne l'engine de migration, construit une seule fois par process.
+
+    Le mode offline n'en a pas besoin : on évite ainsi l'initialisation du
+    dialecte quand on génère seulement du SQL. L'engine est dédié aux
+    migrations (NullPool) : la connexion est fermée dès la fin de la
+    transaction au lieu d'être retenue par le pool de l'application.
+    """
+    global _engine
+    if _engine is None:
+        _engine = engine_from_config(
+            config.get_section(config.config_ini_section, {}),
+            prefix="sqlalchemy.",
+            poolclass=pool.NullPool,
+            url=_DATABASE_URL,
+        )
+    return _engine
+
 
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode.
@@ -55,11 +69,8 @@ def run_migrations_offline() -> None:
     script output.
 
     """
-    from app.core.settings import get_settings
-    settings = get_settings()
-    url = settings.database_url
     context.configure(
-        url=url,
+        url=_DATABASE_URL,
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
@@ -76,10 +87,16 @@ def run_migrations_online() -> None:
     and associate a connection with the context.
 
     """
-    # Utiliser notre engine configuré au lieu de créer un nouveau
-    with engine.connect() as connection:
+    # Engine dédié aux migrations (URL issue des settings, pas de pool).
+    # Cache de compilation partagé par toute la chaîne de révisions ; pas de
+    # stream_results : les curseurs nommés psycopg2 sont refusés dans les
+    # autocommit_block() utilisés par les backfills.
+    with _get_engine().connect().execution_options(compiled_cache={}) as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection,
+            target_metadata=target_metadata,
+            # Une transaction par révision : pas de verrous tenus sur toute la chaîne
+            transaction_per_migration=True,
         )
 
         with context.begin_transaction():
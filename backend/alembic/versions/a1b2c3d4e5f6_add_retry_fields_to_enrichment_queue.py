@@ -19,7 +19,10 @@ depends_on: Union[str, Sequence[str], None] = None
 
 
 def upgrade() -> None:
+    # server_default uniquement pour remplir les lignes existantes, puis retiré :
+    # l'application fournit toujours max_attempts (EnrichmentQueue.max_attempts = 3)
     op.add_column('enrichment_queue', sa.Column('max_attempts', sa.Integer(), nullable=False, server_default='3'))
+    op.alter_column('enrichment_queue', 'max_attempts', server_default=None)
     op.add_column('enrichment_queue', sa.Column('next_retry_at', sa.DateTime(), nullable=True))
 
 
@@ -18,20 +18,53 @@ down_revision: Union[str, None] = 'e6a7b8c9d0f1'
 branch_labels: Union[str, Sequence[str], None] = None
 depends_on: Union[str, Sequence[str], None] = None
 
+# Taille des lots pour le backfill de activity.source
+BACKFILL_BATCH_SIZE = 5000
+
+
+def _backfill_source() -> None:
+    """Backfill activity.source par lots commités séparément.
+
+    Un seul UPDATE réécrirait toute la table dans une transaction (verrou long,
+    WAL massif). En mode offline (--sql) on émet l'UPDATE unique.
+    """
+    if op.get_context().as_sql:
+        op.execute("UPDATE activity SET source = 'strava' WHERE source IS NULL")
+        return
+
+    bind = op.get_bind()
+    with op.get_context().autocommit_block():
+        while True:
+            result = bind.execute(
+                sa.text(
+                    "UPDATE activity SET source = 'strava' "
+                    "WHERE id IN (SELECT id FROM activity WHERE source IS NULL LIMIT :batch_size)"
+                ),
+                {"batch_size": BACKFILL_BATCH_SIZE},
+            )
+            if result.rowcount == 0:
+                break
+
 
 def upgrade() -> None:
     # --- Ajout de source + garmin_activity_id a la table activity ---
     op.add_column('activity', sa.Column('source', sqlmodel.sql.sqltypes.AutoString(), nullable=True))
     op.add_column('activity', sa.Column('garmin_activity_id', sa.BigInteger(), nullable=True))
-    op.create_index(op.f('ix_activity_source'), 'activity', ['source'], unique=False)
-    op.create_index(op.f('ix_activity_garmin_activity_id'), 'activity', ['garmin_activity_id'], unique=True)
 
     # Backfill : toutes les activites existantes viennent de Strava
-    op.execute("UPDATE activity SET source = 'strava' WHERE source IS NULL")
+    _backfill_source()
 
     # Rendre source NOT NULL apres backfill
     op.alter_column('activity', 'source', nullable=False, server_default='strava')
 
+    # Index construits apres le backfill, sans bloquer les ecritures sur activity
+    # (CREATE INDEX CONCURRENTLY doit s'executer hors transaction)
+    with op.get_context().autocommit_block():
+        op.create_index(op.f('ix_activity_source'), 'activity', ['source'], unique=False,
+                        postgresql_concurrently=True)
+        op.create_index(op.f('ix_activity_garmin_activity_id'), 'activity', ['garmin_activity_id'], unique=True,
+                        postgresql_concurrently=True)
+
     # --- Creer la table fitmetrics ---
     op.create_table(
         'fitmetrics',
@@ -56,7 +89,10 @@ def upgrade() -> None:
 def downgrade() -> None:
     op.drop_index(op.f('ix_fitmetrics_activity_id'), table_name='fitmetrics')
     op.drop_table('fitmetrics')
-    op.drop_index(op.f('ix_activity_garmin_activity_id'), table_name='activity')
-    op.drop_index(op.f('ix_activity_source'), table_name='activity')
+    with op.get_context().autocommit_block():
+        op.drop_index(op.f('ix_activity_garmin_activity_id'), table_name='activity',
+                      postgresql_concurrently=True)
+        op.drop_index(op.f('ix_activity_source'), table_name='activity',
+                      postgresql_concurrently=True)
     op.drop_column('activity', 'garmin_activity_id')
     op.drop_column('activity', 'source')
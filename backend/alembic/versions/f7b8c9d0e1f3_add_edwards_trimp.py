@@ -1,7 +1,7 @@
 """add_edwards_trimp
 
-Revision ID: f7b8c9d0e1f2
-Revises: e6a7b8c9d0f1
+Revision ID: f7b8c9d0e1f3
+Revises: f7b8c9d0e1f2
 Create Date: 2026-02-09 00:00:00.000000
 
 """
@@ -12,8 +12,8 @@ import sqlalchemy as sa
 
 
 # revision identifiers, used by Alembic.
-revision: str = 'f7b8c9d0e1f2'
-down_revision: Union[str, None] = 'e6a7b8c9d0f1'
+revision: str = 'f7b8c9d0e1f3'
+down_revision: Union[str, None] = 'f7b8c9d0e1f2'
 branch_labels: Union[str, Sequence[str], None] = None
 depends_on: Union[str, Sequence[str], None] = None
 
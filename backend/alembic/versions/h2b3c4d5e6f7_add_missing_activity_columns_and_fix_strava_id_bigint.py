@@ -17,57 +17,102 @@ down_revision: Union[str, None] = 'g1a2b3c4d5e6'
 branch_labels: Union[str, Sequence[str], None] = None
 depends_on: Union[str, Sequence[str], None] = None
 
+# Taille des lots pour la recopie de strava_id
+BACKFILL_BATCH_SIZE = 10000
+
+COPY_STRAVA_ID_SQL = (
+    "UPDATE activity SET strava_id_new = strava_id "
+    "WHERE id IN (SELECT id FROM activity "
+    "WHERE strava_id IS NOT NULL AND strava_id_new IS NULL LIMIT :batch_size)"
+)
+
+
+def _swap_strava_id_to_bigint() -> None:
+    """Passe activity.strava_id en BIGINT sans réécrire la table sous verrou exclusif.
+
+    Add-backfill-swap : nouvelle colonne BIGINT, recopie par lots commités
+    séparément, index unique construit (CONCURRENTLY) sur la nouvelle colonne,
+    puis échange des colonnes et des index dans une seule transaction :
+    strava_id reste couvert par un index unique à tout instant.
+    """
+    op.add_column('activity', sa.Column('strava_id_new', sa.BigInteger(), nullable=True))
+
+    if op.get_context().as_sql:
+        op.execute("UPDATE activity SET strava_id_new = strava_id")
+    else:
+        bind = op.get_bind()
+        with op.get_context().autocommit_block():
+            while True:
+                result = bind.execute(sa.text(COPY_STRAVA_ID_SQL), {"batch_size": BACKFILL_BATCH_SIZE})
+                if result.rowcount == 0:
+                    break
+
+    # Les valeurs recopiées viennent d'une colonne déjà unique : la construction
+    # ne peut pas échouer sur un doublon
+    with op.get_context().autocommit_block():
+        op.create_index('ix_activity_strava_id_new', 'activity', ['strava_id_new'], unique=True,
+                        postgresql_concurrently=True)
+
+    # Swap : la table est verrouillée le temps du rattrapage des lignes écrites
+    # depuis le backfill, pour qu'aucune insertion ne s'intercale avant l'échange
+    op.execute("LOCK TABLE activity IN ACCESS EXCLUSIVE MODE")
+    op.execute("UPDATE activity SET strava_id_new = strava_id "
+               "WHERE strava_id IS NOT NULL AND strava_id_new IS NULL")
+    op.drop_index('ix_activity_strava_id', table_name='activity')
+    op.drop_column('activity', 'strava_id')
+    op.alter_column('activity', 'strava_id_new', new_column_name='strava_id')
+    op.execute("ALTER INDEX ix_activity_strava_id_new RENAME TO ix_activity_strava_id")
+
 
 def upgrade() -> None:
     # Fix strava_id: Integer → BigInteger
-    op.alter_column('activity', 'strava_id',
-                    existing_type=sa.Integer(),
-                    type_=sa.BigInteger(),
-                    existing_nullable=True)
+    _swap_strava_id_to_bigint()
 
-    # Métriques supplémentaires
-    op.add_column('activity', sa.Column('calories', sa.Float(), nullable=True))
-    op.add_column('activity', sa.Column('start_date_local', sa.DateTime(), nullable=True))
-    op.add_column('activity', sa.Column('workout_type', sa.Integer(), nullable=True))
-    op.add_column('activity', sa.Column('trainer', sa.Boolean(), nullable=True))
-    op.add_column('activity', sa.Column('commute', sa.Boolean(), nullable=True))
-    op.add_column('activity', sa.Column('manual', sa.Boolean(), nullable=True))
-    op.add_column('activity', sa.Column('suffer_score', sa.Integer(), nullable=True))
+    with op.batch_alter_table('activity') as batch_op:
+        # Métriques supplémentaires
+        batch_op.add_column(sa.Column('calories', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('start_date_local', sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column('workout_type', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('trainer', sa.Boolean(), nullable=True))
+        batch_op.add_column(sa.Column('commute', sa.Boolean(), nullable=True))
+        batch_op.add_column(sa.Column('manual', sa.Boolean(), nullable=True))
+        batch_op.add_column(sa.Column('suffer_score', sa.Integer(), nullable=True))
 
-    # Puissance
-    op.add_column('activity', sa.Column('average_watts', sa.Float(), nullable=True))
-    op.add_column('activity', sa.Column('max_watts', sa.Float(), nullable=True))
-    op.add_column('activity', sa.Column('weighted_average_watts', sa.Float(), nullable=True))
-    op.add_column('activity', sa.Column('kilojoules', sa.Float(), nullable=True))
+        # Puissance
+        batch_op.add_column(sa.Column('average_watts', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('max_watts', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('weighted_average_watts', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('kilojoules', sa.Float(), nullable=True))
 
-    # Données GPS
-    op.add_column('activity', sa.Column('start_latlng', sa.JSON(), nullable=True))
-    op.add_column('activity', sa.Column('end_latlng', sa.JSON(), nullable=True))
-    op.add_column('activity', sa.Column('summary_polyline', sa.Text(), nullable=True))
-    op.add_column('activity', sa.Column('polyline', sa.Text(), nullable=True))
+        # Données GPS
+        batch_op.add_column(sa.Column('start_latlng', sa.JSON(), nullable=True))
+        batch_op.add_column(sa.Column('end_latlng', sa.JSON(), nullable=True))
+        batch_op.add_column(sa.Column('summary_polyline', sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column('polyline', sa.Text(), nullable=True))
 
 
 def downgrade() -> None:
-    # Supprimer les colonnes GPS
-    op.drop_column('activity', 'polyline')
-    op.drop_column('activity', 'summary_polyline')
-    op.drop_column('activity', 'end_latlng')
-    op.drop_column('activity', 'start_latlng')
-
-    # Supprimer les colonnes puissance
-    op.drop_column('activity', 'kilojoules')
-    op.drop_column('activity', 'weighted_average_watts')
-    op.drop_column('activity', 'max_watts')
-    op.drop_column('activity', 'average_watts')
-
-    # Supprimer les métriques
-    op.drop_column('activity', 'suffer_score')
-    op.drop_column('activity', 'manual')
-    op.drop_column('activity', 'commute')
-    op.drop_column('activity', 'trainer')
-    op.drop_column('activity', 'workout_type')
-    op.drop_column('activity', 'start_date_local')
-    op.drop_column('activity', 'calories')
+    with op.batch_alter_table('activity') as batch_op:
+        # Supprimer les colonnes GPS
+        batch_op.drop_column('polyline')
+        batch_op.drop_column('summary_polyline')
+        batch_op.drop_column('end_latlng')
+        batch_op.drop_column('start_latlng')
+
+        # Supprimer les colonnes puissance
+        batch_op.drop_column('kilojoules')
+        batch_op.drop_column('weighted_average_watts')
+        batch_op.drop_column('max_watts')
+        batch_op.drop_column('average_watts')
+
+        # Supprimer les métriques
+        batch_op.drop_column('suffer_score')
+        batch_op.drop_column('manual')
+        batch_op.drop_column('commute')
+        batch_op.drop_column('trainer')
+        batch_op.drop_column('workout_type')
+        batch_op.drop_column('start_date_local')
+        batch_op.drop_column('calories')
 
     # Reverter strava_id BigInteger → Integer
     op.alter_column('activity', 'strava_id',
@@ -19,22 +19,24 @@ depends_on: Union[str, Sequence[str], None] = None
 
 
 def upgrade() -> None:
-    op.add_column('garmindaily', sa.Column('deep_sleep_seconds', sa.Integer(), nullable=True))
-    op.add_column('garmindaily', sa.Column('light_sleep_seconds', sa.Integer(), nullable=True))
-    op.add_column('garmindaily', sa.Column('rem_sleep_seconds', sa.Integer(), nullable=True))
-    op.add_column('garmindaily', sa.Column('awake_sleep_seconds', sa.Integer(), nullable=True))
-    op.add_column('garmindaily', sa.Column('sleep_start_time', sa.String(), nullable=True))
-    op.add_column('garmindaily', sa.Column('sleep_end_time', sa.String(), nullable=True))
-    op.add_column('garmindaily', sa.Column('average_respiration', sa.Float(), nullable=True))
-    op.add_column('garmindaily', sa.Column('avg_sleep_stress', sa.Float(), nullable=True))
+    with op.batch_alter_table('garmindaily') as batch_op:
+        batch_op.add_column(sa.Column('deep_sleep_seconds', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('light_sleep_seconds', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('rem_sleep_seconds', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('awake_sleep_seconds', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('sleep_start_time', sa.String(), nullable=True))
+        batch_op.add_column(sa.Column('sleep_end_time', sa.String(), nullable=True))
+        batch_op.add_column(sa.Column('average_respiration', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('avg_sleep_stress', sa.Float(), nullable=True))
 
 
 def downgrade() -> None:
-    op.drop_column('garmindaily', 'avg_sleep_stress')
-    op.drop_column('garmindaily', 'average_respiration')
-    op.drop_column('garmindaily', 'sleep_end_time')
-    op.drop_column('garmindaily', 'sleep_start_time')
-    op.drop_column('garmindaily', 'awake_sleep_seconds')
-    op.drop_column('garmindaily', 'rem_sleep_seconds')
-    op.drop_column('garmindaily', 'light_sleep_seconds')
-    op.drop_column('garmindaily', 'deep_sleep_seconds')
+    with op.batch_alter_table('garmindaily') as batch_op:
+        batch_op.drop_column('avg_sleep_stress')
+        batch_op.drop_column('average_respiration')
+        batch_op.drop_column('sleep_end_time')
+        batch_op.drop_column('sleep_start_time')
+        batch_op.drop_column('awake_sleep_seconds')
+        batch_op.drop_column('rem_sleep_seconds')
+        batch_op.drop_column('light_sleep_seconds')
+        batch_op.drop_column('deep_sleep_seconds')
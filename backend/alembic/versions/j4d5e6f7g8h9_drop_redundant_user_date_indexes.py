@@ -0,0 +1,35 @@
+"""drop_redundant_user_date_indexes
+
+Les index simples sur user_id et date de garmindaily / trainingload sont
+couverts par les contraintes uniques (user_id, date), dont le B-tree sert
+aussi bien les lookups par utilisateur que les plages de dates par utilisateur.
+
+Revision ID: j4d5e6f7g8h9
+Revises: i3c4d5e6f7g8
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'j4d5e6f7g8h9'
+down_revision: Union[str, None] = 'i3c4d5e6f7g8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.drop_index('ix_garmindaily_date', table_name='garmindaily')
+    op.drop_index('ix_garmindaily_user_id', table_name='garmindaily')
+    op.drop_index('ix_trainingload_date', table_name='trainingload')
+    op.drop_index('ix_trainingload_user_id', table_name='trainingload')
+
+
+def downgrade() -> None:
+    op.create_index('ix_trainingload_user_id', 'trainingload', ['user_id'])
+    op.create_index('ix_trainingload_date', 'trainingload', ['date'])
+    op.create_index('ix_garmindaily_user_id', 'garmindaily', ['user_id'])
+    op.create_index('ix_garmindaily_date', 'garmindaily', ['date'])
@@ -0,0 +1,48 @@
+"""partial_index_enrichment_queue_poll
+
+Remplace les index complets status / priority de enrichment_queue par un
+index partiel limite aux items actifs (PENDING / IN_PROGRESS), aligne sur la
+requete du scheduler round-robin :
+    WHERE user_id = ? AND status = 'PENDING' ORDER BY priority, created_at
+
+Revision ID: k5e6f7g8h9i0
+Revises: j4d5e6f7g8h9
+Create Date: 2026-10-17 00:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'k5e6f7g8h9i0'
+down_revision: Union[str, None] = 'j4d5e6f7g8h9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_enrichment_queue_hot',
+            'enrichment_queue',
+            ['user_id', 'priority', 'created_at'],
+            postgresql_where=sa.text("status IN ('PENDING', 'IN_PROGRESS')"),
+            postgresql_concurrently=True,
+        )
+        op.drop_index('ix_enrichment_queue_status', table_name='enrichment_queue',
+                      postgresql_concurrently=True)
+        op.drop_index('ix_enrichment_queue_priority', table_name='enrichment_queue',
+                      postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index('ix_enrichment_queue_priority', 'enrichment_queue', ['priority'],
+                        postgresql_concurrently=True)
+        op.create_index('ix_enrichment_queue_status', 'enrichment_queue', ['status'],
+                        postgresql_concurrently=True)
+        op.drop_index('ix_enrichment_queue_hot', table_name='enrichment_queue',
+                      postgresql_concurrently=True)
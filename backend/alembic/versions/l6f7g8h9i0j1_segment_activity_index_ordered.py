@@ -0,0 +1,38 @@
+"""segment_activity_index_ordered
+
+Toutes les lectures analytiques de segment sont scopées par activité et
+triées par segment_index (segments d'une activité, features dérivées,
+segmentation). L'index (activity_id, segment_index) remplace l'index simple
+sur activity_id : les segments d'une activité sont lus dans l'ordre, sans tri.
+
+Revision ID: l6f7g8h9i0j1
+Revises: k5e6f7g8h9i0
+Create Date: 2026-10-17 00:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'l6f7g8h9i0j1'
+down_revision: Union[str, None] = 'k5e6f7g8h9i0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index('ix_segment_activity_id_segment_index', 'segment',
+                        ['activity_id', 'segment_index'], postgresql_concurrently=True)
+        op.drop_index('ix_segment_activity_id', table_name='segment',
+                      postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index('ix_segment_activity_id', 'segment', ['activity_id'],
+                        postgresql_concurrently=True)
+        op.drop_index('ix_segment_activity_id_segment_index', table_name='segment',
+                      postgresql_concurrently=True)
@@ -0,0 +1,94 @@
+"""enrichment_queue_native_uuid
+
+f8a1b2c3d4e5 a créé id / activity_id / user_id de enrichment_queue en
+VARCHAR alors que l'entité (et activity.id, user.id) utilisent uuid. On
+aligne le stockage par add-backfill-swap : colonnes uuid ajoutées, recopiées
+par lots commités séparément, puis échangées ; PK, FK et index sont recréés.
+
+Revision ID: m7g8h9i0j1k2
+Revises: l6f7g8h9i0j1
+Create Date: 2026-10-17 00:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'm7g8h9i0j1k2'
+down_revision: Union[str, None] = 'l6f7g8h9i0j1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Taille des lots pour la recopie des identifiants
+BACKFILL_BATCH_SIZE = 5000
+
+UUID_COLUMNS = ('id', 'activity_id', 'user_id')
+
+COPY_SET_CLAUSE = ", ".join(f"{col}_new = CAST({col} AS uuid)" for col in UUID_COLUMNS)
+
+
+def _needs_conversion() -> bool:
+    """True si enrichment_queue.id n'est pas déjà un uuid (tables créées par create_all)."""
+    if op.get_context().as_sql:
+        return True
+    columns = sa.inspect(op.get_bind()).get_columns('enrichment_queue')
+    id_type = next(c['type'] for c in columns if c['name'] == 'id')
+    return not isinstance(id_type, sa.Uuid)
+
+
+def upgrade() -> None:
+    if not _needs_conversion():
+        return
+
+    for col in UUID_COLUMNS:
+        op.add_column('enrichment_queue', sa.Column(f'{col}_new', sa.Uuid(), nullable=True))
+
+    if op.get_context().as_sql:
+        op.execute(f"UPDATE enrichment_queue SET {COPY_SET_CLAUSE}")
+    else:
+        bind = op.get_bind()
+        with op.get_context().autocommit_block():
+            while True:
+                result = bind.execute(
+                    sa.text(
+                        f"UPDATE enrichment_queue SET {COPY_SET_CLAUSE} "
+                        "WHERE id IN (SELECT id FROM enrichment_queue WHERE id_new IS NULL LIMIT :batch_size)"
+                    ),
+                    {"batch_size": BACKFILL_BATCH_SIZE},
+                )
+                if result.rowcount == 0:
+                    break
+        # Rattrapage des lignes écrites pendant le backfill, dans la transaction du swap
+        op.execute(f"UPDATE enrichment_queue SET {COPY_SET_CLAUSE} WHERE id_new IS NULL")
+
+    # DROP COLUMN supprime aussi la PK, les FK et les index portant sur ces colonnes
+    for col in UUID_COLUMNS:
+        op.drop_column('enrichment_queue', col)
+        op.alter_column('enrichment_queue', f'{col}_new', new_column_name=col, nullable=False)
+
+    op.create_primary_key('enrichment_queue_pkey', 'enrichment_queue', ['id'])
+    op.create_foreign_key('enrichment_queue_activity_id_fkey', 'enrichment_queue', 'activity',
+                          ['activity_id'], ['id'])
+    op.create_foreign_key('enrichment_queue_user_id_fkey', 'enrichment_queue', 'user',
+                          ['user_id'], ['id'])
+
+    with op.get_context().autocommit_block():
+        op.create_index('ix_enrichment_queue_activity_id', 'enrichment_queue', ['activity_id'],
+                        postgresql_concurrently=True)
+        op.create_index('ix_enrichment_queue_user_id', 'enrichment_queue', ['user_id'],
+                        postgresql_concurrently=True)
+        op.create_index(
+            'ix_enrichment_queue_hot',
+            'enrichment_queue',
+            ['user_id', 'priority', 'created_at'],
+            postgresql_where=sa.text("status IN ('PENDING', 'IN_PROGRESS')"),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    # Pas de retour au VARCHAR : les FK vers activity.id / user.id (uuid) l'interdisent
+    pass
@@ -0,0 +1,100 @@
+"""split_activity_latlng
+
+start_latlng / end_latlng ne contiennent qu'une paire [lat, lon] stockée en
+JSON. On les remplace par quatre colonnes FLOAT (start_lat, start_lon,
+end_lat, end_lon) : lecture sans désérialisation JSON. Recopie par lots
+commités séparément (keyset sur id), puis suppression des colonnes JSON.
+
+Revision ID: n8h9i0j1k2l3
+Revises: m7g8h9i0j1k2
+Create Date: 2026-10-17 00:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'n8h9i0j1k2l3'
+down_revision: Union[str, None] = 'm7g8h9i0j1k2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Taille des lots pour la recopie des coordonnées
+BACKFILL_BATCH_SIZE = 5000
+
+SPLIT_SET_CLAUSE = (
+    "start_lat = (start_latlng->>0)::float, start_lon = (start_latlng->>1)::float, "
+    "end_lat = (end_latlng->>0)::float, end_lon = (end_latlng->>1)::float"
+)
+HAS_JSON_COORDS = "(start_latlng IS NOT NULL OR end_latlng IS NOT NULL)"
+
+
+def _backfill_coordinates() -> None:
+    """Recopie les paires JSON dans les colonnes FLOAT, par lots de BACKFILL_BATCH_SIZE."""
+    if op.get_context().as_sql:
+        op.execute(f"UPDATE activity SET {SPLIT_SET_CLAUSE} WHERE {HAS_JSON_COORDS}")
+        return
+
+    bind = op.get_bind()
+    update_batch = sa.text(f"UPDATE activity SET {SPLIT_SET_CLAUSE} WHERE id IN :ids").bindparams(
+        sa.bindparam("ids", expanding=True)
+    )
+    last_id = None
+    with op.get_context().autocommit_block():
+        while True:
+            if last_id is None:
+                ids = bind.execute(
+                    sa.text(f"SELECT id FROM activity WHERE {HAS_JSON_COORDS} ORDER BY id LIMIT :batch_size"),
+                    {"batch_size": BACKFILL_BATCH_SIZE},
+                ).scalars().all()
+            else:
+                ids = bind.execute(
+                    sa.text(
+                        f"SELECT id FROM activity WHERE {HAS_JSON_COORDS} AND id > :last_id "
+                        "ORDER BY id LIMIT :batch_size"
+                    ),
+                    {"last_id": last_id, "batch_size": BACKFILL_BATCH_SIZE},
+                ).scalars().all()
+            if not ids:
+                break
+            bind.execute(update_batch, {"ids": list(ids)})
+            last_id = ids[-1]
+
+    # Rattrapage des lignes écrites pendant le backfill, avant suppression du JSON
+    op.execute(
+        f"UPDATE activity SET {SPLIT_SET_CLAUSE} "
+        "WHERE (start_lat IS NULL AND (start_latlng->>0) IS NOT NULL) "
+        "OR (end_lat IS NULL AND (end_latlng->>0) IS NOT NULL)"
+    )
+
+
+def upgrade() -> None:
+    op.add_column('activity', sa.Column('start_lat', sa.Float(), nullable=True))
+    op.add_column('activity', sa.Column('start_lon', sa.Float(), nullable=True))
+    op.add_column('activity', sa.Column('end_lat', sa.Float(), nullable=True))
+    op.add_column('activity', sa.Column('end_lon', sa.Float(), nullable=True))
+
+    _backfill_coordinates()
+
+    op.drop_column('activity', 'end_latlng')
+    op.drop_column('activity', 'start_latlng')
+
+
+def downgrade() -> None:
+    op.add_column('activity', sa.Column('start_latlng', sa.JSON(), nullable=True))
+    op.add_column('activity', sa.Column('end_latlng', sa.JSON(), nullable=True))
+    op.execute(
+        "UPDATE activity SET start_latlng = json_build_array(start_lat, start_lon) "
+        "WHERE start_lat IS NOT NULL"
+    )
+    op.execute(
+        "UPDATE activity SET end_latlng = json_build_array(end_lat, end_lon) "
+        "WHERE end_lat IS NOT NULL"
+    )
+    op.drop_column('activity', 'end_lon')
+    op.drop_column('activity', 'end_lat')
+    op.drop_column('activity', 'start_lon')
+    op.drop_column('activity', 'start_lat')
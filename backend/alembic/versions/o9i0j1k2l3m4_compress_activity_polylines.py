@@ -0,0 +1,112 @@
+"""compress_activity_polylines
+
+polyline / summary_polyline passent de TEXT à BYTEA compressé (zlib, voir
+CompressedText dans app/domain/entities/activity.py). La compression se fait
+en Python : recopie par lots commités séparément (keyset sur id), puis
+échange des colonnes.
+
+Revision ID: o9i0j1k2l3m4
+Revises: n8h9i0j1k2l3
+Create Date: 2026-10-17 00:50:00.000000
+
+"""
+from typing import Sequence, Union
+import zlib
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'o9i0j1k2l3m4'
+down_revision: Union[str, None] = 'n8h9i0j1k2l3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Taille des lots pour la recompression
+BACKFILL_BATCH_SIZE = 1000
+
+# Doit rester aligné sur CompressedText.COMPRESSION_LEVEL
+COMPRESSION_LEVEL = 6
+
+POLYLINE_COLUMNS = ('summary_polyline', 'polyline')
+
+
+def _compress(value):
+    return zlib.compress(value.encode("utf-8"), COMPRESSION_LEVEL) if value is not None else None
+
+
+def _decompress(value):
+    return zlib.decompress(value).decode("utf-8") if value is not None else None
+
+
+def _write_rows(bind, rows, update_sql: str, convert) -> None:
+    bind.execute(
+        sa.text(update_sql),
+        [{"id": row.id, "summary": convert(row.summary), "detailed": convert(row.detailed)} for row in rows],
+    )
+
+
+def _copy_polylines(target_suffix: str, convert) -> None:
+    """Recopie les polylines converties dans les colonnes {col}{target_suffix}.
+
+    Parcours par keyset sur id en lots commités séparément, puis rattrapage des
+    lignes écrites entre-temps dans la transaction de la migration.
+    """
+    bind = op.get_bind()
+    select_sql = (
+        "SELECT id, summary_polyline AS summary, polyline AS detailed FROM activity "
+        "WHERE (summary_polyline IS NOT NULL OR polyline IS NOT NULL)"
+    )
+    update_sql = (
+        f"UPDATE activity SET summary_polyline{target_suffix} = :summary, "
+        f"polyline{target_suffix} = :detailed WHERE id = :id"
+    )
+
+    last_id = None
+    with op.get_context().autocommit_block():
+        while True:
+            where_last = " AND id > :last_id" if last_id is not None else ""
+            rows = bind.execute(
+                sa.text(f"{select_sql}{where_last} ORDER BY id LIMIT :batch_size"),
+                {"last_id": last_id, "batch_size": BACKFILL_BATCH_SIZE},
+            ).all()
+            if not rows:
+                break
+            _write_rows(bind, rows, update_sql, convert)
+            last_id = rows[-1].id
+
+    stragglers = bind.execute(sa.text(
+        f"{select_sql} AND ((summary_polyline IS NOT NULL AND summary_polyline{target_suffix} IS NULL) "
+        f"OR (polyline IS NOT NULL AND polyline{target_suffix} IS NULL))"
+    )).all()
+    if stragglers:
+        _write_rows(bind, stragglers, update_sql, convert)
+
+
+def upgrade() -> None:
+    if op.get_context().as_sql:
+        raise RuntimeError("La compression des polylines se fait en Python : lancer cette migration en mode online")
+
+    op.add_column('activity', sa.Column('summary_polyline_z', sa.LargeBinary(), nullable=True))
+    op.add_column('activity', sa.Column('polyline_z', sa.LargeBinary(), nullable=True))
+
+    _copy_polylines('_z', _compress)
+
+    for col in POLYLINE_COLUMNS:
+        op.drop_column('activity', col)
+        op.alter_column('activity', f'{col}_z', new_column_name=col)
+
+
+def downgrade() -> None:
+    if op.get_context().as_sql:
+        raise RuntimeError("La décompression des polylines se fait en Python : lancer cette migration en mode online")
+
+    op.add_column('activity', sa.Column('summary_polyline_txt', sa.Text(), nullable=True))
+    op.add_column('activity', sa.Column('polyline_txt', sa.Text(), nullable=True))
+
+    _copy_polylines('_txt', _decompress)
+
+    for col in POLYLINE_COLUMNS:
+        op.drop_column('activity', col)
+        op.alter_column('activity', f'{col}_txt', new_column_name=col)
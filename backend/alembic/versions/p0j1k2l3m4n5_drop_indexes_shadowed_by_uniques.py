@@ -0,0 +1,40 @@
+"""drop_indexes_shadowed_by_uniques
+
+segmentfeatures.segment_id, activityweather.activity_id et
+garminauth.user_id portent déjà une contrainte UNIQUE, dont le B-tree sert
+les lookups : l'index simple créé en plus est redondant. fitmetrics n'a que
+son index unique ix_fitmetrics_activity_id, conservé.
+
+Revision ID: p0j1k2l3m4n5
+Revises: o9i0j1k2l3m4
+Create Date: 2026-10-17 01:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'p0j1k2l3m4n5'
+down_revision: Union[str, None] = 'o9i0j1k2l3m4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SHADOWED_INDEXES = (
+    ('ix_segmentfeatures_segment_id', 'segmentfeatures', 'segment_id'),
+    ('ix_activityweather_activity_id', 'activityweather', 'activity_id'),
+    ('ix_garminauth_user_id', 'garminauth', 'user_id'),
+)
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for index_name, table, _column in SHADOWED_INDEXES:
+            op.drop_index(index_name, table_name=table, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for index_name, table, column in SHADOWED_INDEXES:
+            op.create_index(index_name, table, [column], postgresql_concurrently=True)
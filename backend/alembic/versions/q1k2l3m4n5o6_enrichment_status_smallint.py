@@ -0,0 +1,89 @@
+"""enrichment_status_smallint
+
+enrichment_queue.status passe du type ENUM PostgreSQL enrichmentstatus à
+SMALLINT (EnrichmentStatus est un IntEnum côté application) :
+PENDING=0, IN_PROGRESS=1, COMPLETED=2, FAILED=3.
+Add-backfill-swap, puis reconstruction de l'index partiel du scheduler.
+
+Revision ID: q1k2l3m4n5o6
+Revises: p0j1k2l3m4n5
+Create Date: 2026-10-17 01:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'q1k2l3m4n5o6'
+down_revision: Union[str, None] = 'p0j1k2l3m4n5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Taille des lots pour la recopie des statuts
+BACKFILL_BATCH_SIZE = 5000
+
+STATUS_TO_CODE = (
+    "CASE status WHEN 'PENDING' THEN 0 WHEN 'IN_PROGRESS' THEN 1 "
+    "WHEN 'COMPLETED' THEN 2 WHEN 'FAILED' THEN 3 END"
+)
+CODE_TO_STATUS = (
+    "CASE status WHEN 0 THEN 'PENDING' WHEN 1 THEN 'IN_PROGRESS' "
+    "WHEN 2 THEN 'COMPLETED' WHEN 3 THEN 'FAILED' END::enrichmentstatus"
+)
+
+enrichmentstatus = sa.Enum('PENDING', 'IN_PROGRESS', 'COMPLETED', 'FAILED', name='enrichmentstatus')
+
+
+def _create_hot_index(active_statuses: str) -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_enrichment_queue_hot',
+            'enrichment_queue',
+            ['user_id', 'priority', 'created_at'],
+            postgresql_where=sa.text(f"status IN ({active_statuses})"),
+            postgresql_concurrently=True,
+        )
+
+
+def upgrade() -> None:
+    op.add_column('enrichment_queue', sa.Column('status_code', sa.SmallInteger(), nullable=True))
+
+    if op.get_context().as_sql:
+        op.execute(f"UPDATE enrichment_queue SET status_code = {STATUS_TO_CODE}")
+    else:
+        bind = op.get_bind()
+        with op.get_context().autocommit_block():
+            while True:
+                result = bind.execute(
+                    sa.text(
+                        f"UPDATE enrichment_queue SET status_code = {STATUS_TO_CODE} "
+                        "WHERE id IN (SELECT id FROM enrichment_queue WHERE status_code IS NULL LIMIT :batch_size)"
+                    ),
+                    {"batch_size": BACKFILL_BATCH_SIZE},
+                )
+                if result.rowcount == 0:
+                    break
+        # Rattrapage des lignes écrites pendant le backfill, dans la transaction du swap
+        op.execute(f"UPDATE enrichment_queue SET status_code = {STATUS_TO_CODE} WHERE status_code IS NULL")
+
+    # DROP COLUMN supprime aussi l'index partiel dont le prédicat porte sur status
+    op.drop_column('enrichment_queue', 'status')
+    op.alter_column('enrichment_queue', 'status_code', new_column_name='status',
+                    nullable=False, server_default='0')
+    enrichmentstatus.drop(op.get_bind(), checkfirst=True)
+
+    _create_hot_index("0, 1")
+
+
+def downgrade() -> None:
+    enrichmentstatus.create(op.get_bind(), checkfirst=True)
+    op.add_column('enrichment_queue', sa.Column('status_name', enrichmentstatus, nullable=True))
+    op.execute(f"UPDATE enrichment_queue SET status_name = {CODE_TO_STATUS}")
+    op.drop_column('enrichment_queue', 'status')
+    op.alter_column('enrichment_queue', 'status_name', new_column_name='status',
+                    nullable=False, server_default='PENDING')
+
+    _create_hot_index("'PENDING', 'IN_PROGRESS'")
@@ -0,0 +1,62 @@
+"""timestamps_timestamptz
+
+Les horodatages techniques (created_at, updated_at, next_retry_at, ...) passent
+de TIMESTAMP WITHOUT TIME ZONE à TIMESTAMPTZ. Les valeurs existantes ont été
+écrites avec datetime.utcnow() : la session est forcée en UTC pour que la
+conversion les interprète comme de l'UTC. Sur PostgreSQL >= 12, avec un fuseau
+de session UTC, le changement de type ne réécrit pas la table.
+
+activity.start_date / start_date_local ne sont pas concernés : start_date_local
+est une heure locale « murale » sans fuseau.
+
+Revision ID: r2l3m4n5o6p7
+Revises: q1k2l3m4n5o6
+Create Date: 2026-10-17 01:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'r2l3m4n5o6p7'
+down_revision: Union[str, None] = 'q1k2l3m4n5o6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# table -> [(colonne, nullable)]
+TIMESTAMP_COLUMNS = {
+    'enrichment_queue': [('created_at', False), ('updated_at', False), ('next_retry_at', True)],
+    'segment': [('created_at', False)],
+    'segmentfeatures': [('created_at', False)],
+    'activityweather': [('created_at', False)],
+    'garminauth': [('token_created_at', False), ('last_sync_at', True),
+                   ('created_at', False), ('updated_at', False)],
+    'garmindaily': [('created_at', False), ('updated_at', False)],
+    'trainingload': [('created_at', False), ('updated_at', False)],
+    'fitmetrics': [('fit_downloaded_at', True), ('created_at', False), ('updated_at', False)],
+}
+
+
+def _convert(timezone: bool) -> None:
+    # SET LOCAL : limité à la transaction de la migration
+    op.execute("SET LOCAL timezone = 'UTC'")
+    for table, columns in TIMESTAMP_COLUMNS.items():
+        with op.batch_alter_table(table) as batch_op:
+            for column, nullable in columns:
+                batch_op.alter_column(
+                    column,
+                    type_=sa.DateTime(timezone=timezone),
+                    existing_type=sa.DateTime(timezone=not timezone),
+                    existing_nullable=nullable,
+                )
+
+
+def upgrade() -> None:
+    _convert(timezone=True)
+
+
+def downgrade() -> None:
+    _convert(timezone=False)
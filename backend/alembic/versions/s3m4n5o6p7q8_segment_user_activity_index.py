@@ -0,0 +1,43 @@
+"""segment_user_activity_index
+
+Le statut de segmentation compte les segments et les activités segmentées
+d'un utilisateur (count(*) et count(DISTINCT activity_id) WHERE user_id).
+L'index (user_id, activity_id) remplace l'index simple sur user_id : les deux
+compteurs se calculent par parcours d'index seul, sans lire la table.
+
+Les autres lectures citées restent couvertes par des index existants :
+garmindaily (user_id, date) par la contrainte unique uq_garmin_daily_user_date
+(parcourue à rebours pour ORDER BY date DESC), segment (activity_id,
+segment_index) par ix_segment_activity_id_segment_index.
+
+Revision ID: s3m4n5o6p7q8
+Revises: r2l3m4n5o6p7
+Create Date: 2026-10-17 01:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 's3m4n5o6p7q8'
+down_revision: Union[str, None] = 'r2l3m4n5o6p7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index('ix_segment_user_id_activity_id', 'segment',
+                        ['user_id', 'activity_id'], postgresql_concurrently=True)
+        op.drop_index('ix_segment_user_id', table_name='segment',
+                      postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index('ix_segment_user_id', 'segment', ['user_id'],
+                        postgresql_concurrently=True)
+        op.drop_index('ix_segment_user_id_activity_id', table_name='segment',
+                      postgresql_concurrently=True)
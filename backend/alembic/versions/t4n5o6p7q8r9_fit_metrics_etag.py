@@ -0,0 +1,31 @@
+"""fit_metrics_etag
+
+Empreinte du contenu des métriques FIT, calculée une fois à l'enrichissement
+et renvoyée comme ETag par GET /garmin/activities/{id}/fit-metrics. Nullable :
+les lignes existantes sont servies avec une empreinte calculée à la volée
+jusqu'au prochain enrichissement.
+
+Revision ID: t4n5o6p7q8r9
+Revises: s3m4n5o6p7q8
+Create Date: 2026-10-17 02:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 't4n5o6p7q8r9'
+down_revision: Union[str, None] = 's3m4n5o6p7q8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('fitmetrics', sa.Column('etag', sa.String(length=32), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('fitmetrics', 'etag')
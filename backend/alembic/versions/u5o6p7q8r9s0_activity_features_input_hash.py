@@ -0,0 +1,31 @@
+"""activity_features_input_hash
+
+Empreinte des segments utilisés au dernier calcul des features dérivées
+d'une activité. POST /features/compute/{activity_id} ne recalcule pas si les
+segments n'ont pas changé depuis (une re-segmentation crée de nouveaux
+segments, donc une nouvelle empreinte).
+
+Revision ID: u5o6p7q8r9s0
+Revises: t4n5o6p7q8r9
+Create Date: 2026-10-17 02:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'u5o6p7q8r9s0'
+down_revision: Union[str, None] = 't4n5o6p7q8r9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('activity', sa.Column('features_input_hash', sa.String(length=32), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('activity', 'features_input_hash')
@@ -0,0 +1,47 @@
+"""activity_user_indexes
+
+La table activity n'avait aucun index sur user_id : chaque lecture par
+utilisateur (liste paginée, statuts, bornes de training load) parcourait
+toute la table.
+
+- ix_activity_user_id_start_date (user_id, start_date) : filtre utilisateur
+  et tri / min par date.
+- ix_activity_user_id_enriched (user_id) WHERE streams_data IS NOT NULL :
+  activités enrichies d'un utilisateur (segmentation, météo, statuts).
+
+Les index training_load (user_id, date) et segment (user_id, activity_id)
+existent déjà (uq_training_load_user_date, ix_segment_user_id_activity_id).
+
+Revision ID: v6p7q8r9s0t1
+Revises: u5o6p7q8r9s0
+Create Date: 2026-10-17 02:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'v6p7q8r9s0t1'
+down_revision: Union[str, None] = 'u5o6p7q8r9s0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index('ix_activity_user_id_start_date', 'activity',
+                        ['user_id', 'start_date'], postgresql_concurrently=True)
+        op.create_index('ix_activity_user_id_enriched', 'activity', ['user_id'],
+                        postgresql_where=sa.text('streams_data IS NOT NULL'),
+                        postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_activity_user_id_enriched', table_name='activity',
+                      postgresql_concurrently=True)
+        op.drop_index('ix_activity_user_id_start_date', table_name='activity',
+                      postgresql_concurrently=True)
@@ -0,0 +1,49 @@
+"""auth_user_id_unique
+
+stravaauth.user_id et googleauth.user_id n'étaient pas indexés : chaque
+statut, refresh ou callback OAuth (WHERE user_id = ...) parcourait la table.
+Une seule connexion par service et par utilisateur est prévue (le callback
+met à jour la ligne existante) : index uniques, comme garminauth.user_id.
+
+Les éventuels doublons sont supprimés avant la création des index, seule la
+ligne la plus récemment mise à jour est conservée.
+
+user.email a déjà son index unique (ix_user_email, migration initiale).
+
+Revision ID: w7q8r9s0t1u2
+Revises: v6p7q8r9s0t1
+Create Date: 2026-10-17 03:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'w7q8r9s0t1u2'
+down_revision: Union[str, None] = 'v6p7q8r9s0t1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_TABLES = ('stravaauth', 'googleauth')
+
+
+def upgrade() -> None:
+    for table in _TABLES:
+        op.execute(
+            f"DELETE FROM {table} a USING {table} b "
+            "WHERE a.user_id = b.user_id "
+            "AND (a.updated_at, a.id) < (b.updated_at, b.id)"
+        )
+    with op.get_context().autocommit_block():
+        for table in _TABLES:
+            op.create_index(f'ix_{table}_user_id', table, ['user_id'],
+                            unique=True, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for table in _TABLES:
+            op.drop_index(f'ix_{table}_user_id', table_name=table,
+                          postgresql_concurrently=True)
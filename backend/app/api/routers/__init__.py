@@ -13,7 +13,7 @@ from app.api.routers.sync_router import router as sync_router
 from app.api.routers.data_router import router as data_router
 from app.api.routers.segment_router import router as segment_router
 from app.api.routers.garmin_router import router as garmin_router
-from app.api.routers._shared import limiter
+from app.api.routers._shared import limiter, ORJSONResponse
 
 router = APIRouter()
 
@@ -25,4 +25,4 @@ router.include_router(data_router)
 router.include_router(segment_router)
 router.include_router(garmin_router)
 
-__all__ = ["router", "limiter"]
+__all__ = ["router", "limiter", "ORJSONResponse"]
@@ -1,33 +1,126 @@
 """
 Utilitaires partages entre les routers API.
 """
+import hashlib
 import logging
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any
 from uuid import UUID
 
-from fastapi import Request, HTTPException, status
-from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from fastapi.responses import JSONResponse
+from fastapi import Depends, Request, HTTPException, status
+from fastapi.responses import JSONResponse, Response
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 from jose import JWTError, jwt as jose_jwt
+import orjson
+from sqlalchemy import case, or_
 from sqlmodel import Session, select
 
+from app.core.settings import get_settings
+from app.auth.jwt import jwt_manager
+
 logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Attributs des cookies d'authentification, figes au chargement du module
+_IS_PROD = settings.ENVIRONMENT == "production"
+# Cross-site (frontend/backend sur des domaines differents) => SameSite=None + Secure
+_SAMESITE = "none" if _IS_PROD else "lax"
+_ACCESS_MAX_AGE = settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES * 60
+_REFRESH_MAX_AGE = settings.JWT_REFRESH_TOKEN_EXPIRE_DAYS * 86400
+# Suffixes Set-Cookie (meme forme que Response.set_cookie)
+_COOKIE_FLAGS = f"; HttpOnly; Path=/; SameSite={_SAMESITE}" + ("; Secure" if _IS_PROD else "")
+_ACCESS_COOKIE_ATTRS = f"; Max-Age={_ACCESS_MAX_AGE}{_COOKIE_FLAGS}"
+_REFRESH_COOKIE_ATTRS = f"; Max-Age={_REFRESH_MAX_AGE}{_COOKIE_FLAGS}"
+_CLEAR_COOKIE_HEADERS = tuple(
+    (b"set-cookie", f'{name}=""; expires=Thu, 01 Jan 1970 00:00:00 GMT; Max-Age=0{_COOKIE_FLAGS}'.encode("latin-1"))
+    for name in ("access_token", "refresh_token")
+)
+
+class ORJSONResponse(JSONResponse):
+    """JSONResponse serialisee par orjson (extension C), beaucoup plus rapide que json.dumps.
+
+    Equivalent de fastapi.responses.ORJSONResponse, deprecie dans les versions
+    recentes de FastAPI.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+
+# Statuts interroges en boucle par le frontend : le navigateur garde la
+# reponse mais la revalide a chaque appel (no-cache), un statut change juste
+# apres un login/sync ne doit jamais etre servi perime
+_REVALIDATE_HEADERS = {"Cache-Control": "private, no-cache"}
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Vrai si l'en-tete If-None-Match du client contient deja cet ETag."""
+    if_none_match = request.headers.get("if-none-match")
+    return bool(if_none_match) and etag in (tag.strip() for tag in if_none_match.split(","))
 
-_bearer_scheme = HTTPBearer(auto_error=False)
 
+def not_modified_response(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, **_REVALIDATE_HEADERS})
 
-async def security(request: Request) -> HTTPAuthorizationCredentials:
-    """Extrait le JWT depuis le header Bearer ou le cookie access_token."""
-    # 1. Essayer le header Authorization: Bearer <token>
-    creds = await _bearer_scheme(request)
-    if creds:
-        return creds
 
-    # 2. Fallback sur le cookie httpOnly
-    token = request.cookies.get("access_token")
+def etag_json_response(request: Request, content: Any, digest: str | None = None) -> Response:
+    """ORJSONResponse avec ETag faible ; 304 sans corps si le client a deja cette version.
+
+    digest : empreinte deja connue du contenu (stockee en base), sinon calculee sur le corps.
+    """
+    response = ORJSONResponse(content=content, headers=_REVALIDATE_HEADERS)
+    etag = f'W/"{digest or hashlib.blake2b(response.body, digest_size=16).hexdigest()}"'
+    if etag_matches(request, etag):
+        return not_modified_response(etag)
+    response.headers["ETag"] = etag
+    return response
+
+
+_BEARER_PREFIX = "bearer "
+_BEARER_PREFIX_LEN = len(_BEARER_PREFIX)
+
+
+def _extract_token_from_request(request: Request) -> str | None:
+    """Extrait le JWT brut depuis le header Bearer ou le cookie access_token.
+
+    Le resultat est memorise sur request.state : require_token() et la key function
+    du rate limiter partagent ainsi un seul parsing par requete.
+    """
+    state = request.state
+    try:
+        return state.jwt_token
+    except AttributeError:
+        pass
+
+    # 1. Header Authorization: Bearer <token> (schema insensible a la casse)
+    auth_header = request.headers.get("authorization")
+    if (
+        auth_header is not None
+        and len(auth_header) > _BEARER_PREFIX_LEN
+        and auth_header[:_BEARER_PREFIX_LEN].lower() == _BEARER_PREFIX
+    ):
+        token = auth_header[_BEARER_PREFIX_LEN:]
+    else:
+        # 2. Fallback sur le cookie httpOnly
+        token = request.cookies.get("access_token")
+
+    state.jwt_token = token
+    return token
+
+
+def require_token(request: Request) -> str:
+    """Retourne le JWT brut (header Bearer ou cookie access_token), 401 s'il est absent.
+
+    Pas de HTTPAuthorizationCredentials : seul le token est utilise, inutile de
+    construire un modele Pydantic a chaque requete.
+    """
+    token = _extract_token_from_request(request)
     if token:
-        return HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+        return token
 
     raise HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -36,122 +129,240 @@ async def security(request: Request) -> HTTPAuthorizationCredentials:
     )
 
 
-def _extract_token_from_request(request: Request) -> str | None:
-    """Extrait le JWT brut depuis header ou cookie (pour le rate limiter)."""
-    auth_header = request.headers.get("Authorization", "")
-    if auth_header.startswith("Bearer "):
-        return auth_header[7:]
-    return request.cookies.get("access_token")
+@lru_cache(maxsize=4096)
+def _verified_access_token(token: str) -> tuple[str, float]:
+    """Retourne (user_id, exp) d'un access token entierement verifie.
+
+    Memorise par token : la verification complete (signature, type, payload)
+    n'est faite qu'a la premiere requete portant ce JWT. Les tokens invalides
+    levent une HTTPException et ne sont donc pas mis en cache.
+    """
+    token_data = jwt_manager.verify_token(token)
+    return token_data.user_id, token_data.exp.timestamp()
+
+
+async def current_user_id(request: Request) -> str:
+    """Dependance d'authentification : verifie le JWT une seule fois et retourne le user_id.
+
+    Le user_id est garde sur request.state pour que le rate limiter, evalue
+    apres les dependances, n'ait pas a redecoder le token. L'expiration est
+    reverifiee a chaque requete, y compris quand le token est deja en cache.
+    """
+    user_id, exp = _verified_access_token(require_token(request))
+    if time.time() > exp:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+        )
+    request.state.jwt_user_id = user_id
+    return user_id
+
+
+async def current_user_uuid(user_id: str = Depends(current_user_id)) -> UUID:
+    """Dependance d'authentification retournant le user_id deja converti en UUID.
+
+    S'appuie sur current_user_id (mis en cache par FastAPI pour la requete) :
+    le JWT est verifie et le UUID parse une seule fois.
+    """
+    return UUID(user_id)
+
+
+# Le rate limiter n'a besoin que du sub : seule la signature est verifiee
+# (sinon un client pourrait choisir le compteur d'un autre utilisateur),
+# la validation des claims temporels reste a get_current_user_id.
+_RATE_LIMIT_DECODE_OPTIONS = {
+    "verify_exp": False,
+    "verify_nbf": False,
+    "verify_iat": False,
+    "verify_aud": False,
+}
+_JWT_ALGORITHMS = [settings.JWT_ALGORITHM]
+
+
+@lru_cache(maxsize=4096)
+def _token_rate_limit_key(token: str) -> str | None:
+    """Retourne la cle "user:<sub>" d'un JWT signe, ou None si la signature est invalide.
+
+    Memorise par token : une rafale de requetes avec le meme JWT ne paie la
+    verification HMAC qu'une fois, puis une simple recherche dans le cache
+    qui renvoie la cle deja formatee.
+    """
+    try:
+        payload = jose_jwt.decode(
+            token, settings.JWT_SECRET_KEY, algorithms=_JWT_ALGORITHMS,
+            options=_RATE_LIMIT_DECODE_OPTIONS,
+        )
+    except JWTError:
+        return None
+    user_id = payload.get("sub")
+    return f"user:{user_id}" if user_id else None
 
 
 def _get_user_or_ip(request: Request) -> str:
     """Key function pour le rate limiter : retourne le user_id JWT si present, sinon l'IP."""
+    user_id = getattr(request.state, "jwt_user_id", None)
+    if user_id:
+        return f"user:{user_id}"
     token = _extract_token_from_request(request)
     if token:
-        try:
-            from app.core.settings import get_settings
-            settings = get_settings()
-            payload = jose_jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
-            user_id = payload.get("sub")
-            if user_id:
-                return f"user:{user_id}"
-        except JWTError:
-            pass
+        key = _token_rate_limit_key(token)
+        if key:
+            return key
     return get_remote_address(request)
 
 
-limiter = Limiter(key_func=_get_user_or_ip, default_limits=["100/minute"], headers_enabled=True)
+# Compteurs dans Redis : chaque cle expire avec sa fenetre, la memoire reste
+# bornee aux utilisateurs actifs. Repli en memoire si Redis est indisponible.
+limiter = Limiter(
+    key_func=_get_user_or_ip,
+    default_limits=["100/minute"],
+    headers_enabled=True,
+    storage_uri=settings.REDIS_URL,
+    strategy="moving-window",
+    in_memory_fallback_enabled=True,
+)
+
+# Budgets par classe d'endpoint lourd. Chaque classe a son propre compteur par
+# utilisateur, partage entre ses routes : saturer l'enrichissement n'entame ni
+# les syncs ni les lectures (qui restent sous la limite par defaut).
+enrichment_limit = limiter.shared_limit("10/minute", scope="enrichment")
+sync_limit = limiter.shared_limit("5/minute", scope="sync")
+compute_limit = limiter.shared_limit("10/minute", scope="compute")
 
 
-def extract_token_from_credentials(token_credentials) -> str:
-    """Extrait le token de l'objet credentials"""
-    if hasattr(token_credentials, 'credentials'):
-        return token_credentials.credentials
-    return str(token_credentials)
+def set_access_cookie(response: JSONResponse, access_token: str) -> JSONResponse:
+    """Pose (ou remplace) le cookie httpOnly access_token."""
+    # Les JWT (base64url + points) n'ont pas besoin de l'echappement de
+    # SimpleCookie : les headers sont assembles directement a partir des
+    # attributs precalcules.
+    response.raw_headers.append((b"set-cookie", f"access_token={access_token}{_ACCESS_COOKIE_ATTRS}".encode("latin-1")))
+    return response
 
 
 def set_auth_cookies(response: JSONResponse, access_token: str, refresh_token: str) -> JSONResponse:
     """Pose les cookies httpOnly pour access_token et refresh_token."""
-    from app.core.settings import get_settings
-    settings = get_settings()
-    is_prod = settings.ENVIRONMENT == "production"
-    # Cross-site (frontend/backend sur des domaines differents) => SameSite=None + Secure
-    samesite_value = "none" if is_prod else "lax"
-
-    response.set_cookie(
-        key="access_token",
-        value=access_token,
-        httponly=True,
-        secure=is_prod,
-        samesite=samesite_value,
-        max_age=settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES * 60,
-        path="/",
-    )
-    response.set_cookie(
-        key="refresh_token",
-        value=refresh_token,
-        httponly=True,
-        secure=is_prod,
-        samesite=samesite_value,
-        max_age=settings.JWT_REFRESH_TOKEN_EXPIRE_DAYS * 86400,
-        path="/",
-    )
+    set_access_cookie(response, access_token)
+    response.raw_headers.append((b"set-cookie", f"refresh_token={refresh_token}{_REFRESH_COOKIE_ATTRS}".encode("latin-1")))
     return response
 
 
 def clear_auth_cookies(response: JSONResponse) -> JSONResponse:
     """Supprime les cookies d'authentification."""
-    from app.core.settings import get_settings
-    settings = get_settings()
-    is_prod = settings.ENVIRONMENT == "production"
-    samesite_value = "none" if is_prod else "lax"
-
-    response.delete_cookie(key="access_token", path="/", httponly=True, secure=is_prod, samesite=samesite_value)
-    response.delete_cookie(key="refresh_token", path="/", httponly=True, secure=is_prod, samesite=samesite_value)
+    response.raw_headers.extend(_CLEAR_COOKIE_HEADERS)
     return response
 
 
+# Identifiants numeriques (strava_id / garmin_activity_id) deja resolus en
+# Activity.id, par utilisateur : les URLs du frontend utilisent le strava_id,
+# la resolution suivante est une lecture par cle primaire. Pas d'invalidation
+# explicite : l'entree est reverifiee a chaque lecture et oubliee si perimee.
+_NUMERIC_ID_CACHE_SIZE = 10000
+_numeric_activity_ids: "OrderedDict[tuple[UUID, int], UUID]" = OrderedDict()
+_numeric_activity_ids_lock = threading.Lock()
+
+
+def _cached_activity_uuid(user_uuid: UUID, numeric_id: int) -> UUID | None:
+    with _numeric_activity_ids_lock:
+        activity_uuid = _numeric_activity_ids.get((user_uuid, numeric_id))
+        if activity_uuid is not None:
+            _numeric_activity_ids.move_to_end((user_uuid, numeric_id))
+        return activity_uuid
+
+
+def _remember_activity_uuid(user_uuid: UUID, numeric_id: int, activity_uuid: UUID | None) -> None:
+    with _numeric_activity_ids_lock:
+        if activity_uuid is None:
+            _numeric_activity_ids.pop((user_uuid, numeric_id), None)
+            return
+        _numeric_activity_ids[(user_uuid, numeric_id)] = activity_uuid
+        _numeric_activity_ids.move_to_end((user_uuid, numeric_id))
+        if len(_numeric_activity_ids) > _NUMERIC_ID_CACHE_SIZE:
+            _numeric_activity_ids.popitem(last=False)
+
+
 def resolve_activity(session: Session, activity_id_str: str, user_id: str):
     """Resout une activite par UUID, strava_id ou garmin_activity_id."""
     from app.domain.entities.activity import Activity
 
-    activity = None
+    user_uuid = UUID(user_id)
     # 1. Essayer comme UUID
     try:
         activity_uuid = UUID(activity_id_str)
+    except ValueError:
+        activity_uuid = None
+    if activity_uuid is not None:
         activity = session.exec(
             select(Activity).where(
                 Activity.id == activity_uuid,
-                Activity.user_id == UUID(user_id),
+                Activity.user_id == user_uuid,
             )
         ).first()
-    except ValueError:
-        pass
+        if activity:
+            return activity
+
+    # 2. Fallback : identifiant numerique, strava_id puis garmin_activity_id
+    try:
+        numeric_id = int(activity_id_str)
+    except (ValueError, TypeError):
+        return None
 
-    # 2. Fallback : essayer comme strava_id numerique
-    if not activity:
-        try:
-            strava_id = int(activity_id_str)
-            activity = session.exec(
-                select(Activity).where(
-                    Activity.strava_id == strava_id,
-                    Activity.user_id == UUID(user_id),
-                )
-            ).first()
-        except (ValueError, TypeError):
-            pass
-
-    # 3. Fallback : essayer comme garmin_activity_id numerique
-    if not activity:
-        try:
-            garmin_id = int(activity_id_str)
-            activity = session.exec(
-                select(Activity).where(
-                    Activity.garmin_activity_id == garmin_id,
-                    Activity.user_id == UUID(user_id),
-                )
-            ).first()
-        except (ValueError, TypeError):
-            pass
+    cached_uuid = _cached_activity_uuid(user_uuid, numeric_id)
+    if cached_uuid is not None:
+        activity = session.get(Activity, cached_uuid)
+        if (
+            activity is not None
+            and activity.user_id == user_uuid
+            and numeric_id in (activity.strava_id, activity.garmin_activity_id)
+        ):
+            return activity
 
+    # Un seul aller-retour, strava_id prioritaire sur garmin_activity_id
+    activity = session.exec(
+        select(Activity)
+        .where(
+            Activity.user_id == user_uuid,
+            or_(Activity.strava_id == numeric_id, Activity.garmin_activity_id == numeric_id),
+        )
+        .order_by(case((Activity.strava_id == numeric_id, 0), else_=1))
+        .limit(1)
+    ).first()
+    _remember_activity_uuid(user_uuid, numeric_id, activity.id if activity else None)
     return activity
+
+
+def activity_id_subquery(activity_id_str: str, user_id: str):
+    """Sous-requete scalaire resolvant un identifiant d'activite en Activity.id.
+
+    Meme resolution que resolve_activity (UUID, puis strava_id, puis
+    garmin_activity_id) mais evaluee par la base au sein de la requete
+    appelante, sans charger la ligne Activity. None si l'identifiant n'est
+    ni un UUID ni un entier.
+    """
+    from app.domain.entities.activity import Activity
+
+    user_uuid = UUID(user_id)
+    try:
+        activity_uuid = UUID(activity_id_str)
+    except ValueError:
+        activity_uuid = None
+    if activity_uuid is not None:
+        return select(Activity.id).where(
+            Activity.id == activity_uuid,
+            Activity.user_id == user_uuid,
+        ).scalar_subquery()
+
+    try:
+        numeric_id = int(activity_id_str)
+    except (ValueError, TypeError):
+        return None
+    return (
+        select(Activity.id)
+        .where(
+            Activity.user_id == user_uuid,
+            or_(Activity.strava_id == numeric_id, Activity.garmin_activity_id == numeric_id),
+        )
+        # strava_id prioritaire sur garmin_activity_id, comme resolve_activity
+        .order_by(case((Activity.strava_id == numeric_id, 0), else_=1))
+        .limit(1)
+        .scalar_subquery()
+    )
@@ -3,23 +3,41 @@ Routes d'authentification : signup, login, me, OAuth Strava, OAuth Google.
 Routes = validation + delegation au service. Pas de logique metier ici.
 """
 import logging
+from urllib.parse import quote
 from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Form
-from fastapi.responses import JSONResponse, RedirectResponse
+from fastapi.responses import RedirectResponse
 from sqlmodel import Session
 
 from app.core.database import get_session
 from app.core.settings import get_settings
-from app.auth.jwt import TokenResponse, jwt_manager, get_current_user_id
+from app.auth.jwt import TokenResponse, jwt_manager
 from app.auth.strava_oauth import strava_oauth
 from app.auth.google_oauth import google_oauth
 from app.domain.entities import UserCreate, UserRead
+from app.domain.errors import NotFoundError, InactiveUserError, InvalidStateError
 from app.domain.services.auth_service import auth_service
-from app.api.routers._shared import security, limiter, set_auth_cookies, clear_auth_cookies
+from app.api.routers._shared import current_user_id, limiter, set_access_cookie, set_auth_cookies, clear_auth_cookies, ORJSONResponse
 
 logger = logging.getLogger(__name__)
+settings = get_settings()
 
 router = APIRouter()
 
+# Redirections vers le frontend : prefixes figes au chargement, seule la
+# partie variable (encodee) est concatenee a chaque callback
+_STRAVA_CONNECT_URL = f"{settings.FRONTEND_URL}/strava-connect"
+_STRAVA_SUCCESS_URL = f"{_STRAVA_CONNECT_URL}?success=true&athlete_id="
+_STRAVA_ERROR_URLS = {
+    error: f"{_STRAVA_CONNECT_URL}?error={error}&message="
+    for error in ("oauth_error", "no_code", "no_state", "invalid_state", "user_not_found", "callback_error")
+}
+_GOOGLE_SUCCESS_URL = f"{settings.FRONTEND_URL}/google-connect?success=true&google_user_id="
+
+
+def _strava_error_redirect(error: str, message: str) -> RedirectResponse:
+    """Redirige vers la page de connexion Strava avec un code d'erreur et un message encode."""
+    return RedirectResponse(url=_STRAVA_ERROR_URLS[error] + quote(message, safe=""))
+
 
 # ============ GOOGLE OAUTH ============
 
@@ -38,14 +56,12 @@ async def google_login():
 
 
 @router.get("/auth/google/status")
-async def google_status(
-    token_credentials: str = Depends(security),
+def google_status(
+    user_id: str = Depends(current_user_id),
     session: Session = Depends(get_session)
 ):
     """Verifie le statut de la connexion Google OAuth"""
     try:
-        token = token_credentials.credentials if hasattr(token_credentials, 'credentials') else str(token_credentials)
-        user_id = get_current_user_id(token)
         return auth_service.get_google_status(session, user_id)
     except Exception as e:
         logger.error(f"Erreur lors de la verification du statut Google: {e}")
@@ -56,14 +72,12 @@ async def google_status(
 
 
 @router.post("/auth/google/refresh")
-async def google_refresh_token(
-    token_credentials: str = Depends(security),
+def google_refresh_token(
+    user_id: str = Depends(current_user_id),
     session: Session = Depends(get_session)
 ):
     """Rafraichit automatiquement le token Google OAuth"""
     try:
-        token = token_credentials.credentials if hasattr(token_credentials, 'credentials') else str(token_credentials)
-        user_id = get_current_user_id(token)
         return auth_service.refresh_google_token(session, user_id)
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(e))
@@ -76,7 +90,7 @@ async def google_refresh_token(
 
 
 @router.get("/auth/google/callback")
-async def google_callback(
+def google_callback(
     code: str = Query(...),
     session: Session = Depends(get_session)
 ):
@@ -84,10 +98,7 @@ async def google_callback(
     try:
         user, jwt_tokens, google_user_id = auth_service.handle_google_callback(session, code)
 
-        settings = get_settings()
-        response = RedirectResponse(
-            url=f"{settings.FRONTEND_URL}/google-connect?success=true&google_user_id={google_user_id}"
-        )
+        response = RedirectResponse(url=f"{_GOOGLE_SUCCESS_URL}{quote(str(google_user_id), safe='')}")
         set_auth_cookies(response, jwt_tokens.access_token, jwt_tokens.refresh_token)
         return response
 
@@ -103,7 +114,7 @@ async def google_callback(
 
 @router.post("/auth/signup")
 @limiter.limit("3/hour")
-async def signup(
+def signup(
     request: Request,
     user_data: UserCreate,
     session: Session = Depends(get_session)
@@ -111,7 +122,7 @@ async def signup(
     """Inscription d'un nouvel utilisateur"""
     try:
         tokens = auth_service.signup(session, user_data)
-        response = JSONResponse(content=tokens.model_dump())
+        response = ORJSONResponse(content=tokens.model_dump())
         return set_auth_cookies(response, tokens.access_token, tokens.refresh_token)
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
@@ -119,7 +130,7 @@ async def signup(
 
 @router.post("/auth/login")
 @limiter.limit("5/minute")
-async def login(
+def login(
     request: Request,
     email: str = Form(...),
     password: str = Form(...),
@@ -128,13 +139,12 @@ async def login(
     """Connexion utilisateur"""
     try:
         tokens = auth_service.login(session, email, password)
-        response = JSONResponse(content=tokens.model_dump())
+        response = ORJSONResponse(content=tokens.model_dump())
         return set_auth_cookies(response, tokens.access_token, tokens.refresh_token)
+    except InactiveUserError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except ValueError as e:
-        error_msg = str(e)
-        if "Inactive" in error_msg:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error_msg)
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=error_msg)
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(e))
 
 
 @router.post("/auth/refresh")
@@ -153,21 +163,9 @@ async def refresh_token(request: Request):
 
     try:
         new_access = jwt_manager.refresh_access_token(refresh_tok)
-        response = JSONResponse(content={"access_token": new_access})
+        response = ORJSONResponse(content={"access_token": new_access})
         # Mettre a jour le cookie access_token
-        from app.core.settings import get_settings
-        settings = get_settings()
-        is_prod = settings.ENVIRONMENT == "production"
-        samesite_value = "none" if is_prod else "lax"
-        response.set_cookie(
-            key="access_token",
-            value=new_access,
-            httponly=True,
-            secure=is_prod,
-            samesite=samesite_value,
-            max_age=settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES * 60,
-            path="/",
-        )
+        set_access_cookie(response, new_access)
         return response
     except HTTPException:
         raise
@@ -179,19 +177,18 @@ async def refresh_token(request: Request):
 @router.post("/auth/logout")
 async def logout():
     """Supprime les cookies d'authentification."""
-    response = JSONResponse(content={"message": "Logged out"})
+    response = ORJSONResponse(content={"message": "Logged out"})
     return clear_auth_cookies(response)
 
 
 @router.get("/auth/me", response_model=UserRead)
-async def get_current_user(
-    token: str = Depends(security),
+def get_current_user(
+    user_id: str = Depends(current_user_id),
     session: Session = Depends(get_session)
 ):
     """Recupere les informations de l'utilisateur connecte"""
-    user_id = get_current_user_id(token.credentials)
     try:
-        return auth_service.get_user(session, user_id)
+        return auth_service.get_user_profile(session, user_id)
     except ValueError:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
 
@@ -199,63 +196,56 @@ async def get_current_user(
 # ============ OAUTH STRAVA ============
 
 @router.get("/auth/strava/login")
-async def strava_login(
-    token: str = Depends(security),
+def strava_login(
+    user_id: str = Depends(current_user_id),
     session: Session = Depends(get_session)
 ):
     """Initie la connexion OAuth Strava"""
-    user_id = get_current_user_id(token.credentials)
     auth_url = strava_oauth.get_authorization_url(state=user_id)
     return {"authorization_url": auth_url}
 
 
 @router.get("/auth/strava/callback")
-async def strava_callback(
+def strava_callback(
     request: Request,
     session: Session = Depends(get_session)
 ):
     """Callback OAuth Strava - Traite l'authentification et redirige"""
-    params = dict(request.query_params)
-    code = params.get("code")
-    state = params.get("state")
-    error = params.get("error")
-
-    settings = get_settings()
+    query_params = request.query_params
+    code = query_params.get("code")
+    state = query_params.get("state")
+    error = query_params.get("error")
 
     if error:
         logger.error(f"Erreur OAuth recue de Strava: {error}")
-        return RedirectResponse(url=f"{settings.FRONTEND_URL}/strava-connect?error=oauth_error&message={error}")
+        return _strava_error_redirect("oauth_error", error)
 
     if not code:
-        return RedirectResponse(url=f"{settings.FRONTEND_URL}/strava-connect?error=no_code&message=Code d'autorisation manquant")
+        return _strava_error_redirect("no_code", "Code d'autorisation manquant")
 
     if not state:
-        return RedirectResponse(url=f"{settings.FRONTEND_URL}/strava-connect?error=no_state&message=Parametre d'etat manquant")
+        return _strava_error_redirect("no_state", "Parametre d'etat manquant")
 
     try:
         (athlete_id,) = auth_service.handle_strava_callback(session, code, state)
-        return RedirectResponse(url=f"{settings.FRONTEND_URL}/strava-connect?success=true&athlete_id={athlete_id}")
+        return RedirectResponse(url=f"{_STRAVA_SUCCESS_URL}{athlete_id}")
 
+    except InvalidStateError as e:
+        return _strava_error_redirect("invalid_state", str(e))
+    except NotFoundError as e:
+        return _strava_error_redirect("user_not_found", str(e))
     except ValueError as e:
-        error_msg = str(e)
-        if "invalide" in error_msg.lower():
-            return RedirectResponse(url=f"{settings.FRONTEND_URL}/strava-connect?error=invalid_state&message={error_msg}")
-        if "non trouve" in error_msg.lower():
-            return RedirectResponse(url=f"{settings.FRONTEND_URL}/strava-connect?error=user_not_found&message={error_msg}")
-        return RedirectResponse(url=f"{settings.FRONTEND_URL}/strava-connect?error=callback_error&message={error_msg}")
+        return _strava_error_redirect("callback_error", str(e))
 
     except Exception as e:
         logger.error(f"Erreur dans le callback Strava: {type(e).__name__}: {str(e)}", exc_info=True)
-        error_msg = f"{type(e).__name__}: {str(e)}"
-        error_msg_encoded = error_msg.replace(" ", "%20").replace(":", "%3A")
-        return RedirectResponse(url=f"{settings.FRONTEND_URL}/strava-connect?error=callback_error&message={error_msg_encoded}")
+        return _strava_error_redirect("callback_error", f"{type(e).__name__}: {str(e)}")
 
 
 @router.get("/auth/strava/status")
-async def strava_status(
-    token: str = Depends(security),
+def strava_status(
+    user_id: str = Depends(current_user_id),
     session: Session = Depends(get_session)
 ):
     """Verifie le statut de connexion Strava"""
-    user_id = get_current_user_id(token.credentials)
     return auth_service.get_strava_status(session, user_id)
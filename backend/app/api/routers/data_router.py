@@ -4,14 +4,13 @@ Routes = validation + delegation au service. Pas de logique metier ici.
 """
 import logging
 from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.responses import JSONResponse
+from fastapi.responses import StreamingResponse
 from sqlmodel import Session
 from datetime import datetime
 
 from app.core.database import get_session
-from app.auth.jwt import get_current_user_id
 from app.domain.services.data_management_service import data_management_service
-from app.api.routers._shared import security
+from app.api.routers._shared import current_user_id
 
 logger = logging.getLogger(__name__)
 
@@ -21,12 +20,11 @@ router = APIRouter()
 # ============ RGPD - SUPPRESSION DES DONNEES ============
 
 @router.delete("/data/strava")
-async def delete_strava_data(
-    token: str = Depends(security),
+def delete_strava_data(
+    user_id: str = Depends(current_user_id),
     session: Session = Depends(get_session)
 ):
     """Supprime toutes les donnees Strava de l'utilisateur (conformite RGPD)"""
-    user_id = get_current_user_id(token.credentials)
     try:
         return data_management_service.delete_strava_data(session, user_id)
     except Exception as e:
@@ -38,12 +36,11 @@ async def delete_strava_data(
 
 
 @router.delete("/data/all")
-async def delete_all_user_data(
-    token: str = Depends(security),
+def delete_all_user_data(
+    user_id: str = Depends(current_user_id),
     session: Session = Depends(get_session)
 ):
     """Supprime toutes les donnees de l'utilisateur SAUF le compte (conformite RGPD)"""
-    user_id = get_current_user_id(token.credentials)
     try:
         return data_management_service.delete_all_user_data(session, user_id)
     except Exception as e:
@@ -55,12 +52,11 @@ async def delete_all_user_data(
 
 
 @router.delete("/account")
-async def delete_account(
-    token: str = Depends(security),
+def delete_account(
+    user_id: str = Depends(current_user_id),
     session: Session = Depends(get_session)
 ):
     """Supprime completement le compte utilisateur et toutes ses donnees (conformite RGPD)"""
-    user_id = get_current_user_id(token.credentials)
     try:
         return data_management_service.delete_account(session, user_id)
     except ValueError as e:
@@ -74,16 +70,16 @@ async def delete_account(
 
 
 @router.get("/data/export")
-async def export_user_data(
-    token: str = Depends(security),
+def export_user_data(
+    user_id: str = Depends(current_user_id),
     session: Session = Depends(get_session)
 ):
     """Exporte toutes les donnees de l'utilisateur au format JSON (conformite RGPD)"""
-    user_id = get_current_user_id(token.credentials)
     try:
-        export_data = data_management_service.export_user_data(session, user_id)
-        return JSONResponse(
-            content=export_data,
+        export_chunks = data_management_service.export_user_data(session, user_id)
+        return StreamingResponse(
+            export_chunks,
+            media_type="application/json",
             headers={
                 "Content-Disposition": f"attachment; filename=athletiq_data_export_{user_id}_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.json"
             }
@@ -2,18 +2,19 @@
 Routes Garmin Connect : auth (login/status/disconnect), sync, daily data.
 Routes = validation + delegation au service. Pas de logique metier ici.
 """
+import asyncio
 import logging
 from datetime import date as date_type
-from typing import List, Optional
+from typing import Annotated, Any, Awaitable, Callable, Dict, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
-from pydantic import BaseModel, EmailStr
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status, Response
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, StringConstraints
 from sqlmodel import Session, select
 from uuid import UUID
 
-from app.core.database import get_session
-from app.auth.jwt import get_current_user_id
-from app.domain.entities.garmin_daily import GarminDaily, GarminDailyRead
+from app.core.database import engine, get_session
+from app.domain.entities.garmin_daily import GarminDailyRead
 from app.domain.services.auth_service import auth_service
 from app.domain.entities.fit_metrics import FitMetrics, FitMetricsRead
 from app.domain.services.garmin_sync_service import (
@@ -22,8 +23,10 @@ from app.domain.services.garmin_sync_service import (
     enrich_garmin_activity_fit,
     batch_enrich_garmin_fit,
     get_garmin_enrichment_status,
+    iter_garmin_daily_json,
+    next_garmin_daily_cursor,
 )
-from app.api.routers._shared import security, limiter, resolve_activity
+from app.api.routers._shared import current_user_id, current_user_uuid, limiter, activity_id_subquery, enrichment_limit, sync_limit, etag_json_response, etag_matches, not_modified_response
 
 logger = logging.getLogger(__name__)
 
@@ -31,7 +34,8 @@ router = APIRouter()
 
 
 class GarminLoginRequest(BaseModel):
-    email: EmailStr
+    # Controle de forme seulement : Garmin valide l'adresse au login
+    email: Annotated[str, StringConstraints(strip_whitespace=True, max_length=254, pattern=r"^[^@\s]+@[^@\s]+\.[^@\s]+$")]
     password: str
 
 
@@ -39,20 +43,20 @@ class GarminLoginRequest(BaseModel):
 
 @router.post("/auth/garmin/login")
 @limiter.limit("3/hour")
-async def garmin_login(
+def garmin_login(
     request: Request,
+    response: Response,
     body: GarminLoginRequest,
-    token: str = Depends(security),
+    user_id: str = Depends(current_user_id),
     session: Session = Depends(get_session),
 ):
     """Login Garmin one-time. Email/password ne sont JAMAIS stockes."""
-    user_id = get_current_user_id(token.credentials)
     try:
         return auth_service.handle_garmin_login(session, user_id, body.email, body.password)
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(e))
     except Exception as e:
-        logger.error(f"Erreur login Garmin: {e}")
+        logger.error("Erreur login Garmin: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Erreur lors de la connexion Garmin",
@@ -60,22 +64,21 @@ async def garmin_login(
 
 
 @router.get("/auth/garmin/status")
-async def garmin_status(
-    token: str = Depends(security),
+def garmin_status(
+    request: Request,
+    user_id: str = Depends(current_user_id),
     session: Session = Depends(get_session),
 ):
     """Verifie le statut de la connexion Garmin."""
-    user_id = get_current_user_id(token.credentials)
-    return auth_service.get_garmin_status(session, user_id)
+    return etag_json_response(request, auth_service.get_garmin_status(session, user_id))
 
 
 @router.delete("/auth/garmin/disconnect")
-async def garmin_disconnect(
-    token: str = Depends(security),
+def garmin_disconnect(
+    user_id: str = Depends(current_user_id),
     session: Session = Depends(get_session),
 ):
     """Deconnecte Garmin (supprime le token)."""
-    user_id = get_current_user_id(token.credentials)
     try:
         return auth_service.disconnect_garmin(session, user_id)
     except ValueError as e:
@@ -84,21 +87,58 @@ async def garmin_disconnect(
 
 # ============ SYNC GARMIN ============
 
+# Syncs en cours par utilisateur : un double clic rejoint la sync deja
+# lancee au lieu d'en demarrer une seconde sur les memes lignes
+_daily_syncs: Dict[UUID, "asyncio.Task[Any]"] = {}
+_activity_syncs: Dict[UUID, "asyncio.Task[Any]"] = {}
+
+
+async def _coalesced(
+    inflight: Dict[UUID, "asyncio.Task[Any]"],
+    user_uuid: UUID,
+    start: Callable[[Session], Awaitable[Any]],
+) -> Any:
+    """Execute start() une seule fois a la fois par utilisateur ; les appels concurrents partagent son resultat.
+
+    La sync tourne dans sa propre tache, avec sa propre session : elle survit a
+    la requete qui l'a lancee. Chaque appelant attend sous shield, son
+    annulation (deconnexion du client) n'interrompt pas la sync partagee.
+    """
+    task = inflight.get(user_uuid)
+    if task is None:
+        task = asyncio.ensure_future(_run_in_own_session(start))
+        inflight[user_uuid] = task
+
+        def _forget(done: "asyncio.Task[Any]") -> None:
+            if inflight.get(user_uuid) is done:
+                del inflight[user_uuid]
+
+        task.add_done_callback(_forget)
+    return await asyncio.shield(task)
+
+
+async def _run_in_own_session(start: Callable[[Session], Awaitable[Any]]) -> Any:
+    with Session(engine) as session:
+        return await start(session)
+
+
 @router.post("/sync/garmin")
+@sync_limit
 async def sync_garmin(
-    token: str = Depends(security),
-    session: Session = Depends(get_session),
+    request: Request,
+    response: Response,
+    user_uuid: UUID = Depends(current_user_uuid),
     days_back: int = Query(default=30, ge=1, le=730),
 ):
-    """Synchronise les donnees quotidiennes Garmin."""
-    user_id = get_current_user_id(token.credentials)
+    """Synchronise les donnees quotidiennes Garmin (une seule sync a la fois par utilisateur)."""
     try:
-        result = await sync_daily_data(session, UUID(user_id), days_back)
-        return result
+        return await _coalesced(
+            _daily_syncs, user_uuid, lambda session: sync_daily_data(session, user_uuid, days_back)
+        )
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
     except Exception as e:
-        logger.error(f"Erreur sync Garmin: {e}")
+        logger.error("Erreur sync Garmin: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erreur sync Garmin: {str(e)}",
@@ -108,45 +148,50 @@ async def sync_garmin(
 # ============ DONNEES GARMIN ============
 
 @router.get("/garmin/daily", response_model=List[GarminDailyRead])
-async def get_garmin_daily(
-    token: str = Depends(security),
-    session: Session = Depends(get_session),
+def get_garmin_daily(
+    request: Request,
+    user_uuid: UUID = Depends(current_user_uuid),
     date_from: Optional[date_type] = Query(default=None),
     date_to: Optional[date_type] = Query(default=None),
+    before: Optional[date_type] = Query(default=None, description="Curseur : jours strictement anterieurs (X-Next-Before de la page precedente)"),
+    limit: int = Query(default=1000, ge=1, le=5000),
 ):
-    """Recupere les donnees quotidiennes Garmin pour une periode."""
-    user_id = get_current_user_id(token.credentials)
-
-    query = select(GarminDaily).where(GarminDaily.user_id == UUID(user_id))
-
-    if date_from:
-        query = query.where(GarminDaily.date >= date_from)
-    if date_to:
-        query = query.where(GarminDaily.date <= date_to)
-
-    query = query.order_by(GarminDaily.date.desc())
-
-    results = session.exec(query).all()
-    return results
+    """Recupere les donnees quotidiennes Garmin pour une periode (tableau JSON streame, du plus recent au plus ancien).
+
+    Page tronquee a limit lignes : X-Next-Before et Link rel="next" donnent le curseur de la page suivante.
+    """
+    headers = {}
+    next_before = next_garmin_daily_cursor(user_uuid, date_from, date_to, before, limit)
+    if next_before is not None:
+        next_url = request.url.include_query_params(before=next_before.isoformat())
+        headers["X-Next-Before"] = next_before.isoformat()
+        headers["Link"] = f'<{next_url}>; rel="next"'
+    return StreamingResponse(
+        iter_garmin_daily_json(user_uuid, date_from, date_to, limit, before),
+        media_type="application/json",
+        headers=headers,
+    )
 
 
 # ============ ACTIVITES GARMIN ============
 
 @router.post("/sync/garmin/activities")
+@sync_limit
 async def sync_garmin_act(
-    token: str = Depends(security),
-    session: Session = Depends(get_session),
+    request: Request,
+    response: Response,
+    user_uuid: UUID = Depends(current_user_uuid),
     days_back: int = Query(default=30, ge=1, le=730),
 ):
-    """Synchronise les activites Garmin dans la table Activity."""
-    user_id = get_current_user_id(token.credentials)
+    """Synchronise les activites Garmin dans la table Activity (une seule sync a la fois par utilisateur)."""
     try:
-        result = await sync_garmin_activities(session, UUID(user_id), days_back)
-        return result
+        return await _coalesced(
+            _activity_syncs, user_uuid, lambda session: sync_garmin_activities(session, user_uuid, days_back)
+        )
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
     except Exception as e:
-        logger.error(f"Erreur sync activites Garmin: {e}")
+        logger.error("Erreur sync activites Garmin: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erreur sync activites Garmin: {str(e)}",
@@ -154,30 +199,32 @@ async def sync_garmin_act(
 
 
 @router.get("/garmin/enrichment-status")
-async def garmin_enrichment_status(
-    token: str = Depends(security),
+def garmin_enrichment_status(
+    request: Request,
+    user_uuid: UUID = Depends(current_user_uuid),
     session: Session = Depends(get_session),
 ):
     """Retourne le statut d'enrichissement FIT des activites Garmin."""
-    user_id = get_current_user_id(token.credentials)
-    return get_garmin_enrichment_status(session, UUID(user_id))
+    return etag_json_response(request, get_garmin_enrichment_status(session, user_uuid))
 
 
 @router.post("/garmin/activities/{activity_id}/enrich-fit")
+@enrichment_limit
 async def enrich_garmin_fit(
+    request: Request,
+    response: Response,
     activity_id: UUID,
-    token: str = Depends(security),
+    user_uuid: UUID = Depends(current_user_uuid),
     session: Session = Depends(get_session),
 ):
     """Enrichit une activite Garmin avec son fichier FIT."""
-    user_id = get_current_user_id(token.credentials)
     try:
-        result = await enrich_garmin_activity_fit(session, UUID(user_id), activity_id)
+        result = await enrich_garmin_activity_fit(session, user_uuid, activity_id)
         return result
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
     except Exception as e:
-        logger.error(f"Erreur enrichissement FIT: {e}")
+        logger.error("Erreur enrichissement FIT: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erreur enrichissement FIT: {str(e)}",
@@ -185,49 +232,69 @@ async def enrich_garmin_fit(
 
 
 @router.post("/garmin/activities/enrich-fit")
+@enrichment_limit
 async def batch_enrich_fit(
-    token: str = Depends(security),
+    request: Request,
+    response: Response,
+    user_uuid: UUID = Depends(current_user_uuid),
     session: Session = Depends(get_session),
     max_activities: int = Query(default=50, ge=1, le=200),
 ):
     """Enrichit en batch les activites Garmin sans streams_data."""
-    user_id = get_current_user_id(token.credentials)
     try:
-        result = await batch_enrich_garmin_fit(session, UUID(user_id), max_activities)
+        result = await batch_enrich_garmin_fit(session, user_uuid, max_activities)
         return result
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
     except Exception as e:
-        logger.error(f"Erreur batch enrichissement FIT: {e}")
+        logger.error("Erreur batch enrichissement FIT: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erreur batch enrichissement FIT: {str(e)}",
         )
 
 
-@router.get("/garmin/activities/{activity_id}/fit-metrics", response_model=FitMetricsRead)
-async def get_fit_metrics(
+@router.api_route("/garmin/activities/{activity_id}/fit-metrics", methods=["GET", "HEAD"], response_model=FitMetricsRead)
+def get_fit_metrics(
+    request: Request,
     activity_id: str,
-    token: str = Depends(security),
+    user_id: str = Depends(current_user_id),
     session: Session = Depends(get_session),
 ):
     """Recupere les metriques FIT (Running Dynamics) d'une activite (accepte UUID ou strava_id)."""
-    user_id = get_current_user_id(token.credentials)
-
-    activity = resolve_activity(session, activity_id, user_id)
-    if not activity:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Activite non trouvee",
-        )
 
-    fm = session.exec(
-        select(FitMetrics).where(FitMetrics.activity_id == activity.id)
-    ).first()
+    # Controle d'appartenance integre a la requete : un seul aller-retour
+    # quand les metriques existent
+    activity_ref = activity_id_subquery(activity_id, user_id)
+
+    # Metriques figees a l'enrichissement : si le client a deja la version
+    # courante, seule l'empreinte stockee est lue
+    if activity_ref is not None and request.headers.get("if-none-match"):
+        stored_etag = session.exec(
+            select(FitMetrics.etag).where(FitMetrics.activity_id == activity_ref)
+        ).first()
+        if stored_etag and etag_matches(request, f'W/"{stored_etag}"'):
+            return not_modified_response(f'W/"{stored_etag}"')
+
+    fm = None
+    if activity_ref is not None:
+        fm = session.exec(
+            select(FitMetrics).where(FitMetrics.activity_id == activity_ref)
+        ).first()
     if not fm:
+        if activity_ref is None or session.exec(select(activity_ref)).one() is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Activite non trouvee",
+            )
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Pas de metriques FIT pour cette activite",
         )
 
-    return fm
+    # Lignes enrichies avant l'ajout de l'empreinte : calculee a la volee
+    return etag_json_response(
+        request,
+        FitMetricsRead.model_validate(fm).model_dump(mode="json"),
+        digest=fm.etag,
+    )
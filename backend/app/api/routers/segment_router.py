@@ -2,56 +2,143 @@
 Routes de segmentation, meteo, features derivees et training load.
 Routes = validation + delegation au service. Pas de logique metier ici.
 """
+import hashlib
 import logging
 from datetime import date as date_type, timedelta
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, status, Request, Response
+from pydantic import BaseModel
+from sqlalchemy import lambda_stmt
+from sqlalchemy.orm import joinedload
 from sqlmodel import Session, select, func
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from uuid import UUID
 
-from app.core.database import get_session
-from app.auth.jwt import get_current_user_id
+from app.core import jobs
+from app.core.database import engine, get_session
+from app.core.redis import cache_get_json, cache_set_json, cache_delete
 from app.domain.entities.activity import Activity
 from app.domain.entities.segment import Segment, SegmentRead
-from app.domain.entities.segment_features import SegmentFeatures, SegmentFeaturesRead
+from app.domain.entities.segment_features import SegmentFeaturesRead
 from app.domain.entities.activity_weather import ActivityWeather, ActivityWeatherRead
 from app.domain.entities.training_load import TrainingLoad, TrainingLoadRead
 from app.domain.services import segmentation_service
 from app.domain.services import weather_service
 from app.domain.services import derived_features_service
-from app.api.routers._shared import security, resolve_activity
+from app.api.routers._shared import current_user_id, current_user_uuid, resolve_activity, activity_id_subquery, compute_limit, etag_json_response, etag_matches, not_modified_response, ORJSONResponse
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 
-@router.post("/segments/process")
-async def process_all_segments(
-    token: str = Depends(security),
-    session: Session = Depends(get_session),
-):
-    """Segmente toutes les activites enrichies de l'utilisateur."""
-    user_id = get_current_user_id(token.credentials)
+# Schemas de reponse : FastAPI serialise via pydantic-core au lieu de
+# parcourir les dicts avec jsonable_encoder
+class SegmentationStatus(BaseModel):
+    total_activities: int
+    enriched_activities: int
+    segmented_activities: int
+    pending_segmentation: int
+    total_segments: int
+
+
+class WeatherStatus(BaseModel):
+    total_activities: int
+    with_streams: int
+    with_weather: int
+    pending_weather: int
+
+
+class SegmentProcessResult(BaseModel):
+    activity_id: UUID
+    segments_created: int
+
+
+class FeatureComputeResult(BaseModel):
+    activity_id: UUID
+    segments_updated: int
+    cached: Optional[bool] = None
+
+
+class TrainingLoadComputeResult(BaseModel):
+    days_computed: int
+    date_from: date_type
+    date_to: date_type
+
+
+class TaskAccepted(BaseModel):
+    task_id: str
+    status: str
+
+
+class TaskStatus(TaskAccepted):
+    kind: str
+    updated_at: str
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+# Statuts interroges en boucle par le tableau de bord : mis en cache par
+# utilisateur, invalides par les routes de segmentation / meteo
+STATUS_CACHE_TTL_S = 30
+
+TRAINING_LOAD_READ_BATCH_SIZE = 200
+
+
+def _segment_status_key(user_id) -> str:
+    return f"seg_status:{user_id}"
+
+
+def _weather_status_key(user_id) -> str:
+    return f"weather_status:{user_id}"
+
+
+def _start_exclusive_job(user_uuid: UUID, kind: str, busy_detail: str) -> Dict[str, Any]:
+    """Enregistre un travail exclusif : 409 s'il tourne deja, 503 si son etat ne peut etre suivi."""
     try:
-        result = segmentation_service.segment_all_enriched(session, user_id)
-        return result
-    except Exception as e:
-        logger.error(f"Erreur segmentation globale user {user_id}: {e}")
+        job = jobs.create_exclusive_job(str(user_uuid), kind)
+    except jobs.JobStoreUnavailableError:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Erreur lors de la segmentation: {str(e)}",
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Suivi des taches indisponible, reessayez plus tard",
+        )
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=busy_detail,
         )
+    return job
 
 
-@router.post("/segments/process/{activity_id}")
-async def process_activity_segments(
+def _segment_all_enriched_job(user_uuid: UUID):
+    with Session(engine) as session:
+        result = segmentation_service.segment_all_enriched(session, user_uuid)
+    cache_delete(_segment_status_key(user_uuid))
+    return result
+
+
+@router.post("/segments/process", status_code=status.HTTP_202_ACCEPTED, response_model=TaskAccepted)
+@compute_limit
+def process_all_segments(
+    request: Request,
+    response: Response,
+    background_tasks: BackgroundTasks,
+    user_uuid: UUID = Depends(current_user_uuid),
+):
+    """Lance en tache de fond la segmentation de toutes les activites enrichies (suivi : GET /tasks/{task_id})."""
+    job = _start_exclusive_job(user_uuid, "segment_all", "Segmentation deja en cours")
+    background_tasks.add_task(jobs.run_job, job, _segment_all_enriched_job, user_uuid)
+    return {"task_id": job["task_id"], "status": job["status"]}
+
+
+@router.post("/segments/process/{activity_id}", response_model=SegmentProcessResult)
+@compute_limit
+def process_activity_segments(
+    request: Request,
+    response: Response,
     activity_id: str,
-    token: str = Depends(security),
+    user_id: str = Depends(current_user_id),
     session: Session = Depends(get_session),
 ):
     """Segmente une activite specifique (accepte UUID ou strava_id)."""
-    user_id = get_current_user_id(token.credentials)
 
     activity = resolve_activity(session, activity_id, user_id)
     if not activity:
@@ -62,92 +149,113 @@ async def process_activity_segments(
 
     try:
         count = segmentation_service.segment_activity(session, activity)
-        return {"activity_id": str(activity.id), "segments_created": count}
+        cache_delete(_segment_status_key(user_id))
+        return {"activity_id": activity.id, "segments_created": count}
     except Exception as e:
-        logger.error(f"Erreur segmentation activite {activity_id}: {e}")
+        logger.error("Erreur segmentation activite %s: %s", activity_id, e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erreur lors de la segmentation: {str(e)}",
         )
 
 
-@router.get("/segments/status")
-async def get_segmentation_status(
-    token: str = Depends(security),
+@router.get("/segments/status", response_model=SegmentationStatus)
+def get_segmentation_status(
+    user_uuid: UUID = Depends(current_user_uuid),
     session: Session = Depends(get_session),
 ):
     """Retourne le statut de segmentation pour l'utilisateur."""
-    user_id = get_current_user_id(token.credentials)
-
-    total_activities = session.exec(
-        select(func.count(Activity.id)).where(Activity.user_id == user_id)
-    ).one()
 
-    enriched_activities = session.exec(
-        select(func.count(Activity.id)).where(
-            Activity.user_id == user_id,
-            Activity.streams_data.is_not(None),
-        )
-    ).one()
-
-    segmented_activities = session.exec(
-        select(func.count(func.distinct(Segment.activity_id))).where(
-            Segment.user_id == user_id
-        )
+    cached = cache_get_json(_segment_status_key(user_uuid))
+    if cached is not None:
+        return cached
+
+    # Les quatre compteurs en un seul aller-retour : agregats conditionnels
+    # sur Activity, sous-requetes scalaires pour Segment
+    # lambda_stmt : requete construite une fois, seul user_uuid est relie
+    total_activities, enriched_activities, segmented_activities, total_segments = session.execute(
+        lambda_stmt(lambda: select(
+            func.count(Activity.id),
+            func.count(Activity.id).filter(Activity.streams_data.is_not(None)),
+            select(func.count(func.distinct(Segment.activity_id)))
+            .where(Segment.user_id == user_uuid)
+            .scalar_subquery(),
+            select(func.count(Segment.id))
+            .where(Segment.user_id == user_uuid)
+            .scalar_subquery(),
+        ).where(Activity.user_id == user_uuid))
     ).one()
 
-    total_segments = session.exec(
-        select(func.count(Segment.id)).where(Segment.user_id == user_id)
-    ).one()
-
-    return {
+    result = {
         "total_activities": total_activities,
         "enriched_activities": enriched_activities,
         "segmented_activities": segmented_activities,
         "pending_segmentation": enriched_activities - segmented_activities,
         "total_segments": total_segments,
     }
+    cache_set_json(_segment_status_key(user_uuid), result, STATUS_CACHE_TTL_S)
+    return result
 
 
-@router.get("/segments/{activity_id}")
-async def get_activity_segments(
+@router.api_route("/segments/{activity_id}", methods=["GET", "HEAD"])
+def get_activity_segments(
+    request: Request,
     activity_id: str,
-    token: str = Depends(security),
+    user_id: str = Depends(current_user_id),
     session: Session = Depends(get_session),
 ):
     """Retourne les segments d'une activite avec leurs features (accepte UUID ou strava_id)."""
-    user_id = get_current_user_id(token.credentials)
 
-    activity = resolve_activity(session, activity_id, user_id)
-    if not activity:
+    activity_ref = activity_id_subquery(activity_id, user_id)
+    version = None
+    if activity_ref is not None:
+        # Segments et features ne changent qu'avec Activity.updated_at
+        # (re-segmentation, recalcul des features) : ETag derive de la seule
+        # ligne d'activite, le client a jour n'entraine pas la jointure
+        version = session.exec(
+            select(Activity.id, Activity.updated_at).where(Activity.id == activity_ref)
+        ).first()
+    if version is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Activite non trouvee",
         )
 
+    resolved_id, updated_at = version
+    digest = hashlib.blake2b(
+        f"{resolved_id}:{updated_at.isoformat()}".encode(), digest_size=16
+    ).hexdigest()
+    if etag_matches(request, f'W/"{digest}"'):
+        return not_modified_response(f'W/"{digest}"')
+
+    # Segments et features en une seule requete : relation 1:1 chargee par
+    # jointure (joinedload) plutot que par une seconde requete (selectinload)
     segments = session.exec(
         select(Segment)
-        .where(Segment.activity_id == activity.id)
+        .options(joinedload(Segment.features))
+        .where(Segment.activity_id == resolved_id)
         .order_by(Segment.segment_index)
     ).all()
 
-    # Recuperer les features pour chaque segment
-    result = []
-    for seg in segments:
-        features = session.exec(
-            select(SegmentFeatures).where(SegmentFeatures.segment_id == seg.id)
-        ).first()
-
-        result.append({
-            "segment": SegmentRead.model_validate(seg),
-            "features": SegmentFeaturesRead.model_validate(features) if features else None,
-        })
-
-    return {
-        "activity_id": str(activity.id),
-        "segment_count": len(result),
-        "segments": result,
-    }
+    result = [
+        {
+            "segment": SegmentRead.model_validate(seg).model_dump(mode="json"),
+            "features": SegmentFeaturesRead.model_validate(seg.features).model_dump(mode="json") if seg.features else None,
+        }
+        for seg in segments
+    ]
+
+    # Deja serialise par pydantic : ORJSONResponse evite le passage de
+    # jsonable_encoder sur chaque segment
+    return etag_json_response(
+        request,
+        {
+            "activity_id": str(resolved_id),
+            "segment_count": len(result),
+            "segments": result,
+        },
+        digest=digest,
+    )
 
 
 # ──────────────────────────────────────────────
@@ -155,85 +263,117 @@ async def get_activity_segments(
 # ──────────────────────────────────────────────
 
 
-@router.get("/weather/{activity_id}")
-async def get_activity_weather(
+@router.get("/weather/status", response_model=WeatherStatus)
+def get_weather_status(
+    user_uuid: UUID = Depends(current_user_uuid),
+    session: Session = Depends(get_session),
+):
+    """Retourne le statut d'enrichissement meteo pour l'utilisateur."""
+
+    cached = cache_get_json(_weather_status_key(user_uuid))
+    if cached is not None:
+        return cached
+
+    # Les trois compteurs en un seul aller-retour : jointure externe sur la
+    # meteo (au plus une ligne par activite, activity_id est unique)
+    total_activities, with_streams, with_weather = session.execute(
+        lambda_stmt(lambda: select(
+            func.count(Activity.id),
+            func.count(Activity.id).filter(Activity.streams_data.is_not(None)),
+            func.count(ActivityWeather.id),
+        )
+        .select_from(Activity)
+        .outerjoin(ActivityWeather, ActivityWeather.activity_id == Activity.id)
+        .where(Activity.user_id == user_uuid))
+    ).one()
+
+    result = {
+        "total_activities": total_activities,
+        "with_streams": with_streams,
+        "with_weather": with_weather,
+        "pending_weather": with_streams - with_weather,
+    }
+    cache_set_json(_weather_status_key(user_uuid), result, STATUS_CACHE_TTL_S)
+    return result
+
+
+@router.api_route("/weather/{activity_id}", methods=["GET", "HEAD"], response_model=ActivityWeatherRead)
+def get_activity_weather(
+    request: Request,
     activity_id: str,
-    token: str = Depends(security),
+    user_id: str = Depends(current_user_id),
     session: Session = Depends(get_session),
 ):
     """Retourne les donnees meteo d'une activite (accepte UUID ou strava_id)."""
-    user_id = get_current_user_id(token.credentials)
 
-    activity = resolve_activity(session, activity_id, user_id)
-    if not activity:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Activite non trouvee",
-        )
+    activity_ref = activity_id_subquery(activity_id, user_id)
 
-    weather = session.exec(
-        select(ActivityWeather).where(ActivityWeather.activity_id == activity.id)
-    ).first()
+    # Meteo ecrite une seule fois par activite : son id sert d'ETag, le
+    # client a jour ne lit que cette colonne
+    if activity_ref is not None and request.headers.get("if-none-match"):
+        weather_id = session.exec(
+            select(ActivityWeather.id).where(ActivityWeather.activity_id == activity_ref)
+        ).first()
+        if weather_id and etag_matches(request, f'W/"{weather_id.hex}"'):
+            return not_modified_response(f'W/"{weather_id.hex}"')
+
+    weather = None
+    if activity_ref is not None:
+        weather = session.exec(
+            select(ActivityWeather).where(ActivityWeather.activity_id == activity_ref)
+        ).first()
     if not weather:
+        if activity_ref is None or session.exec(select(activity_ref)).one() is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Activite non trouvee",
+            )
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Donnees meteo non disponibles pour cette activite",
         )
 
-    return ActivityWeatherRead.model_validate(weather)
+    return etag_json_response(
+        request,
+        ActivityWeatherRead.model_validate(weather).model_dump(mode="json"),
+        digest=weather.id.hex,
+    )
 
 
-@router.post("/weather/enrich")
-async def enrich_all_activities_weather(
-    token: str = Depends(security),
-    session: Session = Depends(get_session),
-):
-    """Enrichit toutes les activites de l'utilisateur avec les donnees meteo."""
-    user_id = get_current_user_id(token.credentials)
-    try:
-        result = await weather_service.enrich_all_weather(session, user_id)
-        return result
-    except Exception as e:
-        logger.error(f"Erreur enrichissement meteo user {user_id}: {e}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Erreur lors de l'enrichissement meteo: {str(e)}",
-        )
+async def _enrich_all_weather_job(user_uuid: UUID):
+    with Session(engine) as session:
+        result = await weather_service.enrich_all_weather(session, user_uuid)
+    cache_delete(_weather_status_key(user_uuid))
+    return result
 
 
-@router.get("/weather/status")
-async def get_weather_status(
-    token: str = Depends(security),
-    session: Session = Depends(get_session),
+@router.post("/weather/enrich", status_code=status.HTTP_202_ACCEPTED, response_model=TaskAccepted)
+@compute_limit
+def enrich_all_activities_weather(
+    request: Request,
+    response: Response,
+    background_tasks: BackgroundTasks,
+    user_uuid: UUID = Depends(current_user_uuid),
 ):
-    """Retourne le statut d'enrichissement meteo pour l'utilisateur."""
-    user_id = get_current_user_id(token.credentials)
+    """Lance en tache de fond l'enrichissement meteo de toutes les activites (suivi : GET /tasks/{task_id})."""
+    job = _start_exclusive_job(user_uuid, "weather_enrich", "Enrichissement meteo deja en cours")
+    background_tasks.add_task(jobs.run_job_async, job, _enrich_all_weather_job, user_uuid)
+    return {"task_id": job["task_id"], "status": job["status"]}
 
-    total_activities = session.exec(
-        select(func.count(Activity.id)).where(Activity.user_id == user_id)
-    ).one()
-
-    with_streams = session.exec(
-        select(func.count(Activity.id)).where(
-            Activity.user_id == user_id,
-            Activity.streams_data.is_not(None),
-        )
-    ).one()
 
-    with_weather = session.exec(
-        select(func.count(ActivityWeather.id)).where(
-            ActivityWeather.activity_id.in_(
-                select(Activity.id).where(Activity.user_id == user_id)
-            )
+@router.get("/tasks/{task_id}", response_model=TaskStatus, response_model_exclude_none=True)
+def get_task_status(
+    task_id: str,
+    user_id: str = Depends(current_user_id),
+):
+    """Etat d'un traitement lance en tache de fond (queued, running, succeeded, failed)."""
+    job = jobs.get_job(task_id, user_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Tache inconnue ou expiree",
         )
-    ).one()
-
-    return {
-        "total_activities": total_activities,
-        "with_streams": with_streams,
-        "with_weather": with_weather,
-        "pending_weather": with_streams - with_weather,
-    }
+    return job
 
 
 # ──────────────────────────────────────────────
@@ -241,39 +381,37 @@ async def get_weather_status(
 # ──────────────────────────────────────────────
 
 
-@router.post("/features/compute")
-async def compute_all_features(
-    token: str = Depends(security),
-    session: Session = Depends(get_session),
-):
-    """Calcule les features derivees per-segment pour toutes les activites de l'utilisateur."""
-    user_id = get_current_user_id(token.credentials)
-    try:
-        result = derived_features_service.compute_all_segment_features(session, user_id)
-        return result
-    except Exception as e:
-        logger.error(f"Erreur features derivees user {user_id}: {e}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Erreur lors du calcul des features: {str(e)}",
-        )
+def _compute_all_features_job(user_uuid: UUID):
+    with Session(engine) as session:
+        return derived_features_service.compute_all_segment_features(session, user_uuid)
 
 
-@router.post("/features/compute/{activity_id}")
-async def compute_activity_features(
-    activity_id: UUID,
-    token: str = Depends(security),
+@router.post("/features/compute", status_code=status.HTTP_202_ACCEPTED, response_model=TaskAccepted)
+@compute_limit
+def compute_all_features(
+    request: Request,
+    response: Response,
+    user_uuid: UUID = Depends(current_user_uuid),
+):
+    """Lance sur la file CPU le calcul des features derivees de toutes les activites (suivi : GET /tasks/{task_id})."""
+    job = _start_exclusive_job(user_uuid, "features_compute", "Calcul des features deja en cours")
+    accepted = {"task_id": job["task_id"], "status": job["status"]}
+    jobs.submit_cpu_job(job, _compute_all_features_job, user_uuid)
+    return accepted
+
+
+@router.post("/features/compute/{activity_id}", response_model=FeatureComputeResult, response_model_exclude_unset=True)
+@compute_limit
+def compute_activity_features(
+    request: Request,
+    response: Response,
+    activity_id: str,
+    user_id: str = Depends(current_user_id),
     session: Session = Depends(get_session),
 ):
-    """Calcule les features derivees per-segment pour une activite specifique."""
-    user_id = get_current_user_id(token.credentials)
+    """Calcule les features derivees per-segment pour une activite specifique (accepte UUID ou strava_id)."""
 
-    activity = session.exec(
-        select(Activity).where(
-            Activity.id == activity_id,
-            Activity.user_id == user_id,
-        )
-    ).first()
+    activity = resolve_activity(session, activity_id, user_id)
     if not activity:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -281,10 +419,12 @@ async def compute_activity_features(
         )
 
     try:
-        count = derived_features_service.compute_segment_features(session, activity_id)
-        return {"activity_id": str(activity_id), "segments_updated": count}
+        count = derived_features_service.compute_segment_features_if_changed(session, activity)
+        if count is None:
+            return {"activity_id": activity.id, "segments_updated": 0, "cached": True}
+        return {"activity_id": activity.id, "segments_updated": count}
     except Exception as e:
-        logger.error(f"Erreur features derivees activite {activity_id}: {e}")
+        logger.error("Erreur features derivees activite %s: %s", activity_id, e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erreur lors du calcul des features: {str(e)}",
@@ -296,56 +436,59 @@ async def compute_activity_features(
 # ──────────────────────────────────────────────
 
 
-@router.get("/training-load")
-async def get_training_load(
+@router.get("/training-load", response_model=List[TrainingLoadRead])
+def get_training_load(
     date_from: Optional[date_type] = Query(None),
     date_to: Optional[date_type] = Query(None),
-    token: str = Depends(security),
+    user_uuid: UUID = Depends(current_user_uuid),
     session: Session = Depends(get_session),
 ):
     """Retourne les donnees de training load pour l'utilisateur sur une plage de dates."""
-    user_id = get_current_user_id(token.credentials)
 
     # Assurer le calcul des donnees si manquantes
     try:
-        derived_features_service.ensure_training_load_for_range(session, user_id, date_from, date_to)
+        derived_features_service.ensure_training_load_for_range(session, user_uuid, date_from, date_to)
     except Exception as e:
-        logger.error(f"Erreur ensure training load user {user_id}: {e}")
+        logger.error("Erreur ensure training load user %s: %s", user_uuid, e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erreur lors du calcul du training load: {str(e)}",
         )
 
-    query = select(TrainingLoad).where(TrainingLoad.user_id == user_id)
+    query = select(TrainingLoad).where(TrainingLoad.user_id == user_uuid)
     if date_from:
         query = query.where(TrainingLoad.date >= date_from)
     if date_to:
         query = query.where(TrainingLoad.date <= date_to)
     query = query.order_by(TrainingLoad.date)
 
-    rows = session.exec(query).all()
-    return [TrainingLoadRead.model_validate(r) for r in rows]
+    # Lecture par lots (yield_per) : les lignes sont converties en dicts au
+    # fil de l'eau sans materialiser toute la liste d'entites au prealable
+    rows = session.exec(query.execution_options(yield_per=TRAINING_LOAD_READ_BATCH_SIZE))
+    return ORJSONResponse(content=[TrainingLoadRead.model_validate(r).model_dump(mode="json") for r in rows])
 
 
-@router.post("/training-load/compute")
-async def compute_training_load(
+@router.post("/training-load/compute", response_model=TrainingLoadComputeResult)
+@compute_limit
+def compute_training_load(
+    request: Request,
+    response: Response,
     date_from: Optional[date_type] = Query(None),
     date_to: Optional[date_type] = Query(None),
-    token: str = Depends(security),
+    user_uuid: UUID = Depends(current_user_uuid),
     session: Session = Depends(get_session),
 ):
     """Calcule CTL/ATL/TSB pour l'utilisateur. Defaut : 90 derniers jours jusqu'a aujourd'hui."""
-    user_id = get_current_user_id(token.credentials)
 
     today = date_type.today()
     d_from = date_from or (today - timedelta(days=90))
     d_to = date_to or today
 
     try:
-        days = derived_features_service.compute_training_load(session, user_id, d_from, d_to)
-        return {"days_computed": days, "date_from": str(d_from), "date_to": str(d_to)}
+        days = derived_features_service.compute_training_load(session, user_uuid, d_from, d_to)
+        return {"days_computed": days, "date_from": d_from, "date_to": d_to}
     except Exception as e:
-        logger.error(f"Erreur training load user {user_id}: {e}")
+        logger.error("Erreur training load user %s: %s", user_uuid, e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erreur lors du calcul du training load: {str(e)}",
@@ -50,6 +50,9 @@ class GoogleOAuthManager:
         logger.info(f"  - Client Secret: {'✓ configuré' if self.client_secret else '✗ manquant'}")
         logger.info(f"  - Redirect URI: {self.redirect_uri}")
         
+        # L'URL d'autorisation ne depend que de la configuration : calculee une fois
+        self.authorization_url = self._build_authorization_url()
+        
         # Encryption pour les tokens stockés
         self.encryption_key = settings.ENCRYPTION_KEY
         if self.encryption_key:
@@ -63,16 +66,8 @@ class GoogleOAuthManager:
             logger.error("  - Encryption: ✗ ENCRYPTION_KEY manquante")
             self.cipher = None
     
-    def get_authorization_url(self, state: Optional[str] = None) -> str:
-        """
-        Génère l'URL d'autorisation Google
-        
-        Args:
-            state: Paramètre d'état optionnel pour la sécurité
-            
-        Returns:
-            URL d'autorisation Google
-        """
+    def _build_authorization_url(self) -> str:
+        """Construit l'URL d'autorisation Google sans state (constante pour l'instance)"""
         base_auth_url = f"{self.base_url}/o/oauth2/v2/auth"
         
         params = {
@@ -84,12 +79,23 @@ class GoogleOAuthManager:
             "prompt": "consent"
         }
         
-        if state:
-            params["state"] = state
-        
         query_string = "&".join([f"{k}={v}" for k, v in params.items()])
         return f"{base_auth_url}?{query_string}"
     
+    def get_authorization_url(self, state: Optional[str] = None) -> str:
+        """
+        Génère l'URL d'autorisation Google
+        
+        Args:
+            state: Paramètre d'état optionnel pour la sécurité
+            
+        Returns:
+            URL d'autorisation Google
+        """
+        if state:
+            return f"{self.authorization_url}&state={state}"
+        return self.authorization_url
+    
     def exchange_code_for_tokens(self, code: str) -> GoogleTokens:
         """
         Échange le code d'autorisation contre les tokens d'accès
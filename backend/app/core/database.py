@@ -1,16 +1,43 @@
 """
 Configuration de la base de données avec SQLModel
 """
+import orjson
 from sqlmodel import create_engine, SQLModel, Session
 from app.core.settings import get_settings
 
 settings = get_settings()
 
+# Session PostgreSQL en UTC : les datetime naïfs (datetime.utcnow()) écrits dans
+# les colonnes TIMESTAMPTZ sont ainsi interprétés comme de l'UTC
+connect_args = {}
+pool_args = {}
+if settings.DATABASE_URL.startswith("postgresql"):
+    connect_args["options"] = "-c timezone=utc"
+    # Les routes synchrones tournent dans le threadpool FastAPI (40 threads) :
+    # pool + overflow le couvrent, pour ne pas finir en timeout QueuePool
+    pool_args = {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+    }
+
+
+def _json_dumps(value) -> str:
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
 # Créer l'engine de base de données
+# Colonnes JSON (streams, laps : plusieurs milliers de points par activité)
+# encodées et décodées par orjson plutôt que par le module json standard
 engine = create_engine(
     settings.DATABASE_URL,
     echo=settings.DEBUG,
-    pool_pre_ping=True
+    pool_pre_ping=True,
+    connect_args=connect_args,
+    json_serializer=_json_dumps,
+    json_deserializer=orjson.loads,
+    **pool_args,
 )
 
 
@@ -20,6 +47,11 @@ def create_db_and_tables():
 
 
 def get_session():
-    """Générateur de session de base de données pour l'injection de dépendance"""
+    """Générateur de session de base de données pour l'injection de dépendance.
+
+    La session est synchrone : les routes qui l'utilisent sans rien attendre
+    (await) sont déclarées en ``def`` pour que FastAPI les exécute dans son
+    threadpool au lieu de bloquer la boucle d'événements.
+    """
     with Session(engine) as session:
         yield session 
\ No newline at end of file
@@ -0,0 +1,133 @@
+"""
+Travaux de fond lancés par l'API (segmentation, météo, features en masse).
+La route répond immédiatement avec un identifiant de travail ; le travail
+s'exécute après la réponse (BackgroundTasks, ou file CPU dédiée pour les
+calculs) et son état est conservé dans Redis pour GET /tasks/{task_id}.
+"""
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional
+from uuid import uuid4
+
+import orjson
+import redis
+
+from app.core.redis import cache_delete, cache_get_json, cache_set_json, get_redis_client, try_lock
+
+logger = logging.getLogger(__name__)
+
+# Durée de conservation de l'état d'un travail terminé
+JOB_TTL_S = 24 * 3600
+
+# Durée maximale d'un verrou de travail exclusif : libéré en fin de travail,
+# l'expiration ne sert qu'en cas d'arrêt du processus en cours de route
+JOB_LOCK_TTL_S = 30 * 60
+
+# File dédiée aux calculs numériques (features dérivées). Ces calculs sont
+# en Python pur et partagent le GIL avec la boucle d'événements et le
+# threadpool des requêtes : un seul thread, pour qu'il n'y ait jamais plus
+# d'un calcul en concurrence avec le service des requêtes ; les travaux
+# suivants attendent leur tour dans la file
+_cpu_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cpu-jobs")
+
+
+class JobStoreUnavailableError(Exception):
+    """L'état du travail n'a pas pu être enregistré (Redis indisponible)."""
+
+
+def _job_key(job_id: str) -> str:
+    return f"job:{job_id}"
+
+
+def _lock_key(user_id: str, kind: str) -> str:
+    return f"lock:{kind}:{user_id}"
+
+
+def _save(job: Dict[str, Any], **fields: Any) -> None:
+    job.update(fields, updated_at=datetime.now(timezone.utc).isoformat())
+    cache_set_json(_job_key(job["task_id"]), job, JOB_TTL_S)
+
+
+def create_job(user_id: str, kind: str) -> Dict[str, Any]:
+    """Enregistre un travail en attente pour l'utilisateur.
+
+    Lève JobStoreUnavailableError si l'état ne peut pas être enregistré : le
+    task_id renvoyé au client serait introuvable via GET /tasks/{task_id}.
+    Les transitions suivantes (running, succeeded...) restent au mieux.
+    """
+    job = {
+        "task_id": uuid4().hex,
+        "kind": kind,
+        "user_id": user_id,
+        "status": "queued",
+        "updated_at": datetime.now(timezone.utc).isoformat(),
+    }
+    try:
+        get_redis_client().setex(_job_key(job["task_id"]), JOB_TTL_S, orjson.dumps(job))
+    except redis.RedisError as exc:
+        logger.error("Travail %s non enregistré (Redis indisponible): %s", kind, exc)
+        raise JobStoreUnavailableError(kind) from exc
+    return job
+
+
+def create_exclusive_job(user_id: str, kind: str) -> Optional[Dict[str, Any]]:
+    """Comme create_job, mais None si un travail de ce type tourne déjà pour l'utilisateur.
+
+    Le verrou est libéré à la fin de l'exécution (run_job / run_job_async).
+    """
+    if not try_lock(_lock_key(user_id, kind), JOB_LOCK_TTL_S):
+        return None
+    try:
+        job = create_job(user_id, kind)
+    except JobStoreUnavailableError:
+        cache_delete(_lock_key(user_id, kind))
+        raise
+    job["exclusive"] = True
+    return job
+
+
+def _release(job: Dict[str, Any]) -> None:
+    if job.get("exclusive"):
+        cache_delete(_lock_key(job["user_id"], job["kind"]))
+
+
+def get_job(job_id: str, user_id: str) -> Optional[Dict[str, Any]]:
+    """État d'un travail ; None s'il est inconnu, expiré ou appartient à un autre utilisateur."""
+    job = cache_get_json(_job_key(job_id))
+    if job is None or job.get("user_id") != user_id:
+        return None
+    return job
+
+
+def run_job(job: Dict[str, Any], fn: Callable[..., Any], *args: Any) -> None:
+    """Exécute un travail synchrone (threadpool) en suivant son état."""
+    _save(job, status="running")
+    try:
+        result = fn(*args)
+    except Exception as exc:
+        logger.exception("Travail %s (%s) en échec", job["task_id"], job["kind"])
+        _save(job, status="failed", error=str(exc))
+        return
+    finally:
+        _release(job)
+    _save(job, status="succeeded", result=result)
+
+
+async def run_job_async(job: Dict[str, Any], fn: Callable[..., Awaitable[Any]], *args: Any) -> None:
+    """Exécute un travail asynchrone (boucle d'événements) en suivant son état."""
+    _save(job, status="running")
+    try:
+        result = await fn(*args)
+    except Exception as exc:
+        logger.exception("Travail %s (%s) en échec", job["task_id"], job["kind"])
+        _save(job, status="failed", error=str(exc))
+        return
+    finally:
+        _release(job)
+    _save(job, status="succeeded", result=result)
+
+
+def submit_cpu_job(job: Dict[str, Any], fn: Callable[..., Any], *args: Any) -> Future:
+    """Planifie un travail de calcul sur la file CPU dédiée."""
+    return _cpu_executor.submit(run_job, job, fn, *args)
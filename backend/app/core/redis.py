@@ -1,10 +1,12 @@
 """
 Client Redis pour athletIQ.
-Fournit une connexion partagée et un health check.
+Fournit une connexion partagée, un health check et un petit cache JSON.
 """
 import logging
 from functools import lru_cache
+from typing import Any, Optional
 
+import orjson
 import redis
 
 from app.core.settings import get_settings
@@ -30,3 +32,42 @@ def check_redis_health() -> bool:
     except Exception as exc:
         logger.warning(f"Redis health check échoué: {exc}")
         return False
+
+
+def cache_get_json(key: str) -> Optional[Any]:
+    """Lit une valeur JSON en cache. None si absente ou si Redis est indisponible."""
+    try:
+        raw = get_redis_client().get(key)
+    except redis.RedisError as exc:
+        logger.debug("Cache Redis indisponible (lecture %s): %s", key, exc)
+        return None
+    return orjson.loads(raw) if raw is not None else None
+
+
+def cache_set_json(key: str, value: Any, ttl_s: int) -> None:
+    """Met une valeur JSON en cache pour ttl_s secondes (sans effet si Redis est indisponible)."""
+    try:
+        get_redis_client().setex(key, ttl_s, orjson.dumps(value))
+    except redis.RedisError as exc:
+        logger.debug("Cache Redis indisponible (ecriture %s): %s", key, exc)
+
+
+def cache_delete(*keys: str) -> None:
+    """Invalide des entrées du cache (sans effet si Redis est indisponible)."""
+    try:
+        get_redis_client().delete(*keys)
+    except redis.RedisError as exc:
+        logger.debug("Cache Redis indisponible (invalidation %s): %s", keys, exc)
+
+
+def try_lock(key: str, ttl_s: int) -> bool:
+    """Pose un verrou (SET NX EX). False s'il est déjà tenu.
+
+    Redis indisponible : le verrou est considéré acquis, la déduplication est
+    perdue mais le traitement n'est pas bloqué.
+    """
+    try:
+        return bool(get_redis_client().set(key, "1", nx=True, ex=ttl_s))
+    except redis.RedisError as exc:
+        logger.debug("Redis indisponible (verrou %s): %s", key, exc)
+        return True
@@ -15,6 +15,22 @@ class Settings(BaseSettings):
     DATABASE_URL: str = Field(
         description="URL de la base de données (PostgreSQL en production)"
     )
+    DB_POOL_SIZE: int = Field(
+        default=20,
+        description="Connexions PostgreSQL gardées ouvertes dans le pool"
+    )
+    DB_MAX_OVERFLOW: int = Field(
+        default=20,
+        description="Connexions supplémentaires au-delà du pool (pool + overflow = threadpool FastAPI, 40)"
+    )
+    DB_POOL_TIMEOUT: int = Field(
+        default=30,
+        description="Attente maximale (s) d'une connexion libre avant erreur"
+    )
+    DB_POOL_RECYCLE: int = Field(
+        default=1800,
+        description="Durée de vie maximale (s) d'une connexion avant recyclage"
+    )
     
     # JWT Configuration
     JWT_SECRET_KEY: str = Field(
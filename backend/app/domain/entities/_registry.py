@@ -0,0 +1,27 @@
+"""
+Registre des tables SQLModel
+Importe uniquement les modules d'entités pour peupler SQLModel.metadata
+(utilisé par Alembic), sans charger la couche services.
+"""
+import importlib
+
+from sqlmodel import SQLModel
+
+# Modules déclarant des tables (table=True), dans l'ordre des dépendances FK
+ENTITY_MODULES = (
+    "user",
+    "activity",
+    "workout_plan",
+    "enrichment_queue",
+    "segment",
+    "segment_features",
+    "activity_weather",
+    "garmin_daily",
+    "training_load",
+    "fit_metrics",
+)
+
+for _module in ENTITY_MODULES:
+    importlib.import_module(f"{__package__}.{_module}")
+
+metadata = SQLModel.metadata
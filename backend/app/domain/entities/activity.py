@@ -9,12 +9,34 @@ from typing import Optional, List, Dict, Any, TYPE_CHECKING
 from datetime import datetime
 from uuid import UUID, uuid4
 from enum import Enum
+import zlib
 
 if TYPE_CHECKING:
     from .user import User
     from .workout_plan import WorkoutPlan
 
 
+class CompressedText(sa.TypeDecorator):
+    """Texte stocké compressé (zlib) en BYTEA, exposé en str côté Python.
+
+    Utilisé pour les polylines encodées : plusieurs Ko d'ASCII par activité.
+    """
+    impl = sa.LargeBinary
+    cache_ok = True
+
+    COMPRESSION_LEVEL = 6
+
+    def process_bind_param(self, value: Optional[str], dialect) -> Optional[bytes]:
+        if value is None:
+            return None
+        return zlib.compress(value.encode("utf-8"), self.COMPRESSION_LEVEL)
+
+    def process_result_value(self, value: Optional[bytes], dialect) -> Optional[str]:
+        if value is None:
+            return None
+        return zlib.decompress(value).decode("utf-8")
+
+
 class ActivitySource(str, Enum):
     """Source de l'activité"""
     STRAVA = "strava"
@@ -50,6 +72,17 @@ class ActivityBase(SQLModel):
 
 class Activity(ActivityBase, table=True):
     """Entité Activity complète pour la base de données"""
+    __table_args__ = (
+        # Listes et bornes par utilisateur, triées par date
+        sa.Index("ix_activity_user_id_start_date", "user_id", "start_date"),
+        # Activités enrichies (streams présents) d'un utilisateur : statuts,
+        # segmentation et météo en masse
+        sa.Index(
+            "ix_activity_user_id_enriched", "user_id",
+            postgresql_where=sa.text("streams_data IS NOT NULL"),
+        ),
+    )
+
     id: Optional[UUID] = Field(default_factory=uuid4, primary_key=True)
     user_id: UUID = Field(foreign_key="user.id")
     
@@ -91,11 +124,13 @@ class Activity(ActivityBase, table=True):
     weighted_average_watts: Optional[float] = None
     kilojoules: Optional[float] = None
 
-    # Données GPS
-    start_latlng: Optional[List] = Field(sa_column=Column(JSON), default=None)
-    end_latlng: Optional[List] = Field(sa_column=Column(JSON), default=None)
-    summary_polyline: Optional[str] = Field(sa_column=Column(sa.Text), default=None)
-    polyline: Optional[str] = Field(sa_column=Column(sa.Text), default=None)
+    # Données GPS (points de départ / d'arrivée en degrés)
+    start_lat: Optional[float] = None
+    start_lon: Optional[float] = None
+    end_lat: Optional[float] = None
+    end_lon: Optional[float] = None
+    summary_polyline: Optional[str] = Field(sa_column=Column(CompressedText), default=None)
+    polyline: Optional[str] = Field(sa_column=Column(CompressedText), default=None)
 
     # Métadonnées
     gear_id: Optional[str] = None
@@ -103,6 +138,10 @@ class Activity(ActivityBase, table=True):
     location_country: Optional[str] = None
     timezone: Optional[str] = None
 
+    # Empreinte des segments ayant servi au dernier calcul des features
+    # dérivées : un recalcul sur les mêmes segments est évité
+    features_input_hash: Optional[str] = Field(default=None, max_length=32)
+
     # Timestamps
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
@@ -134,8 +173,10 @@ class ActivityCreate(ActivityBase):
     weighted_average_watts: Optional[float] = None
     kilojoules: Optional[float] = None
     # Données GPS
-    start_latlng: Optional[List] = None
-    end_latlng: Optional[List] = None
+    start_lat: Optional[float] = None
+    start_lon: Optional[float] = None
+    end_lat: Optional[float] = None
+    end_lon: Optional[float] = None
     summary_polyline: Optional[str] = None
 
 
@@ -2,7 +2,8 @@
 Entité ActivityWeather - Domain Layer
 Données météo associées à une activité (source : Open-Meteo).
 """
-from sqlmodel import SQLModel, Field
+from sqlmodel import SQLModel, Field, Column
+from sqlalchemy import DateTime
 from typing import Optional
 from uuid import UUID, uuid4
 from datetime import datetime
@@ -11,7 +12,7 @@ from datetime import datetime
 class ActivityWeather(SQLModel, table=True):
     """Données météo pour une activité, une entrée par activité."""
     id: Optional[UUID] = Field(default_factory=uuid4, primary_key=True)
-    activity_id: UUID = Field(foreign_key="activity.id", unique=True, index=True)
+    activity_id: UUID = Field(foreign_key="activity.id", unique=True)
 
     # Conditions météo
     temperature_c: Optional[float] = None
@@ -24,7 +25,7 @@ class ActivityWeather(SQLModel, table=True):
     weather_code: Optional[int] = None
 
     # Timestamps
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=datetime.utcnow, sa_column=Column(DateTime(timezone=True), nullable=False))
 
 
 class ActivityWeatherRead(SQLModel):
@@ -2,33 +2,47 @@
 Entite EnrichmentQueue - Domain Layer
 File d'attente pour l'enrichissement des activites Strava (streams, laps, segments)
 """
-from sqlmodel import SQLModel, Field
+from sqlmodel import SQLModel, Field, Index, Column
+from sqlalchemy import SmallInteger, text, DateTime
 from typing import Optional
 from datetime import datetime
 from uuid import UUID, uuid4
-from enum import Enum
+from enum import IntEnum
 
 
-class EnrichmentStatus(str, Enum):
-    """Statuts possibles d'un item dans la queue"""
-    PENDING = "pending"
-    IN_PROGRESS = "in_progress"
-    COMPLETED = "completed"
-    FAILED = "failed"
+class EnrichmentStatus(IntEnum):
+    """Statuts possibles d'un item dans la queue (stockés en SMALLINT)"""
+    PENDING = 0
+    IN_PROGRESS = 1
+    COMPLETED = 2
+    FAILED = 3
 
 
 class EnrichmentQueue(SQLModel, table=True):
     """Table enrichment_queue pour gerer la file d'attente d'enrichissement"""
     __tablename__ = "enrichment_queue"
+    __table_args__ = (
+        # Index partiel sur les seuls items actifs, pour le poll du scheduler
+        Index(
+            "ix_enrichment_queue_hot",
+            "user_id", "priority", "created_at",
+            postgresql_where=text(
+                f"status IN ({EnrichmentStatus.PENDING.value}, {EnrichmentStatus.IN_PROGRESS.value})"
+            ),
+        ),
+    )
 
     id: Optional[UUID] = Field(default_factory=uuid4, primary_key=True)
     activity_id: UUID = Field(foreign_key="activity.id", index=True)
     user_id: UUID = Field(foreign_key="user.id", index=True)
-    priority: int = Field(default=0, index=True)
-    status: EnrichmentStatus = Field(default=EnrichmentStatus.PENDING, index=True)
+    priority: int = Field(default=0)
+    status: EnrichmentStatus = Field(
+        default=EnrichmentStatus.PENDING,
+        sa_column=Column(SmallInteger, nullable=False, server_default="0"),
+    )
     attempts: int = Field(default=0)
     max_attempts: int = Field(default=3)
     last_error: Optional[str] = None
-    next_retry_at: Optional[datetime] = Field(default=None)
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    next_retry_at: Optional[datetime] = Field(default=None, sa_column=Column(DateTime(timezone=True)))
+    created_at: datetime = Field(default_factory=datetime.utcnow, sa_column=Column(DateTime(timezone=True), nullable=False))
+    updated_at: datetime = Field(default_factory=datetime.utcnow, sa_column=Column(DateTime(timezone=True), nullable=False))
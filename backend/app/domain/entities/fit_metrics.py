@@ -5,7 +5,10 @@ Contient les métriques session (moyennes/totaux) et métadonnées.
 Les streams par seconde sont stockés dans activity.streams_data.
 Relation 1:1 avec Activity (même pattern que ActivityWeather).
 """
-from sqlmodel import SQLModel, Field
+import hashlib
+
+from sqlmodel import SQLModel, Field, Column
+from sqlalchemy import DateTime
 from typing import Optional
 from uuid import UUID, uuid4
 from datetime import datetime
@@ -60,11 +63,14 @@ class FitMetrics(SQLModel, table=True):
 
     # Metadata
     record_count: Optional[int] = None
-    fit_downloaded_at: Optional[datetime] = None
+    fit_downloaded_at: Optional[datetime] = Field(default=None, sa_column=Column(DateTime(timezone=True)))
+    # Empreinte du contenu servi par l'API, calculée à l'enrichissement : sert
+    # d'ETag sans relire ni revalider la ligne complète
+    etag: Optional[str] = Field(default=None, max_length=32)
 
     # Timestamps
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=datetime.utcnow, sa_column=Column(DateTime(timezone=True), nullable=False))
+    updated_at: datetime = Field(default_factory=datetime.utcnow, sa_column=Column(DateTime(timezone=True), nullable=False))
 
 
 class FitMetricsRead(SQLModel):
@@ -117,3 +123,9 @@ class FitMetricsRead(SQLModel):
     # Metadata
     record_count: Optional[int]
     fit_downloaded_at: Optional[datetime]
+
+
+def compute_fit_metrics_etag(fm: FitMetrics) -> str:
+    """Empreinte blake2b de la représentation API des métriques FIT."""
+    payload = FitMetricsRead.model_validate(fm).model_dump_json().encode()
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
@@ -2,7 +2,8 @@
 Entité GarminDaily - Domain Layer
 Données physiologiques quotidiennes Garmin Connect (HRV, sommeil, stress, etc.).
 """
-from sqlmodel import SQLModel, Field, UniqueConstraint
+from sqlmodel import SQLModel, Field, UniqueConstraint, Column
+from sqlalchemy import DateTime
 from typing import Optional
 from uuid import UUID, uuid4
 from datetime import date as date_type, datetime
@@ -15,8 +16,9 @@ class GarminDaily(SQLModel, table=True):
     )
 
     id: Optional[UUID] = Field(default_factory=uuid4, primary_key=True)
-    user_id: UUID = Field(foreign_key="user.id", index=True)
-    date: date_type = Field(index=True)
+    # Index couvert par la contrainte unique (user_id, date)
+    user_id: UUID = Field(foreign_key="user.id")
+    date: date_type
 
     # Données physiologiques
     training_readiness: Optional[float] = None
@@ -41,8 +43,8 @@ class GarminDaily(SQLModel, table=True):
     training_status: Optional[str] = None
 
     # Timestamps
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=datetime.utcnow, sa_column=Column(DateTime(timezone=True), nullable=False))
+    updated_at: datetime = Field(default_factory=datetime.utcnow, sa_column=Column(DateTime(timezone=True), nullable=False))
 
 
 class GarminDailyRead(SQLModel):
@@ -2,23 +2,38 @@
 Entité Segment - Domain Layer
 Représente un segment de ~100m découpé à partir des streams_data d'une activité.
 """
-from sqlmodel import SQLModel, Field
-from typing import Optional
+from sqlmodel import SQLModel, Field, Index, Column, Relationship
+from sqlalchemy import DateTime
+from typing import Optional, TYPE_CHECKING
 from uuid import UUID, uuid4
 from datetime import datetime
 
+if TYPE_CHECKING:
+    from .segment_features import SegmentFeatures
+
 
 class Segment(SQLModel, table=True):
     """Segment de ~100m d'une activité, issu de la segmentation des streams."""
+    __table_args__ = (
+        # Lectures par activité, dans l'ordre des segments
+        Index("ix_segment_activity_id_segment_index", "activity_id", "segment_index"),
+        # Compteurs par utilisateur (segments, activites segmentees)
+        Index("ix_segment_user_id_activity_id", "user_id", "activity_id"),
+    )
+
     id: Optional[UUID] = Field(default_factory=uuid4, primary_key=True)
-    activity_id: UUID = Field(foreign_key="activity.id", index=True)
-    user_id: UUID = Field(foreign_key="user.id", index=True)
+    activity_id: UUID = Field(foreign_key="activity.id")
+    user_id: UUID = Field(foreign_key="user.id")
     segment_index: int
 
     # Métriques de distance et temps
     distance_m: float
     elapsed_time_s: float
 
+    # Colonnes NOT NULL à largeur fixe regroupées en tête de ligne, avant les
+    # colonnes nullables : PostgreSQL peut mettre leurs offsets en cache
+    created_at: datetime = Field(default_factory=datetime.utcnow, sa_column=Column(DateTime(timezone=True), nullable=False))
+
     # Terrain
     avg_grade_percent: Optional[float] = None
     elevation_gain_m: Optional[float] = None
@@ -36,8 +51,10 @@ class Segment(SQLModel, table=True):
     # Variable cible
     pace_min_per_km: Optional[float] = None
 
-    # Timestamps
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    # Relations (1:1, segmentfeatures.segment_id est unique)
+    features: Optional["SegmentFeatures"] = Relationship(
+        back_populates="segment", sa_relationship_kwargs={"uselist": False}
+    )
 
 
 class SegmentRead(SQLModel):
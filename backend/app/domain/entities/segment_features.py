@@ -3,20 +3,28 @@ Entité SegmentFeatures - Domain Layer
 Features cumulatives et dérivées calculées pour chaque segment.
 Les champs Minetti/drift/cadence_decay sont remplis à l'étape 4.
 """
-from sqlmodel import SQLModel, Field
-from typing import Optional
+from sqlmodel import SQLModel, Field, Column, Relationship
+from sqlalchemy import DateTime
+from typing import Optional, TYPE_CHECKING
 from uuid import UUID, uuid4
 from datetime import datetime
 
+if TYPE_CHECKING:
+    from .segment import Segment
+
 
 class SegmentFeatures(SQLModel, table=True):
     """Features cumulatives et dérivées associées à un segment."""
     __tablename__ = "segmentfeatures"
 
     id: Optional[UUID] = Field(default_factory=uuid4, primary_key=True)
-    segment_id: UUID = Field(foreign_key="segment.id", index=True, unique=True)
+    segment_id: UUID = Field(foreign_key="segment.id", unique=True)
     activity_id: UUID = Field(foreign_key="activity.id", index=True)
 
+    # Colonnes NOT NULL à largeur fixe regroupées en tête de ligne, avant les
+    # colonnes nullables : PostgreSQL peut mettre leurs offsets en cache
+    created_at: datetime = Field(default_factory=datetime.utcnow, sa_column=Column(DateTime(timezone=True), nullable=False))
+
     # Features cumulatives (calculées à l'étape 1)
     cumulative_distance_km: float
     elapsed_time_min: float
@@ -32,8 +40,8 @@ class SegmentFeatures(SQLModel, table=True):
     grade_variability: Optional[float] = None
     efficiency_factor: Optional[float] = None
 
-    # Timestamps
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    # Relations
+    segment: Optional["Segment"] = Relationship(back_populates="features")
 
 
 class SegmentFeaturesRead(SQLModel):
@@ -2,7 +2,8 @@
 Entité TrainingLoad - Domain Layer
 Métriques de charge d'entraînement quotidiennes (CTL, ATL, TSB, Banister).
 """
-from sqlmodel import SQLModel, Field, UniqueConstraint
+from sqlmodel import SQLModel, Field, UniqueConstraint, Column
+from sqlalchemy import DateTime
 from typing import Optional
 from uuid import UUID, uuid4
 from datetime import date as date_type, datetime
@@ -15,8 +16,9 @@ class TrainingLoad(SQLModel, table=True):
     )
 
     id: Optional[UUID] = Field(default_factory=uuid4, primary_key=True)
-    user_id: UUID = Field(foreign_key="user.id", index=True)
-    date: date_type = Field(index=True)
+    # Index couvert par la contrainte unique (user_id, date)
+    user_id: UUID = Field(foreign_key="user.id")
+    date: date_type
 
     # Métriques Banister
     ctl_42d: Optional[float] = None
@@ -33,8 +35,8 @@ class TrainingLoad(SQLModel, table=True):
     rhr_delta_7d: Optional[float] = None
 
     # Timestamps
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=datetime.utcnow, sa_column=Column(DateTime(timezone=True), nullable=False))
+    updated_at: datetime = Field(default_factory=datetime.utcnow, sa_column=Column(DateTime(timezone=True), nullable=False))
 
 
 class TrainingLoadRead(SQLModel):
@@ -4,8 +4,9 @@ Représente un utilisateur de l'application AthlétIQ
 """
 # L'import de sqlmodel apparaît en jaune probablement parce que le paquet n'est pas installé dans votre environnement Python,
 # ou bien votre IDE ne le trouve pas. Assurez-vous d'avoir installé sqlmodel avec : pip install sqlmodel
-from sqlmodel import SQLModel, Field, Relationship
-from pydantic import EmailStr, field_validator
+from sqlmodel import SQLModel, Field, Relationship, Column
+from sqlalchemy import DateTime
+from pydantic import field_validator
 from typing import Optional, List, TYPE_CHECKING
 from datetime import datetime
 from uuid import UUID, uuid4
@@ -88,7 +89,7 @@ class StravaAuthBase(SQLModel):
 class StravaAuth(StravaAuthBase, table=True):
     """Authentification Strava d'un utilisateur"""
     id: Optional[UUID] = Field(default_factory=uuid4, primary_key=True)
-    user_id: UUID = Field(foreign_key="user.id")
+    user_id: UUID = Field(foreign_key="user.id", unique=True, index=True)
     strava_athlete_id: int
     access_token_encrypted: str
     refresh_token_encrypted: str
@@ -104,7 +105,7 @@ class StravaAuth(StravaAuthBase, table=True):
 class GoogleAuth(SQLModel, table=True):
     """Authentification Google Calendar d'un utilisateur"""
     id: Optional[UUID] = Field(default_factory=uuid4, primary_key=True)
-    user_id: UUID = Field(foreign_key="user.id")
+    user_id: UUID = Field(foreign_key="user.id", unique=True, index=True)
     google_user_id: str
     access_token_encrypted: str
     refresh_token_encrypted: str
@@ -120,13 +121,13 @@ class GoogleAuth(SQLModel, table=True):
 class GarminAuth(SQLModel, table=True):
     """Authentification Garmin Connect d'un utilisateur"""
     id: Optional[UUID] = Field(default_factory=uuid4, primary_key=True)
-    user_id: UUID = Field(foreign_key="user.id", unique=True, index=True)
+    user_id: UUID = Field(foreign_key="user.id", unique=True)
     garmin_display_name: Optional[str] = None
     oauth_token_encrypted: str
-    token_created_at: datetime = Field(default_factory=datetime.utcnow)
-    last_sync_at: Optional[datetime] = None
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    token_created_at: datetime = Field(default_factory=datetime.utcnow, sa_column=Column(DateTime(timezone=True), nullable=False))
+    last_sync_at: Optional[datetime] = Field(default=None, sa_column=Column(DateTime(timezone=True)))
+    created_at: datetime = Field(default_factory=datetime.utcnow, sa_column=Column(DateTime(timezone=True), nullable=False))
+    updated_at: datetime = Field(default_factory=datetime.utcnow, sa_column=Column(DateTime(timezone=True), nullable=False))
 
     # Relations
     user: "User" = Relationship(back_populates="garmin_auth")
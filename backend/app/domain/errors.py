@@ -0,0 +1,32 @@
+"""
+Exceptions metier du domaine.
+
+Toutes derivent de DomainError, que l'application traduit en reponse HTTP
+(app.main) : seules ces erreurs exposent leur message au client, toute autre
+exception reste une 500 generique. Les erreurs de requete sont aussi des
+ValueError : le code existant qui attrape ValueError continue de fonctionner.
+"""
+
+
+class DomainError(Exception):
+    """Base des erreurs metier traduites en reponse HTTP (400 par defaut)."""
+
+
+class NotFoundError(DomainError, ValueError):
+    """Ressource (utilisateur, activite, plan...) introuvable."""
+
+
+class InactiveUserError(DomainError, ValueError):
+    """Compte utilisateur desactive."""
+
+
+class InvalidStateError(DomainError, ValueError):
+    """Parametre d'etat OAuth invalide."""
+
+
+class InvalidRequestError(DomainError, ValueError):
+    """Requete incompatible avec la ressource (activite non liee a Strava, type inconnu...)."""
+
+
+class ProcessingError(DomainError, RuntimeError):
+    """Echec d'un traitement (enrichissement Strava...) : 500 avec le message du service."""
@@ -2,6 +2,8 @@
 Service d'activites : filtrage, pagination, statistiques, transformation, mise a jour de type.
 """
 import logging
+from sqlalchemy import and_, case, extract
+from sqlalchemy.orm import defer, load_only
 from sqlmodel import Session, select, func
 from uuid import UUID
 from datetime import datetime, timedelta
@@ -11,6 +13,7 @@ from app.domain.entities import Activity, ActivityStats, StravaAuth
 from app.domain.entities.activity import ActivityType
 from app.domain.entities.activity_weather import ActivityWeather
 from app.domain.entities.fit_metrics import FitMetrics
+from app.domain.errors import InvalidRequestError, NotFoundError, ProcessingError
 from app.domain.services.detailed_strava_service import detailed_strava_service
 from app.domain.services.auto_enrichment_service import auto_enrichment_service
 from app.domain.services.strava_sync_service import strava_sync_service
@@ -25,6 +28,27 @@ VALID_ACTIVITY_TYPES = [
 ]
 
 
+def _latlng(lat: Optional[float], lon: Optional[float]) -> Optional[list]:
+    """Reconstruit la paire [lat, lon] exposée par l'API."""
+    return [lat, lon] if lat is not None and lon is not None else None
+
+
+# Colonnes lues par _activity_to_enriched_dict : les streams et laps (JSON
+# volumineux) ne sont pas charges pour les listes et fiches enrichies
+_ENRICHED_COLUMNS = (
+    Activity.id, Activity.strava_id, Activity.name, Activity.activity_type,
+    Activity.distance, Activity.moving_time, Activity.elapsed_time,
+    Activity.total_elevation_gain, Activity.start_date, Activity.average_speed,
+    Activity.max_speed, Activity.average_heartrate, Activity.max_heartrate,
+    Activity.average_cadence, Activity.description, Activity.location_city,
+    Activity.location_country, Activity.summary_polyline, Activity.polyline,
+    Activity.start_lat, Activity.start_lon, Activity.end_lat, Activity.end_lon,
+)
+
+
+_LIST_EXCLUDED_FIELDS = {"streams_data", "laps_data"}
+
+
 def _activity_to_enriched_dict(a: Activity) -> dict:
     return {
         "activity_id": a.strava_id,
@@ -45,8 +69,8 @@ def _activity_to_enriched_dict(a: Activity) -> dict:
         "location_country": a.location_country,
         "summary_polyline": a.summary_polyline,
         "polyline": a.polyline,
-        "start_latlng": a.start_latlng,
-        "end_latlng": a.end_latlng,
+        "start_latlng": _latlng(a.start_lat, a.start_lon),
+        "end_latlng": _latlng(a.end_lat, a.end_lon),
     }
 
 
@@ -78,9 +102,16 @@ class ActivityService:
             else:
                 base_query = base_query.where(Activity.activity_type == activity_type)
 
-        total = session.exec(select(func.count()).select_from(base_query.subquery())).one()
+        total = session.scalar(select(func.count()).select_from(base_query.subquery()))
         offset = (page - 1) * per_page
-        query = base_query.order_by(Activity.start_date.desc()).offset(offset).limit(per_page)
+        # Streams et laps (JSON volumineux) non lus : la liste ne les expose
+        # pas, ils sont servis par /activities/{id}/streams
+        query = (
+            base_query.options(defer(Activity.streams_data), defer(Activity.laps_data))
+            .order_by(Activity.start_date.desc())
+            .offset(offset)
+            .limit(per_page)
+        )
         activities = session.exec(query).all()
         total_pages = (total + per_page - 1) // per_page if total > 0 else 1
 
@@ -106,7 +137,9 @@ class ActivityService:
 
         items = []
         for a in activities:
-            d = a.model_dump() if hasattr(a, 'model_dump') else a.dict()
+            d = a.model_dump(exclude=_LIST_EXCLUDED_FIELDS)
+            d["start_latlng"] = _latlng(a.start_lat, a.start_lon)
+            d["end_latlng"] = _latlng(a.end_lat, a.end_lon)
             d["has_strava"] = a.strava_id is not None
             d["has_weather"] = a.id in weather_ids
             d["has_garmin"] = a.id in garmin_ids
@@ -124,14 +157,28 @@ class ActivityService:
         self, session: Session, user_id: str, period_days: int
     ) -> ActivityStats:
         cutoff_date = datetime.utcnow() - timedelta(days=period_days)
-        activities = session.exec(
-            select(Activity).where(
-                Activity.user_id == UUID(user_id),
-                Activity.start_date >= cutoff_date,
+        in_period = (
+            Activity.user_id == UUID(user_id),
+            Activity.start_date >= cutoff_date,
+        )
+
+        # Agregats calcules par la base : une ligne par type et par mois au
+        # lieu d'une ligne (et d'un objet ORM) par activite
+        has_pace = and_(Activity.average_pace.is_not(None), Activity.average_pace != 0, Activity.distance > 0)
+        by_type = session.exec(
+            select(
+                Activity.activity_type,
+                func.count(),
+                func.sum(Activity.distance),
+                func.sum(Activity.moving_time),
+                func.sum(case((has_pace, Activity.average_pace * Activity.distance), else_=0)),
+                func.sum(case((has_pace, Activity.distance), else_=0)),
             )
+            .where(*in_period)
+            .group_by(Activity.activity_type)
         ).all()
 
-        if not activities:
+        if not by_type:
             return ActivityStats(
                 total_activities=0,
                 total_distance=0,
@@ -141,31 +188,32 @@ class ActivityService:
                 distance_by_month={},
             )
 
-        total_distance = sum(act.distance for act in activities) / 1000
-        total_time = sum(act.moving_time for act in activities)
-
-        total_weighted_pace = 0
-        total_distance_with_pace = 0
-        for activity in activities:
-            if activity.average_pace and activity.distance > 0:
-                distance_km = activity.distance / 1000
-                total_weighted_pace += activity.average_pace * distance_km
-                total_distance_with_pace += distance_km
+        year = extract("year", Activity.start_date)
+        month = extract("month", Activity.start_date)
+        by_month = session.exec(
+            select(year, month, func.sum(Activity.distance))
+            .where(*in_period)
+            .group_by(year, month)
+        ).all()
 
+        total_distance = sum(row[2] or 0 for row in by_type) / 1000
+        total_time = sum(row[3] or 0 for row in by_type)
+        total_weighted_pace = sum(row[4] or 0 for row in by_type)
+        total_distance_with_pace = sum(row[5] or 0 for row in by_type)
         avg_pace = total_weighted_pace / total_distance_with_pace if total_distance_with_pace > 0 else 0
 
         activities_by_type = {}
-        for activity in activities:
-            act_type = activity.activity_type.value
-            activities_by_type[act_type] = activities_by_type.get(act_type, 0) + 1
+        for act_type, count, *_ in by_type:
+            act_type = act_type.value if isinstance(act_type, ActivityType) else act_type
+            activities_by_type[act_type] = count
 
-        distance_by_month = {}
-        for activity in activities:
-            month_key = activity.start_date.strftime("%Y-%m")
-            distance_by_month[month_key] = distance_by_month.get(month_key, 0) + (activity.distance / 1000)
+        distance_by_month = {
+            f"{int(y):04d}-{int(m):02d}": (distance or 0) / 1000
+            for y, m, distance in by_month
+        }
 
         return ActivityStats(
-            total_activities=len(activities),
+            total_activities=sum(row[1] for row in by_type),
             total_distance=round(total_distance, 1),
             total_time=total_time,
             average_pace=round(avg_pace, 2),
@@ -174,18 +222,16 @@ class ActivityService:
         )
 
     def get_enrichment_status(self, session: Session, user_id: str) -> dict:
-        total = session.exec(
-            select(func.count()).select_from(Activity).where(
-                Activity.user_id == UUID(user_id),
-                Activity.strava_id.is_not(None),
+        # Les deux compteurs en un seul aller-retour
+        total, enriched = session.exec(
+            select(
+                func.count(),
+                func.count().filter(Activity.streams_data.is_not(None)),
             )
-        ).one()
-
-        enriched = session.exec(
-            select(func.count()).select_from(Activity).where(
+            .select_from(Activity)
+            .where(
                 Activity.user_id == UUID(user_id),
                 Activity.strava_id.is_not(None),
-                Activity.streams_data.is_not(None),
             )
         ).one()
 
@@ -237,9 +283,14 @@ class ActivityService:
         if sport_type:
             base_query = base_query.where(Activity.activity_type == sport_type)
 
-        total = session.exec(select(func.count()).select_from(base_query.subquery())).one()
+        total = session.scalar(select(func.count()).select_from(base_query.subquery()))
         offset = (page - 1) * per_page
-        query = base_query.order_by(Activity.start_date.desc()).offset(offset).limit(per_page)
+        query = (
+            base_query.options(load_only(*_ENRICHED_COLUMNS))
+            .order_by(Activity.start_date.desc())
+            .offset(offset)
+            .limit(per_page)
+        )
         activities = session.exec(query).all()
         total_pages = (total + per_page - 1) // per_page if total > 0 else 1
 
@@ -289,96 +340,86 @@ class ActivityService:
     ) -> dict:
         cutoff_date = datetime.utcnow() - timedelta(days=period_days)
 
-        query = select(Activity).where(
-            Activity.user_id == UUID(user_id),
-            Activity.start_date >= cutoff_date,
+        # Une ligne par type d'activite, agregee par la base ; les totaux en
+        # derivent. La liste detaillee est servie par /activities/enriched.
+        query = (
+            select(
+                Activity.activity_type,
+                func.count(),
+                func.coalesce(func.sum(Activity.distance), 0),
+                func.coalesce(func.sum(Activity.moving_time), 0),
+            )
+            .where(
+                Activity.user_id == UUID(user_id),
+                Activity.start_date >= cutoff_date,
+            )
+            .group_by(Activity.activity_type)
         )
         if sport_type:
             query = query.where(Activity.activity_type == sport_type)
-
-        query = query.order_by(Activity.start_date.desc())
-        activities = session.exec(query).all()
-
-        total_distance_km = sum(a.distance or 0 for a in activities) / 1000
-        total_time_hours = sum(a.moving_time or 0 for a in activities) / 3600
+        by_type = session.exec(query).all()
 
         activities_by_sport_type = {}
         distance_by_sport_type = {}
         time_by_sport_type = {}
-
-        activity_list = []
-        for a in activities:
-            st = a.activity_type.value if a.activity_type else "Unknown"
-            activities_by_sport_type[st] = activities_by_sport_type.get(st, 0) + 1
-            distance_by_sport_type[st] = distance_by_sport_type.get(st, 0) + (a.distance or 0) / 1000
-            time_by_sport_type[st] = time_by_sport_type.get(st, 0) + (a.moving_time or 0) / 3600
-
-            activity_list.append({
-                "activity_id": a.strava_id,
-                "name": a.name,
-                "sport_type": st,
-                "distance_m": a.distance,
-                "moving_time_s": a.moving_time,
-                "start_date_utc": a.start_date.isoformat() if a.start_date else None,
-                "elev_gain_m": a.total_elevation_gain,
-                "avg_speed_m_s": a.average_speed,
-                "avg_heartrate_bpm": a.average_heartrate,
-            })
+        for act_type, count, distance_m, moving_time_s in by_type:
+            st = act_type.value if isinstance(act_type, ActivityType) else (act_type or "Unknown")
+            activities_by_sport_type[st] = count
+            distance_by_sport_type[st] = distance_m / 1000
+            time_by_sport_type[st] = moving_time_s / 3600
 
         return {
-            "total_activities": len(activities),
-            "total_distance_km": total_distance_km,
-            "total_time_hours": total_time_hours,
+            "total_activities": sum(activities_by_sport_type.values()),
+            "total_distance_km": sum(distance_by_sport_type.values()),
+            "total_time_hours": sum(time_by_sport_type.values()),
             "activities_by_sport_type": activities_by_sport_type,
             "distance_by_sport_type": distance_by_sport_type,
             "time_by_sport_type": time_by_sport_type,
-            "activities": activity_list,
         }
 
     def get_enriched_activity(self, session: Session, user_id: str, activity_id: int) -> dict:
         activity = session.exec(
-            select(Activity).where(
+            select(Activity).options(load_only(*_ENRICHED_COLUMNS)).where(
                 Activity.user_id == UUID(user_id),
                 Activity.strava_id == activity_id,
             )
         ).first()
 
         if not activity:
-            raise ValueError("Activite enrichie non trouvee")
+            raise NotFoundError("Activite enrichie non trouvee")
 
         return _activity_to_enriched_dict(activity)
 
     def get_enriched_activity_streams(self, session: Session, user_id: str, activity_id: int) -> dict:
-        activity = session.exec(
-            select(Activity).where(
+        # Seules les deux colonnes JSON servies sont lues (decodees par orjson)
+        row = session.exec(
+            select(Activity.streams_data, Activity.laps_data).where(
                 Activity.user_id == UUID(user_id),
                 Activity.strava_id == activity_id,
             )
         ).first()
 
-        if not activity:
-            raise ValueError("Activite non trouvee")
+        if not row:
+            raise NotFoundError("Activite non trouvee")
 
-        if not activity.streams_data:
+        streams_data, laps_data = row
+        if not streams_data:
             return {"activity_id": activity_id, "streams": {}, "message": "Aucun stream disponible pour cette activite"}
 
-        streams_clean = {}
-        for k, v in activity.streams_data.items():
-            if k == "segment_efforts":
-                continue
-            # Dérouler le format Strava {data: [...], series_type, resolution} en tableau brut
-            if isinstance(v, dict) and "data" in v:
-                streams_clean[k] = v["data"]
-            else:
-                streams_clean[k] = v
-        return {"activity_id": activity_id, "streams": streams_clean, "laps_data": activity.laps_data}
+        # Dérouler le format Strava {data: [...], series_type, resolution} en tableau brut
+        streams_clean = {
+            k: v["data"] if isinstance(v, dict) and "data" in v else v
+            for k, v in streams_data.items()
+            if k != "segment_efforts"
+        }
+        return {"activity_id": activity_id, "streams": streams_clean, "laps_data": laps_data}
 
     def check_strava_connected(self, session: Session, user_id: str) -> None:
         strava_auth = session.exec(
             select(StravaAuth).where(StravaAuth.user_id == UUID(user_id))
         ).first()
         if not strava_auth:
-            raise ValueError("Strava not connected")
+            raise InvalidRequestError("Strava not connected")
 
     def enrich_batch(self, session: Session, user_id: str, max_activities: int) -> dict:
         self.check_strava_connected(session, user_id)
@@ -402,13 +443,13 @@ class ActivityService:
             )
         ).first()
         if not activity:
-            raise ValueError("Activite non trouvee")
+            raise NotFoundError("Activite non trouvee")
         return activity
 
     def get_activity_streams(self, session: Session, user_id: str, activity_id: UUID) -> dict:
         activity = self.get_activity_by_id(session, user_id, activity_id)
         if not activity.streams_data:
-            raise ValueError("Donnees detaillees non disponibles pour cette activite")
+            raise NotFoundError("Donnees detaillees non disponibles pour cette activite")
         return {
             "activity_id": str(activity_id),
             "streams_data": activity.streams_data,
@@ -419,12 +460,12 @@ class ActivityService:
         activity = self.get_activity_by_id(session, user_id, activity_id)
 
         if not activity.strava_id:
-            raise ValueError("Cette activite n'est pas liee a Strava")
+            raise InvalidRequestError("Cette activite n'est pas liee a Strava")
 
         success = detailed_strava_service.enrich_activity_with_details(session, user_id, activity)
 
         if not success:
-            raise RuntimeError("Echec de l'enrichissement de l'activite")
+            raise ProcessingError("Echec de l'enrichissement de l'activite")
 
         return {
             "message": "Activite enrichie avec succes",
@@ -438,7 +479,7 @@ class ActivityService:
         activity = self.get_activity_by_id(session, user_id, activity_id)
 
         if not activity.strava_id:
-            raise ValueError("Cette activite n'est pas liee a Strava")
+            raise InvalidRequestError("Cette activite n'est pas liee a Strava")
 
         if activity.streams_data:
             return {
@@ -477,13 +518,13 @@ class ActivityService:
                     )
                 ).first()
             except ValueError:
-                raise ValueError("L'ID de l'activite doit etre un UUID valide ou un ID numerique Strava")
+                raise InvalidRequestError("L'ID de l'activite doit etre un UUID valide ou un ID numerique Strava")
 
         if not activity:
-            raise ValueError("Activite non trouvee")
+            raise NotFoundError("Activite non trouvee")
 
         if activity_type not in VALID_ACTIVITY_TYPES:
-            raise ValueError(f"Type d'activite invalide. Types valides: {', '.join(VALID_ACTIVITY_TYPES)}")
+            raise InvalidRequestError(f"Type d'activite invalide. Types valides: {', '.join(VALID_ACTIVITY_TYPES)}")
 
         old_type = activity.activity_type
 
@@ -2,18 +2,71 @@
 Service d'authentification : signup, login, OAuth Strava/Google, refresh tokens.
 """
 import logging
+import threading
+from concurrent.futures import Future
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlmodel import Session, select
-from uuid import UUID
+from uuid import UUID, uuid4
 from datetime import datetime
+from typing import Dict
 
 from app.auth.jwt import jwt_manager, password_manager, TokenResponse
+from app.core.redis import cache_delete, cache_get_json, cache_set_json
 from app.auth.strava_oauth import strava_oauth
 from app.auth.google_oauth import google_oauth
 from app.auth.garmin_auth import garmin_auth
-from app.domain.entities import User, UserCreate, StravaAuth, GoogleAuth, GarminAuth
+from app.domain.entities import User, UserCreate, UserRead, StravaAuth, GoogleAuth, GarminAuth
+from app.domain.errors import NotFoundError, InactiveUserError, InvalidStateError
 
 logger = logging.getLogger(__name__)
 
+# Profil et statuts OAuth interroges en boucle par le frontend : mis en cache
+# par utilisateur, invalides a chaque ecriture des lignes correspondantes.
+# is_expired est recalcule a chaque lecture a partir de expires_at.
+AUTH_CACHE_TTL_S = 30
+
+
+def _user_key(user_id: str) -> str:
+    return f"user:{user_id}"
+
+
+def _google_status_key(user_id: str) -> str:
+    return f"auth_status:google:{user_id}"
+
+
+def _strava_status_key(user_id: str) -> str:
+    return f"auth_status:strava:{user_id}"
+
+
+def invalidate_auth_cache(user_id) -> None:
+    """Oublie le profil et les statuts OAuth en cache d'un utilisateur."""
+    user_id = str(user_id)
+    cache_delete(_user_key(user_id), _google_status_key(user_id), _strava_status_key(user_id))
+
+
+def _upsert_user_auth(session: Session, model, user_id: UUID, insert_only: dict, values: dict) -> None:
+    """INSERT ... ON CONFLICT (user_id) DO UPDATE d'une ligne *Auth (une par utilisateur).
+
+    Un seul aller-retour, sans fenetre entre lecture et ecriture quand deux
+    callbacks du meme utilisateur arrivent ensemble. insert_only : colonnes
+    ecrites uniquement a la creation de la ligne.
+    """
+    dialect = postgresql if session.get_bind().dialect.name == "postgresql" else sqlite
+    now = datetime.utcnow()
+    stmt = dialect.insert(model).values(
+        id=uuid4(), user_id=user_id, created_at=now, updated_at=now, **insert_only, **values
+    )
+    session.execute(
+        stmt.on_conflict_do_update(index_elements=[model.user_id], set_={**values, "updated_at": now})
+    )
+
+
+# Rafraichissements Google en cours, par utilisateur : plusieurs onglets qui
+# rafraichissent en meme temps partagent un seul appel Google et une seule
+# ecriture en base
+_google_refreshes: Dict[str, Future] = {}
+_google_refreshes_lock = threading.Lock()
+
 
 class AuthService:
 
@@ -43,47 +96,79 @@ class AuthService:
             raise ValueError("Incorrect email or password")
 
         if not user.is_active:
-            raise ValueError("Inactive user")
+            raise InactiveUserError("Inactive user")
 
         return jwt_manager.create_token_pair(str(user.id), user.email)
 
     def get_user(self, session: Session, user_id: str) -> User:
         user = session.get(User, UUID(user_id))
         if not user:
-            raise ValueError("User not found")
+            raise NotFoundError("User not found")
         return user
 
+    def get_user_profile(self, session: Session, user_id: str) -> dict:
+        """Profil public (UserRead) de l'utilisateur, servi depuis le cache si possible."""
+        profile = cache_get_json(_user_key(user_id))
+        if profile is None:
+            profile = UserRead.model_validate(self.get_user(session, user_id)).model_dump(mode="json")
+            cache_set_json(_user_key(user_id), profile, AUTH_CACHE_TTL_S)
+        return profile
+
     # ---- Google OAuth ----
 
     def get_google_status(self, session: Session, user_id: str) -> dict:
-        google_auth_record = session.exec(
-            select(GoogleAuth).where(GoogleAuth.user_id == UUID(user_id))
-        ).first()
-
-        if not google_auth_record:
-            return {
-                "connected": False,
-                "google_user_id": None,
-                "scope": None,
-                "expires_at": None,
-                "is_expired": True,
-            }
-
-        is_expired = (
-            google_auth_record.expires_at < datetime.now()
-            if google_auth_record.expires_at
+        status = cache_get_json(_google_status_key(user_id))
+        if status is None:
+            google_auth_record = session.exec(
+                select(GoogleAuth).where(GoogleAuth.user_id == UUID(user_id))
+            ).first()
+
+            if not google_auth_record:
+                status = {
+                    "connected": False,
+                    "google_user_id": None,
+                    "scope": None,
+                    "expires_at": None,
+                }
+            else:
+                status = {
+                    "connected": True,
+                    "google_user_id": str(google_auth_record.user_id),
+                    "scope": google_auth_record.scope,
+                    "expires_at": google_auth_record.expires_at.isoformat() if google_auth_record.expires_at else None,
+                }
+            cache_set_json(_google_status_key(user_id), status, AUTH_CACHE_TTL_S)
+
+        expires_at = status["expires_at"]
+        status["is_expired"] = (
+            datetime.fromisoformat(expires_at) < datetime.now()
+            if expires_at
             else True
         )
-
-        return {
-            "connected": True,
-            "google_user_id": google_auth_record.user_id,
-            "scope": google_auth_record.scope,
-            "expires_at": google_auth_record.expires_at.isoformat() if google_auth_record.expires_at else None,
-            "is_expired": is_expired,
-        }
+        return status
 
     def refresh_google_token(self, session: Session, user_id: str) -> dict:
+        with _google_refreshes_lock:
+            future = _google_refreshes.get(user_id)
+            leader = future is None
+            if leader:
+                future = _google_refreshes[user_id] = Future()
+        if not leader:
+            return future.result()
+
+        try:
+            result = self._refresh_google_token(session, user_id)
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with _google_refreshes_lock:
+                del _google_refreshes[user_id]
+
+    def _refresh_google_token(self, session: Session, user_id: str) -> dict:
         google_auth_record = session.exec(
             select(GoogleAuth).where(GoogleAuth.user_id == UUID(user_id))
         ).first()
@@ -104,6 +189,7 @@ class AuthService:
 
         session.add(google_auth_record)
         session.commit()
+        invalidate_auth_cache(user_id)
 
         return {
             "success": True,
@@ -134,28 +220,15 @@ class AuthService:
         encrypted_access_token = google_oauth.encrypt_token(tokens.access_token)
         encrypted_refresh_token = google_oauth.encrypt_token(tokens.refresh_token)
 
-        google_auth_record = session.exec(
-            select(GoogleAuth).where(GoogleAuth.user_id == user.id)
-        ).first()
-
-        if google_auth_record:
-            google_auth_record.access_token_encrypted = encrypted_access_token
-            google_auth_record.refresh_token_encrypted = encrypted_refresh_token
-            google_auth_record.expires_at = datetime.fromtimestamp(tokens.expires_at)
-            google_auth_record.scope = tokens.scope
-            google_auth_record.google_user_id = tokens.google_user_id
-        else:
-            google_auth_record = GoogleAuth(
-                user_id=user.id,
-                google_user_id=tokens.google_user_id,
-                access_token_encrypted=encrypted_access_token,
-                refresh_token_encrypted=encrypted_refresh_token,
-                expires_at=datetime.fromtimestamp(tokens.expires_at),
-                scope=tokens.scope,
-            )
-            session.add(google_auth_record)
-
+        _upsert_user_auth(session, GoogleAuth, user.id, insert_only={}, values={
+            "google_user_id": tokens.google_user_id,
+            "access_token_encrypted": encrypted_access_token,
+            "refresh_token_encrypted": encrypted_refresh_token,
+            "expires_at": datetime.fromtimestamp(tokens.expires_at),
+            "scope": tokens.scope,
+        })
         session.commit()
+        invalidate_auth_cache(user.id)
 
         jwt_tokens = jwt_manager.create_token_pair(str(user.id), user.email)
         return user, jwt_tokens, tokens.google_user_id
@@ -163,62 +236,55 @@ class AuthService:
     # ---- Strava OAuth ----
 
     def handle_strava_callback(self, session: Session, code: str, state: str) -> tuple:
-        """Retourne (athlete_id,). Leve ValueError si state invalide ou user introuvable."""
+        """Retourne (athlete_id,). Leve InvalidStateError si state invalide, NotFoundError si user introuvable."""
         tokens = strava_oauth.exchange_code_for_tokens(code)
         logger.info(f"Tokens recus pour l'athlete {tokens.athlete_id}")
 
         try:
             user = session.get(User, UUID(state))
         except ValueError:
-            raise ValueError("Identifiant d'etat invalide")
+            raise InvalidStateError("Identifiant d'etat invalide")
 
         if not user:
-            raise ValueError("Utilisateur non trouve")
+            raise NotFoundError("Utilisateur non trouve")
 
         encrypted_access = strava_oauth.encrypt_token(tokens.access_token)
         encrypted_refresh = strava_oauth.encrypt_token(tokens.refresh_token)
 
-        existing_auth = session.exec(
-            select(StravaAuth).where(StravaAuth.user_id == user.id)
-        ).first()
-
-        if existing_auth:
-            existing_auth.access_token_encrypted = encrypted_access
-            existing_auth.refresh_token_encrypted = encrypted_refresh
-            existing_auth.expires_at = datetime.fromtimestamp(tokens.expires_at)
-            existing_auth.scope = tokens.scope
-            existing_auth.updated_at = datetime.utcnow()
-        else:
-            strava_auth = StravaAuth(
-                user_id=user.id,
-                strava_athlete_id=tokens.athlete_id,
-                access_token_encrypted=encrypted_access,
-                refresh_token_encrypted=encrypted_refresh,
-                expires_at=datetime.fromtimestamp(tokens.expires_at),
-                scope=tokens.scope,
-            )
-            session.add(strava_auth)
-
+        _upsert_user_auth(session, StravaAuth, user.id, insert_only={
+            "strava_athlete_id": tokens.athlete_id,
+        }, values={
+            "access_token_encrypted": encrypted_access,
+            "refresh_token_encrypted": encrypted_refresh,
+            "expires_at": datetime.fromtimestamp(tokens.expires_at),
+            "scope": tokens.scope,
+        })
         session.commit()
+        invalidate_auth_cache(user.id)
         return (tokens.athlete_id,)
 
     def get_strava_status(self, session: Session, user_id: str) -> dict:
-        strava_auth = session.exec(
-            select(StravaAuth).where(StravaAuth.user_id == UUID(user_id))
-        ).first()
-
-        if not strava_auth:
-            return {"connected": False}
-
-        is_expired = strava_oauth.is_token_expired(strava_auth.expires_at)
-        return {
-            "connected": True,
-            "athlete_id": strava_auth.strava_athlete_id,
-            "scope": strava_auth.scope,
-            "expires_at": strava_auth.expires_at,
-            "is_expired": is_expired,
-            "last_sync": strava_auth.updated_at,
-        }
+        status = cache_get_json(_strava_status_key(user_id))
+        if status is None:
+            strava_auth = session.exec(
+                select(StravaAuth).where(StravaAuth.user_id == UUID(user_id))
+            ).first()
+
+            if not strava_auth:
+                status = {"connected": False}
+            else:
+                status = {
+                    "connected": True,
+                    "athlete_id": strava_auth.strava_athlete_id,
+                    "scope": strava_auth.scope,
+                    "expires_at": strava_auth.expires_at.isoformat(),
+                    "last_sync": strava_auth.updated_at.isoformat() if strava_auth.updated_at else None,
+                }
+            cache_set_json(_strava_status_key(user_id), status, AUTH_CACHE_TTL_S)
+
+        if status["connected"]:
+            status["is_expired"] = strava_oauth.is_token_expired(datetime.fromisoformat(status["expires_at"]))
+        return status
 
     def get_valid_google_token(self, session: Session, user_id: str) -> str:
         """Verifie et rafraichit le token Google si necessaire. Retourne le token dechiffre."""
@@ -250,6 +316,7 @@ class AuthService:
 
             session.add(google_auth_record)
             session.commit()
+            invalidate_auth_cache(user_id)
             logger.info("Token Google rafraichi avec succes")
 
         return google_oauth.decrypt_token(google_auth_record.access_token_encrypted)
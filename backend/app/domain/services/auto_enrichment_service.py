@@ -42,6 +42,9 @@ class AutoEnrichmentService:
         self.batch_size = 5
         self._task: Optional[asyncio.Task] = None
         self._wake_event = asyncio.Event()
+        # Boucle du worker : les routes synchrones et les webhooks appellent
+        # start_worker / notify_new_items depuis le threadpool
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
 
     # ------------------------------------------------------------------
     # Lifecycle du worker
@@ -50,11 +53,19 @@ class AutoEnrichmentService:
     def start_worker(self) -> None:
         """Demarre le worker background comme asyncio.Task.
 
-        Idempotent : si le worker tourne deja, ne fait rien.
+        Idempotent : si le worker tourne deja, ne fait rien. Appele hors de
+        la boucle d'evenements, le demarrage y est relaye.
         """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            if self._loop is not None:
+                self._loop.call_soon_threadsafe(self.start_worker)
+            return
+        self._loop = loop
         if self._task and not self._task.done():
             return
-        self._task = asyncio.get_event_loop().create_task(self._run_loop())
+        self._task = loop.create_task(self._run_loop())
         logger.info("Worker d'enrichissement demarre")
 
     def stop_worker(self) -> None:
@@ -67,7 +78,15 @@ class AutoEnrichmentService:
 
     def notify_new_items(self) -> None:
         """Reveille le worker quand de nouveaux items sont ajoutes a la queue."""
-        self._wake_event.set()
+        try:
+            on_loop = asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            on_loop = False
+        if self._loop is not None and not on_loop:
+            # asyncio.Event n'est pas thread-safe : set() execute par la boucle
+            self._loop.call_soon_threadsafe(self._wake_event.set)
+        else:
+            self._wake_event.set()
 
     # ------------------------------------------------------------------
     # Boucle principale du worker
@@ -180,12 +199,13 @@ class AutoEnrichmentService:
 
     async def _enrich_single_activity(self, activity_id: str, user_id: str) -> bool:
         """Enrichit une activite specifique."""
+        activity_uuid, user_uuid = UUID(activity_id), UUID(user_id)
         session = next(get_session())
         try:
             activity = session.exec(
                 select(Activity).where(
-                    Activity.id == UUID(activity_id),
-                    Activity.user_id == UUID(user_id)
+                    Activity.id == activity_uuid,
+                    Activity.user_id == user_uuid
                 )
             ).first()
 
@@ -201,7 +221,7 @@ class AutoEnrichmentService:
             if getattr(activity, "source", None) == ActivitySource.GARMIN.value:
                 try:
                     from app.domain.services.garmin_sync_service import enrich_garmin_activity_fit
-                    result = await enrich_garmin_activity_fit(session, UUID(user_id), UUID(activity_id))
+                    result = await enrich_garmin_activity_fit(session, user_uuid, activity_uuid)
                     return result.get("status") == "success"
                 except Exception as e:
                     logger.warning(f"Enrichissement Garmin FIT echoue pour activite {activity_id}: {e}")
@@ -230,11 +250,12 @@ class AutoEnrichmentService:
 
     def add_user_activities_to_queue(self, user_id: str, priority: int = 0):
         """Ajoute toutes les activites non-enrichies d'un utilisateur a la queue."""
+        user_uuid = UUID(user_id)
         session = next(get_session())
         try:
             activities = session.exec(
                 select(Activity).where(
-                    Activity.user_id == UUID(user_id),
+                    Activity.user_id == user_uuid,
                     Activity.strava_id.is_not(None),
                     Activity.streams_data.is_(None)
                 ).order_by(Activity.start_date.desc())
@@ -242,7 +263,7 @@ class AutoEnrichmentService:
 
             added_count = 0
             for activity in activities:
-                if self.scheduler.add_to_queue(session, activity.id, UUID(user_id), priority):
+                if self.scheduler.add_to_queue(session, activity.id, user_uuid, priority):
                     added_count += 1
 
             if added_count > 0:
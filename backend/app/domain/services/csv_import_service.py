@@ -4,7 +4,7 @@ Gère l'import de plans d'entraînement depuis un fichier CSV
 """
 import csv
 import io
-from typing import List, Dict, Any, Optional
+from typing import BinaryIO, List, Dict, Any, Optional, TextIO
 from datetime import datetime
 from uuid import UUID
 
@@ -52,12 +52,14 @@ class CSVImportService:
         Returns:
             Liste de WorkoutPlanCreate
         """
+        return self._parse_csv_stream(io.StringIO(csv_content), user_id)
+
+    def _parse_csv_stream(self, text_stream: TextIO, user_id: UUID) -> List[WorkoutPlanCreate]:
+        """Parse un flux texte CSV ligne par ligne (sans charger tout le fichier)."""
         plans = []
-        
-        # Lire le CSV
-        csv_file = io.StringIO(csv_content)
-        reader = csv.DictReader(csv_file, delimiter='\t')  # Séparateur tabulation
-        
+
+        reader = csv.DictReader(text_stream, delimiter='\t')  # Séparateur tabulation
+
         for row in reader:
             try:
                 plan = self._parse_row(row, user_id)
@@ -163,17 +165,22 @@ class CSVImportService:
         except ValueError:
             return None
     
-    def import_from_upload(self, session: Session, file_content: bytes, filename: str, user_id: UUID) -> Dict[str, Any]:
+    def import_from_upload(self, session: Session, file_obj: BinaryIO, filename: str, user_id: UUID) -> Dict[str, Any]:
         """Importe des plans depuis un fichier CSV uploade.
 
-        Valide l'extension, decode le contenu, parse et importe en DB.
-        Leve ValueError si le fichier est invalide ou vide.
+        Valide l'extension, decode et parse le fichier au fil de la lecture,
+        puis importe en DB. Leve ValueError si le fichier est invalide ou vide
+        (UnicodeDecodeError compris).
         """
         if not filename.endswith('.csv'):
             raise ValueError("Le fichier doit etre au format CSV")
 
-        csv_content = file_content.decode('utf-8')
-        plans = self.parse_csv_content(csv_content, user_id)
+        text_stream = io.TextIOWrapper(file_obj, encoding='utf-8', newline='')
+        try:
+            plans = self._parse_csv_stream(text_stream, user_id)
+        finally:
+            # Rendre le fichier sous-jacent a l'UploadFile sans le fermer
+            text_stream.detach()
 
         if not plans:
             raise ValueError("Aucun plan valide trouve dans le fichier CSV")
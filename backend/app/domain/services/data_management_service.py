@@ -2,15 +2,90 @@
 Service de gestion des donnees : RGPD (suppression/export).
 """
 import logging
+from typing import Callable, Iterator, Optional
 from uuid import UUID
 from datetime import datetime
 
+import orjson
 from sqlmodel import Session, select
 
+from app.core.database import engine
 from app.domain.entities import User, StravaAuth, Activity, WorkoutPlan
+from app.domain.errors import NotFoundError
+from app.domain.services.auth_service import invalidate_auth_cache
 
 logger = logging.getLogger(__name__)
 
+# Taille des lots lus (et serialises) pour l'export RGPD
+EXPORT_BATCH_SIZE = 500
+
+EXPORT_ACTIVITY_COLUMNS = (
+    Activity.id, Activity.name, Activity.activity_type, Activity.start_date,
+    Activity.distance, Activity.moving_time, Activity.elapsed_time,
+    Activity.total_elevation_gain, Activity.average_speed, Activity.max_speed,
+    Activity.average_heartrate, Activity.max_heartrate, Activity.average_cadence,
+    Activity.description, Activity.strava_id, Activity.location_city,
+    Activity.location_country, Activity.created_at,
+)
+
+EXPORT_WORKOUT_PLAN_COLUMNS = (
+    WorkoutPlan.id, WorkoutPlan.name, WorkoutPlan.workout_type, WorkoutPlan.planned_date,
+    WorkoutPlan.planned_distance, WorkoutPlan.planned_duration, WorkoutPlan.planned_pace,
+    WorkoutPlan.planned_elevation_gain, WorkoutPlan.intensity_zone, WorkoutPlan.description,
+    WorkoutPlan.coach_notes, WorkoutPlan.is_completed, WorkoutPlan.completion_percentage,
+    WorkoutPlan.created_at,
+)
+
+
+def _activity_export(row) -> dict:
+    return {
+        "id": str(row.id),
+        "name": row.name,
+        "activity_type": row.activity_type,
+        "start_date": row.start_date.isoformat(),
+        "distance": row.distance,
+        "moving_time": row.moving_time,
+        "elapsed_time": row.elapsed_time,
+        "total_elevation_gain": row.total_elevation_gain,
+        "average_speed": row.average_speed,
+        "max_speed": row.max_speed,
+        "average_heartrate": row.average_heartrate,
+        "max_heartrate": row.max_heartrate,
+        "average_cadence": row.average_cadence,
+        "description": row.description,
+        "strava_id": row.strava_id,
+        "location_city": row.location_city,
+        "location_country": row.location_country,
+        "created_at": row.created_at.isoformat(),
+    }
+
+
+def _workout_plan_export(row) -> dict:
+    return {
+        "id": str(row.id),
+        "name": row.name,
+        "workout_type": row.workout_type,
+        "planned_date": row.planned_date.isoformat(),
+        "planned_distance": row.planned_distance,
+        "planned_duration": row.planned_duration,
+        "planned_pace": row.planned_pace,
+        "planned_elevation_gain": row.planned_elevation_gain,
+        "intensity_zone": row.intensity_zone,
+        "description": row.description,
+        "coach_notes": row.coach_notes,
+        "is_completed": row.is_completed,
+        "completion_percentage": row.completion_percentage,
+        "created_at": row.created_at.isoformat(),
+    }
+
+
+def _iter_json_items(result, to_dict: Callable) -> Iterator[bytes]:
+    """Serialise les lignes d'un resultat en elements de tableau JSON, un fragment par lot."""
+    separator = b""
+    for partition in result.partitions():
+        yield separator + b",".join(orjson.dumps(to_dict(row)) for row in partition)
+        separator = b","
+
 
 class DataManagementService:
 
@@ -35,6 +110,7 @@ class DataManagementService:
             session.delete(activity)
 
         session.commit()
+        invalidate_auth_cache(user_id)
 
         return {
             "message": "Donnees Strava supprimees avec succes",
@@ -65,6 +141,7 @@ class DataManagementService:
             session.delete(strava_auth)
 
         session.commit()
+        invalidate_auth_cache(user_id)
 
         return {
             "message": "Toutes les donnees utilisateur supprimees avec succes",
@@ -76,7 +153,7 @@ class DataManagementService:
     def delete_account(self, session: Session, user_id: str) -> dict:
         user = session.get(User, UUID(user_id))
         if not user:
-            raise ValueError("Utilisateur non trouve")
+            raise NotFoundError("Utilisateur non trouve")
 
         result = self.delete_all_user_data(session, user_id)
 
@@ -85,89 +162,69 @@ class DataManagementService:
         if user:
             session.delete(user)
             session.commit()
+            invalidate_auth_cache(user_id)
 
         result["message"] = "Compte et toutes les donnees supprimes avec succes"
         result["account_deleted"] = True
         return result
 
-    def export_user_data(self, session: Session, user_id: str) -> dict:
+    def export_user_data(self, session: Session, user_id: str) -> Iterator[bytes]:
+        """Exporte les donnees de l'utilisateur en JSON, fragment par fragment.
+
+        L'utilisateur est verifie tout de suite (ValueError si absent) ; le
+        document est ensuite produit section par section par un generateur qui
+        lit activites et plans par lots, sans charger les colonnes lourdes
+        (streams, polylines) ni construire le JSON complet en memoire.
+        """
         user = session.get(User, UUID(user_id))
         if not user:
-            raise ValueError("Utilisateur non trouve")
-
-        activities = session.exec(
-            select(Activity).where(Activity.user_id == UUID(user_id))
-        ).all()
-
-        workout_plans = session.exec(
-            select(WorkoutPlan).where(WorkoutPlan.user_id == UUID(user_id))
-        ).all()
+            raise NotFoundError("Utilisateur non trouve")
 
         strava_auth = session.exec(
             select(StravaAuth).where(StravaAuth.user_id == UUID(user_id))
         ).first()
 
-        return {
-            "user": {
-                "id": str(user.id),
-                "email": user.email,
-                "full_name": user.full_name,
-                "created_at": user.created_at.isoformat(),
-                "is_active": user.is_active,
-            },
-            "activities": [
-                {
-                    "id": str(activity.id),
-                    "name": activity.name,
-                    "activity_type": activity.activity_type,
-                    "start_date": activity.start_date.isoformat(),
-                    "distance": activity.distance,
-                    "moving_time": activity.moving_time,
-                    "elapsed_time": activity.elapsed_time,
-                    "total_elevation_gain": activity.total_elevation_gain,
-                    "average_speed": activity.average_speed,
-                    "max_speed": activity.max_speed,
-                    "average_heartrate": activity.average_heartrate,
-                    "max_heartrate": activity.max_heartrate,
-                    "average_cadence": activity.average_cadence,
-                    "description": activity.description,
-                    "strava_id": activity.strava_id,
-                    "location_city": activity.location_city,
-                    "location_country": activity.location_country,
-                    "created_at": activity.created_at.isoformat(),
-                }
-                for activity in activities
-            ],
-            "workout_plans": [
-                {
-                    "id": str(plan.id),
-                    "name": plan.name,
-                    "workout_type": plan.workout_type,
-                    "planned_date": plan.planned_date.isoformat(),
-                    "planned_distance": plan.planned_distance,
-                    "planned_duration": plan.planned_duration,
-                    "planned_pace": plan.planned_pace,
-                    "planned_elevation_gain": plan.planned_elevation_gain,
-                    "intensity_zone": plan.intensity_zone,
-                    "description": plan.description,
-                    "coach_notes": plan.coach_notes,
-                    "is_completed": plan.is_completed,
-                    "completion_percentage": plan.completion_percentage,
-                    "created_at": plan.created_at.isoformat(),
-                }
-                for plan in workout_plans
-            ],
-            "strava_connection": {
-                "connected": bool(strava_auth),
-                "athlete_id": strava_auth.strava_athlete_id if strava_auth else None,
-                "scope": strava_auth.scope if strava_auth else None,
-                "connected_at": strava_auth.created_at.isoformat() if strava_auth else None,
-            }
-            if strava_auth
-            else None,
-            "export_date": datetime.utcnow().isoformat(),
-            "export_type": "complete_user_data",
+        user_export = {
+            "id": str(user.id),
+            "email": user.email,
+            "full_name": user.full_name,
+            "created_at": user.created_at.isoformat(),
+            "is_active": user.is_active,
         }
+        strava_connection = {
+            "connected": True,
+            "athlete_id": strava_auth.strava_athlete_id,
+            "scope": strava_auth.scope,
+            "connected_at": strava_auth.created_at.isoformat(),
+        } if strava_auth else None
+
+        return self._iter_export(UUID(user_id), user_export, strava_connection)
+
+    def _iter_export(self, user_uuid: UUID, user_export: dict, strava_connection: Optional[dict]) -> Iterator[bytes]:
+        yield b'{"user":' + orjson.dumps(user_export) + b',"activities":['
+
+        # Session dediee : le generateur est consomme apres la fin du handler
+        with Session(engine) as session:
+            activities = session.exec(
+                select(*EXPORT_ACTIVITY_COLUMNS)
+                .where(Activity.user_id == user_uuid)
+                .execution_options(yield_per=EXPORT_BATCH_SIZE)
+            )
+            yield from _iter_json_items(activities, _activity_export)
+
+            yield b'],"workout_plans":['
+            workout_plans = session.exec(
+                select(*EXPORT_WORKOUT_PLAN_COLUMNS)
+                .where(WorkoutPlan.user_id == user_uuid)
+                .execution_options(yield_per=EXPORT_BATCH_SIZE)
+            )
+            yield from _iter_json_items(workout_plans, _workout_plan_export)
+
+        yield (
+            b'],"strava_connection":' + orjson.dumps(strava_connection)
+            + b',"export_date":' + orjson.dumps(datetime.utcnow().isoformat())
+            + b',"export_type":"complete_user_data"}'
+        )
 
 
 
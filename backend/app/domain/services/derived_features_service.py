@@ -4,15 +4,16 @@ Axe A — Per-segment : minetti_cost, grade_variability, efficiency_factor, card
 Axe B — Per-day : TRIMP, CTL (EWMA 42j), ATL (EWMA 7j), TSB = CTL - ATL, rhr_delta_7d.
          Edwards TRIMP : temps dans chaque zone HR x coefficient (1-5).
 """
+import hashlib
 import json
 import logging
 import statistics
-from datetime import date as date_type, timedelta
+from datetime import date as date_type, datetime, timedelta
 from typing import Any, Dict, List, Optional
 from uuid import UUID
 
 from sqlmodel import Session, select
-from sqlalchemy import func
+from sqlalchemy import func, update
 
 from app.domain.entities.activity import Activity
 from app.domain.entities.garmin_daily import GarminDaily
@@ -29,6 +30,10 @@ CTL_DAYS = 42
 ATL_DAYS = 7
 RHR_DELTA_WINDOW = 7
 
+# A incrementer quand les formules per-segment changent : invalide les
+# empreintes de calcul stockees (Activity.features_input_hash)
+SEGMENT_FEATURES_VERSION = 1
+
 
 # ===================================================================
 # Axe A — Features per-segment
@@ -198,11 +203,50 @@ def compute_segment_features(session: Session, activity_id: UUID) -> int:
         session.add(features)
         updated += 1
 
+    # Version des segments servie en ETag par GET /segments/{activity_id}
+    session.execute(
+        update(Activity).where(Activity.id == activity_id).values(updated_at=datetime.utcnow())
+    )
     session.commit()
     logger.info(f"Activite {activity_id}: {updated} segment features derivees mises a jour")
     return updated
 
 
+def _features_input_hash(segment_ids: List[UUID]) -> str:
+    """Empreinte des entrees du calcul per-segment.
+
+    Les segments ne sont jamais modifies en place : une re-segmentation
+    les recree avec de nouveaux id, leur liste ordonnee suffit donc.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(SEGMENT_FEATURES_VERSION.to_bytes(4, "big"))
+    for segment_id in segment_ids:
+        digest.update(segment_id.bytes)
+    return digest.hexdigest()
+
+
+def compute_segment_features_if_changed(session: Session, activity: Activity) -> Optional[int]:
+    """compute_segment_features, sauf si les segments n'ont pas change depuis le dernier calcul.
+
+    Retourne None quand le calcul est evite, sinon le nombre de segments mis a jour.
+    """
+    segment_ids = session.exec(
+        select(Segment.id)
+        .where(Segment.activity_id == activity.id)
+        .order_by(Segment.segment_index)
+    ).all()
+    input_hash = _features_input_hash(segment_ids)
+    if segment_ids and activity.features_input_hash == input_hash:
+        return None
+
+    updated = compute_segment_features(session, activity.id)
+    if updated > 0:
+        activity.features_input_hash = input_hash
+        session.add(activity)
+        session.commit()
+    return updated
+
+
 def compute_all_segment_features(
     session: Session, user_id: Optional[UUID] = None
 ) -> Dict[str, int]:
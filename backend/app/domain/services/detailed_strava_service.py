@@ -14,6 +14,7 @@ import logging
 from app.auth.strava_oauth import strava_oauth
 from app.domain.entities.activity import Activity
 from app.domain.entities.user import StravaAuth
+from app.domain.services.auth_service import invalidate_auth_cache
 from app.domain.services.redis_quota_manager import RedisQuotaManager
 
 
@@ -106,6 +107,7 @@ class DetailedStravaService:
             strava_auth.refresh_token_encrypted = strava_oauth.encrypt_token(new_tokens.refresh_token)
             strava_auth.expires_at = datetime.fromtimestamp(new_tokens.expires_at)
             session.commit()
+            invalidate_auth_cache(user_id)
             return new_tokens.access_token
         
         return strava_oauth.decrypt_token(strava_auth.access_token_encrypted)
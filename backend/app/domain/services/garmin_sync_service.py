@@ -11,11 +11,11 @@ import logging
 import zipfile
 from io import BytesIO
 from datetime import date, datetime, timedelta
-from typing import Any, Dict, List, Optional, Tuple, TYPE_CHECKING
+from typing import Any, Dict, Iterator, List, Optional, Tuple, TYPE_CHECKING
 from uuid import UUID
 
 import garth
-from sqlalchemy import and_, func
+from sqlalchemy import and_, func, lambda_stmt
 from sqlalchemy.orm.attributes import flag_modified
 from sqlmodel import Session, select
 
@@ -23,15 +23,20 @@ if TYPE_CHECKING:
     pass  # garth.Activity used only in annotations
 
 from app.auth.garmin_auth import garmin_auth
+from app.core.database import engine
 from app.domain.entities.activity import Activity, ActivitySource, ActivityType
-from app.domain.entities.fit_metrics import FitMetrics
-from app.domain.entities.garmin_daily import GarminDaily
+from app.domain.entities.fit_metrics import FitMetrics, compute_fit_metrics_etag
+from app.domain.entities.garmin_daily import GarminDaily, GarminDailyRead
 from app.domain.entities.user import GarminAuth
+from app.domain.errors import NotFoundError
 from app.domain.services.derived_features_service import recompute_training_load_from
 
 logger = logging.getLogger(__name__)
 
 REQUEST_DELAY_S = 1.0  # 1s entre chaque date (safe pour Garmin)
+FIT_DOWNLOAD_CONCURRENCY = 3  # telechargements FIT simultanes en batch
+FIT_DOWNLOAD_DELAY_S = 1.5  # pause par slot de telechargement (rate limit Garmin)
+DAILY_READ_BATCH_SIZE = 500  # lignes garmin_daily chargees par lot en lecture
 
 
 async def sync_daily_data(
@@ -232,6 +237,77 @@ def _upsert(
     session.commit()
 
 
+def next_garmin_daily_cursor(
+    user_id: UUID,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    before: Optional[date] = None,
+    limit: int = 1000,
+) -> Optional[date]:
+    """
+    Curseur de la page suivante de iter_garmin_daily_json avec les memes filtres.
+
+    Retourne la date de la derniere ligne de la page (a passer en before=)
+    s'il reste des lignes plus anciennes, None si la page est la derniere.
+    Les dates sont uniques par utilisateur (uq_garmin_daily_user_date) : le
+    curseur sur la date est exact.
+    """
+    query = select(GarminDaily.date).where(GarminDaily.user_id == user_id)
+    if date_from:
+        query = query.where(GarminDaily.date >= date_from)
+    if date_to:
+        query = query.where(GarminDaily.date <= date_to)
+    if before:
+        query = query.where(GarminDaily.date < before)
+    # Derniere ligne de la page et, s'il y en a une, la premiere de la suivante
+    query = query.order_by(GarminDaily.date.desc()).offset(limit - 1).limit(2)
+    with Session(engine) as session:
+        dates = session.exec(query).all()
+    return dates[0] if len(dates) == 2 else None
+
+
+def iter_garmin_daily_json(
+    user_id: UUID,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    limit: Optional[int] = None,
+    before: Optional[date] = None,
+) -> Iterator[bytes]:
+    """
+    Serialise les donnees quotidiennes Garmin en tableau JSON, lot par lot.
+
+    Generateur consomme par une StreamingResponse, apres la fin du handler :
+    il ouvre sa propre session. Les lignes sont lues par lots de
+    DAILY_READ_BATCH_SIZE (yield_per), du plus recent au plus ancien.
+    before : curseur de pagination (dates strictement anterieures).
+    """
+    # lambda_stmt : la construction de la requete est mise en cache par forme
+    # (filtres presents ou non), seules les valeurs liees changent
+    query = lambda_stmt(lambda: select(GarminDaily).where(GarminDaily.user_id == user_id))
+    if date_from:
+        query += lambda q: q.where(GarminDaily.date >= date_from)
+    if date_to:
+        query += lambda q: q.where(GarminDaily.date <= date_to)
+    if before:
+        query += lambda q: q.where(GarminDaily.date < before)
+    query += lambda q: q.order_by(GarminDaily.date.desc())
+    if limit is not None:
+        query += lambda q: q.limit(limit)
+
+    yield b"["
+    with Session(engine) as session:
+        rows = session.execute(
+            query, execution_options={"yield_per": DAILY_READ_BATCH_SIZE}
+        ).scalars()
+        separator = b""
+        for partition in rows.partitions():
+            yield separator + b",".join(
+                GarminDailyRead.model_validate(row).model_dump_json().encode() for row in partition
+            )
+            separator = b","
+    yield b"]"
+
+
 def download_fit_file(client: garth.Client, garmin_activity_id: int) -> Optional[bytes]:
     """
     Telecharge le fichier FIT original d'une activite Garmin.
@@ -793,11 +869,12 @@ async def enrich_garmin_activity_fit(
     session: Session,
     user_id: UUID,
     activity_id: UUID,
+    fit_bytes: Optional[bytes] = None,
 ) -> Dict[str, Any]:
     """
     Enrichit une activite Garmin avec son fichier FIT.
 
-    1. Telecharge le FIT
+    1. Telecharge le FIT (sauf si fit_bytes est fourni, deja telecharge)
     2. Parse les streams + metriques Running Dynamics
     3. Stocke streams_data dans l'activite
     4. Cree/update FitMetrics
@@ -814,22 +891,21 @@ async def enrich_garmin_activity_fit(
     ).first()
 
     if not activity:
-        raise ValueError(f"Activite {activity_id} non trouvee")
+        raise NotFoundError(f"Activite {activity_id} non trouvee")
 
     if not activity.garmin_activity_id:
         raise ValueError(f"Activite {activity_id} n'a pas de garmin_activity_id")
 
-    # Recuperer le client Garmin
-    garmin_auth_record = session.exec(
-        select(GarminAuth).where(GarminAuth.user_id == user_id)
-    ).first()
-    if not garmin_auth_record:
-        raise ValueError(f"Aucune authentification Garmin pour user_id={user_id}")
-
-    client = garmin_auth.get_client(garmin_auth_record.oauth_token_encrypted)
-
     # 1. Download FIT
-    fit_bytes = download_fit_file(client, activity.garmin_activity_id)
+    if fit_bytes is None:
+        garmin_auth_record = session.exec(
+            select(GarminAuth).where(GarminAuth.user_id == user_id)
+        ).first()
+        if not garmin_auth_record:
+            raise ValueError(f"Aucune authentification Garmin pour user_id={user_id}")
+
+        client = garmin_auth.get_client(garmin_auth_record.oauth_token_encrypted)
+        fit_bytes = download_fit_file(client, activity.garmin_activity_id)
     if not fit_bytes:
         return {"status": "fit_download_failed", "activity_id": str(activity_id)}
 
@@ -902,6 +978,7 @@ async def enrich_garmin_activity_fit(
                 setattr(existing_fm, key, value)
         existing_fm.fit_downloaded_at = datetime.utcnow()
         existing_fm.updated_at = datetime.utcnow()
+        existing_fm.etag = compute_fit_metrics_etag(existing_fm)
         session.add(existing_fm)
     else:
         fm_fields = {
@@ -913,6 +990,7 @@ async def enrich_garmin_activity_fit(
             fit_downloaded_at=datetime.utcnow(),
             **fm_fields,
         )
+        fm.etag = compute_fit_metrics_etag(fm)
         session.add(fm)
 
     session.commit()
@@ -952,14 +1030,14 @@ def get_garmin_enrichment_status(session: Session, user_id: UUID) -> Dict[str, A
     Returns:
         dict avec total_garmin_activities, enriched_activities, pending_activities, enrichment_percentage
     """
-    total = session.exec(
+    total = session.scalar(
         select(func.count()).select_from(Activity).where(
             Activity.user_id == user_id,
             Activity.garmin_activity_id.is_not(None),
         )
-    ).one()
+    )
 
-    enriched = session.exec(
+    enriched = session.scalar(
         select(func.count()).select_from(FitMetrics).where(
             FitMetrics.activity_id.in_(
                 select(Activity.id).where(
@@ -968,7 +1046,7 @@ def get_garmin_enrichment_status(session: Session, user_id: UUID) -> Dict[str, A
                 )
             )
         )
-    ).one()
+    )
 
     pending = max(0, total - enriched)
     percentage = round((enriched / total) * 100) if total > 0 else 0
@@ -989,9 +1067,21 @@ async def batch_enrich_garmin_fit(
     """
     Enrichit en batch les activites Garmin sans metriques FIT.
 
+    Les fichiers FIT sont telecharges en parallele (FIT_DOWNLOAD_CONCURRENCY
+    threads, FIT_DOWNLOAD_DELAY_S de pause par slot) ; le parsing et les
+    ecritures en base restent sequentiels sur la session.
+
     Returns:
         dict avec enriched, errors, total
     """
+    garmin_auth_record = session.exec(
+        select(GarminAuth).where(GarminAuth.user_id == user_id)
+    ).first()
+    if not garmin_auth_record:
+        raise ValueError(f"Aucune authentification Garmin pour user_id={user_id}")
+
+    client = garmin_auth.get_client(garmin_auth_record.oauth_token_encrypted)
+
     # Trouver les activites Garmin sans metriques FIT
     fit_subq = select(FitMetrics.activity_id)
     activities = session.exec(
@@ -1004,21 +1094,33 @@ async def batch_enrich_garmin_fit(
 
     enriched = 0
     errors_count = 0
+    download_slots = asyncio.Semaphore(FIT_DOWNLOAD_CONCURRENCY)
 
-    for activity in activities:
-        try:
-            result = await enrich_garmin_activity_fit(
-                session, user_id, activity.id,
-            )
-            if result.get("status") == "success":
-                enriched += 1
-            else:
-                errors_count += 1
-        except Exception as e:
-            logger.warning(f"Erreur enrichissement FIT activite {activity.id}: {e}")
-            errors_count += 1
+    async def _download(garmin_activity_id: int) -> Optional[bytes]:
+        async with download_slots:
+            fit_bytes = await asyncio.to_thread(download_fit_file, client, garmin_activity_id)
+            await asyncio.sleep(FIT_DOWNLOAD_DELAY_S)  # rate limit genereux par slot
+            return fit_bytes
 
-        await asyncio.sleep(1.5)  # rate limit genereux entre enrichissements FIT
+    async with asyncio.TaskGroup() as tg:
+        downloads = [tg.create_task(_download(a.garmin_activity_id)) for a in activities]
+
+        for activity, download in zip(activities, downloads):
+            fit_bytes = await download
+            if not fit_bytes:
+                errors_count += 1
+                continue
+            try:
+                result = await enrich_garmin_activity_fit(
+                    session, user_id, activity.id, fit_bytes=fit_bytes,
+                )
+                if result.get("status") == "success":
+                    enriched += 1
+                else:
+                    errors_count += 1
+            except Exception as e:
+                logger.warning(f"Erreur enrichissement FIT activite {activity.id}: {e}")
+                errors_count += 1
 
     return {
         "enriched": enriched,
@@ -169,22 +169,22 @@ class RoundRobinScheduler:
 
     def get_queue_status(self, session: Session) -> Dict[str, Any]:
         """Retourne le statut de la queue."""
-        pending = session.exec(
+        pending = session.scalar(
             select(func.count()).select_from(EnrichmentQueue).where(
                 EnrichmentQueue.status == EnrichmentStatus.PENDING
             )
-        ).one()
-        in_progress = session.exec(
+        )
+        in_progress = session.scalar(
             select(func.count()).select_from(EnrichmentQueue).where(
                 EnrichmentQueue.status == EnrichmentStatus.IN_PROGRESS
             )
-        ).one()
+        )
         # Nombre d'utilisateurs en attente
-        user_count = session.exec(
+        user_count = session.scalar(
             select(func.count(func.distinct(EnrichmentQueue.user_id))).select_from(EnrichmentQueue).where(
                 EnrichmentQueue.status == EnrichmentStatus.PENDING
             )
-        ).one()
+        )
 
         return {
             "queue_size": pending,
@@ -196,20 +196,20 @@ class RoundRobinScheduler:
     def get_user_queue_position(self, session: Session, user_id: UUID) -> Dict[str, Any]:
         """Retourne la position d'un utilisateur dans la queue d'enrichissement."""
         # Items de cet utilisateur en attente
-        user_pending = session.exec(
+        user_pending = session.scalar(
             select(func.count()).select_from(EnrichmentQueue).where(
                 EnrichmentQueue.user_id == user_id,
                 EnrichmentQueue.status == EnrichmentStatus.PENDING,
             )
-        ).one()
+        )
 
         # Items de cet utilisateur en cours de traitement
-        user_in_progress = session.exec(
+        user_in_progress = session.scalar(
             select(func.count()).select_from(EnrichmentQueue).where(
                 EnrichmentQueue.user_id == user_id,
                 EnrichmentQueue.status == EnrichmentStatus.IN_PROGRESS,
             )
-        ).one()
+        )
 
         # Total des items PENDING avant cet utilisateur (priorite + anciennete)
         # = items d'autres utilisateurs qui seront traites avant les siens
@@ -232,28 +232,28 @@ class RoundRobinScheduler:
                 )
             ).one()
 
-            ahead_count = session.exec(
+            ahead_count = session.scalar(
                 select(func.count()).select_from(EnrichmentQueue).where(
                     EnrichmentQueue.user_id != user_id,
                     EnrichmentQueue.status == EnrichmentStatus.PENDING,
                     EnrichmentQueue.priority <= user_min_priority,
                 )
-            ).one()
+            )
 
         # Items termines/echoues de l'utilisateur (pour info)
-        user_completed = session.exec(
+        user_completed = session.scalar(
             select(func.count()).select_from(EnrichmentQueue).where(
                 EnrichmentQueue.user_id == user_id,
                 EnrichmentQueue.status == EnrichmentStatus.COMPLETED,
             )
-        ).one()
+        )
 
-        user_failed = session.exec(
+        user_failed = session.scalar(
             select(func.count()).select_from(EnrichmentQueue).where(
                 EnrichmentQueue.user_id == user_id,
                 EnrichmentQueue.status == EnrichmentStatus.FAILED,
             )
-        ).one()
+        )
 
         return {
             "user_pending": user_pending,
@@ -267,7 +267,7 @@ class RoundRobinScheduler:
     def get_pending_count(self, session: Session) -> int:
         """Retourne le nombre total d'items PENDING prets pour traitement."""
         now = datetime.utcnow()
-        return session.exec(
+        return session.scalar(
             select(func.count()).select_from(EnrichmentQueue).where(
                 EnrichmentQueue.status == EnrichmentStatus.PENDING,
                 or_(
@@ -275,12 +275,12 @@ class RoundRobinScheduler:
                     EnrichmentQueue.next_retry_at <= now,
                 ),
             )
-        ).one()
+        )
 
     def get_in_progress_count(self, session: Session) -> int:
         """Retourne le nombre d'items IN_PROGRESS."""
-        return session.exec(
+        return session.scalar(
             select(func.count()).select_from(EnrichmentQueue).where(
                 EnrichmentQueue.status == EnrichmentStatus.IN_PROGRESS
             )
-        ).one()
+        )
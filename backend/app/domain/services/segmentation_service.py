@@ -5,9 +5,11 @@ Inclut 1.2.2 (decoupage 100m), 1.2.3 (bug "null"), 1.2.4 (pace_min_per_km).
 """
 import json
 import logging
+from datetime import datetime
 from typing import Dict, Any, List, Optional
 from uuid import UUID
 
+from sqlalchemy import delete
 from sqlmodel import Session, select
 
 from app.domain.entities.activity import Activity
@@ -87,20 +89,13 @@ def segment_activity(
 
     total_distance = distance_data[-1] if distance_data else 0
 
-    # Supprimer anciens segments (re-segmentation)
-    old_segments = session.exec(
-        select(Segment).where(Segment.activity_id == activity.id)
-    ).all()
-    for seg in old_segments:
-        # Supprimer les features liees
-        old_features = session.exec(
-            select(SegmentFeatures).where(SegmentFeatures.segment_id == seg.id)
-        ).all()
-        for feat in old_features:
-            session.delete(feat)
-        session.delete(seg)
-    if old_segments:
-        session.flush()
+    # Supprimer anciens segments (re-segmentation) : deux DELETE en masse
+    # plutot qu'un chargement puis une requete de features par segment
+    old_segment_ids = select(Segment.id).where(Segment.activity_id == activity.id)
+    session.execute(
+        delete(SegmentFeatures).where(SegmentFeatures.segment_id.in_(old_segment_ids))
+    )
+    session.execute(delete(Segment).where(Segment.activity_id == activity.id))
 
     # Decoupage en segments de ~100m
     segments_created = []
@@ -221,6 +216,9 @@ def segment_activity(
             seg_start_idx = seg_end_idx
             seg_start_dist = distance_data[seg_end_idx]
 
+    # Version des segments servie en ETag par GET /segments/{activity_id}
+    activity.updated_at = datetime.utcnow()
+    session.add(activity)
     session.commit()
     logger.info(f"Activite {activity.id}: {len(segments_created)} segments crees")
     return len(segments_created)
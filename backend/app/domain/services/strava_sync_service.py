@@ -14,9 +14,14 @@ from uuid import UUID
 from app.auth.strava_oauth import strava_oauth
 from app.domain.entities.activity import Activity, ActivityCreate
 from app.domain.entities.user import StravaAuth
+from app.domain.services.auth_service import invalidate_auth_cache
 from app.domain.services.derived_features_service import recompute_training_load_from
 
 
+class StravaUnavailableError(Exception):
+    """API Strava injoignable ou en erreur (5xx, 429...) : l'appel peut etre rejoue."""
+
+
 class StravaSyncService:
     """Service de synchronisation des activités Strava"""
     
@@ -46,23 +51,7 @@ class StravaSyncService:
             strava_auth.expires_at = datetime.fromtimestamp(new_tokens.expires_at)
             strava_auth.updated_at = datetime.utcnow()
             session.commit()
-
-            # Recalculer la charge d'entrainement si de nouvelles activites ont ete ajoutees
-            if new_activities:
-                try:
-                    min_start = min(
-                        (a.start_date for a in new_activities if a.start_date),
-                        default=None,
-                    )
-                    if min_start:
-                        recompute_training_load_from(
-                            session,
-                            UUID(user_id),
-                            min_start.date(),
-                            date_type.today(),
-                        )
-                except Exception as e:
-                    logger.warning(f"Sync Strava: recalcul training load echoue: {e}")
+            invalidate_auth_cache(user_id)
             
             return new_tokens.access_token, strava_auth.strava_athlete_id
         
@@ -71,7 +60,11 @@ class StravaSyncService:
         return access_token, strava_auth.strava_athlete_id
     
     def fetch_single_activity(self, access_token: str, strava_activity_id: int) -> Optional[Dict[str, Any]]:
-        """Recupere une activite Strava par son ID."""
+        """Recupere une activite Strava par son ID.
+
+        None si l'activite n'existe pas (404) ; leve StravaUnavailableError pour
+        toute autre erreur (reseau, 5xx, 429...), que l'appelant peut rejouer.
+        """
         headers = {"Authorization": f"Bearer {access_token}"}
         try:
             response = requests.get(
@@ -85,7 +78,7 @@ class StravaSyncService:
             return response.json()
         except requests.RequestException as e:
             logger.error(f"Erreur fetch activite Strava {strava_activity_id}: {e}")
-            return None
+            raise StravaUnavailableError(str(e)) from e
 
     def fetch_strava_activities(self, access_token: str, after: Optional[datetime] = None) -> List[Dict[str, Any]]:
         """Récupère les activités Strava"""
@@ -180,9 +173,9 @@ class StravaSyncService:
         start_date_local_str = strava_activity.get("start_date_local")
         start_date_local = datetime.fromisoformat(start_date_local_str.replace("Z", "+00:00")) if start_date_local_str else None
 
-        # Coordonnées
-        start_latlng = strava_activity.get("start_latlng")
-        end_latlng = strava_activity.get("end_latlng")
+        # Coordonnées ([lat, lon] côté Strava, vide si pas de GPS)
+        start_lat, start_lon = (strava_activity.get("start_latlng") or [None, None])[:2]
+        end_lat, end_lon = (strava_activity.get("end_latlng") or [None, None])[:2]
 
         return ActivityCreate(
             name=strava_activity.get("name", "Activité sans nom"),
@@ -202,8 +195,10 @@ class StravaSyncService:
             average_pace=average_pace,
             calories=strava_activity.get("calories"),
             start_date_local=start_date_local,
-            start_latlng=start_latlng,
-            end_latlng=end_latlng,
+            start_lat=start_lat,
+            start_lon=start_lon,
+            end_lat=end_lat,
+            end_lon=end_lon,
             summary_polyline=summary_polyline,
             workout_type=strava_activity.get("workout_type"),
             trainer=strava_activity.get("trainer"),
@@ -258,7 +253,24 @@ class StravaSyncService:
                 saved_count += 1
             
             session.commit()
-            
+
+            # Recalculer la charge d'entrainement si de nouvelles activites ont ete ajoutees
+            if new_activities:
+                try:
+                    min_start = min(
+                        (a.start_date for a in new_activities if a.start_date),
+                        default=None,
+                    )
+                    if min_start:
+                        recompute_training_load_from(
+                            session,
+                            UUID(user_id),
+                            min_start.date(),
+                            date_type.today(),
+                        )
+                except Exception as e:
+                    logger.warning(f"Sync Strava: recalcul training load echoue: {e}")
+
             # Message adapté selon la période
             if days_back >= 9999:
                 period_msg = "Import complet de toutes vos activités"
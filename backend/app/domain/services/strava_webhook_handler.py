@@ -3,14 +3,24 @@ Handler pour les evenements webhook Strava.
 Traite les evenements activity.create, activity.update, activity.delete.
 """
 import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+import orjson
+import redis
+from sqlalchemy.exc import OperationalError
 from sqlmodel import Session, select
 from uuid import UUID
 
 from app.core.database import engine
+from app.core.redis import get_redis_client
 from app.core.settings import get_settings
 from app.domain.entities.activity import Activity
 from app.domain.entities.user import StravaAuth
-from app.domain.services.strava_sync_service import strava_sync_service
+from app.domain.services.strava_sync_service import StravaUnavailableError, strava_sync_service
 from app.domain.services.auto_enrichment_service import auto_enrichment_service
 from app.domain.services.derived_features_service import recompute_training_load_from
 
@@ -19,6 +29,32 @@ logger = logging.getLogger(__name__)
 
 REQUIRED_WEBHOOK_FIELDS = ("object_type", "object_id", "aspect_type", "owner_id", "subscription_id")
 
+# Reprises en cas d'echec transitoire (base ou API Strava indisponible :
+# fetch_single_activity leve StravaUnavailableError hors 404) ;
+# les handlers sont idempotents (create verifie l'existence, delete tolere
+# l'absence), un evenement peut donc etre rejoue sans risque
+WEBHOOK_MAX_ATTEMPTS = 5
+WEBHOOK_RETRY_BASE_DELAY_S = 2.0
+WEBHOOK_RETRY_MAX_DELAY_S = 60.0
+WEBHOOK_TRANSIENT_ERRORS = (StravaUnavailableError, OperationalError, redis.RedisError)
+
+# Pool dedie : les traitements webhook (et leurs attentes entre reprises) ne
+# consomment pas les threads qui servent les requetes
+_webhook_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="strava-webhook")
+
+# Regroupement des rafales : les evenements d'une meme activite recus dans
+# cette fenetre sont fusionnes en un seul traitement (un re-sync Strava
+# emet souvent plusieurs activity.update d'affilee)
+WEBHOOK_DEBOUNCE_S = 3.0
+WEBHOOK_BUFFER_TTL_S = 60
+# Marqueur "vidage programme" : pose (SET NX) par le processus qui programme
+# le vidage, il expire peu apres la fenetre ; si ce processus meurt avant de
+# vider le tampon, le prochain evenement de l'activite reprogramme le vidage
+WEBHOOK_FLUSH_MARKER_TTL_S = int(WEBHOOK_DEBOUNCE_S) + 5
+# Evenement retenu lors de la fusion : delete l'emporte sur create, qui
+# l'emporte sur update (create et update relisent l'etat courant sur Strava)
+_ASPECT_PRIORITY = {"update": 0, "create": 1, "delete": 2}
+
 
 def validate_webhook_challenge(hub_verify_token: str, hub_challenge: str) -> dict:
     """Valide le challenge Strava pour la subscription webhook.
@@ -104,8 +140,10 @@ def handle_activity_create(owner_id: int, strava_activity_id: int) -> None:
         try:
             access_token, _ = strava_sync_service.get_user_strava_tokens(session, user_id)
         except Exception as e:
+            # Le compte Strava est connu (owner_id trouve) : l'echec vient du
+            # rafraichissement du token, l'evenement sera rejoue
             logger.error(f"Webhook activity.create: erreur tokens pour user={user_id}: {e}")
-            return
+            raise StravaUnavailableError(str(e)) from e
 
         strava_data = strava_sync_service.fetch_single_activity(access_token, strava_activity_id)
         if not strava_data:
@@ -157,8 +195,10 @@ def handle_activity_update(owner_id: int, strava_activity_id: int) -> None:
         try:
             access_token, _ = strava_sync_service.get_user_strava_tokens(session, user_id)
         except Exception as e:
+            # Le compte Strava est connu (owner_id trouve) : l'echec vient du
+            # rafraichissement du token, l'evenement sera rejoue
             logger.error(f"Webhook activity.update: erreur tokens pour user={user_id}: {e}")
-            return
+            raise StravaUnavailableError(str(e)) from e
 
         strava_data = strava_sync_service.fetch_single_activity(access_token, strava_activity_id)
         if not strava_data:
@@ -230,3 +270,120 @@ def process_webhook_event(event: dict) -> None:
         handle_activity_delete(owner_id, object_id)
     else:
         logger.warning(f"Webhook: aspect_type={aspect_type} inconnu pour activity")
+
+
+def process_webhook_event_with_retry(event: dict) -> None:
+    """process_webhook_event avec reprises a backoff exponentiel (avec gigue).
+
+    Seules les erreurs transitoires (WEBHOOK_TRANSIENT_ERRORS) sont rejouees ;
+    toute autre exception est journalisee et l'evenement abandonne.
+    """
+    for attempt in range(1, WEBHOOK_MAX_ATTEMPTS + 1):
+        try:
+            process_webhook_event(event)
+            return
+        except Exception as e:
+            if not isinstance(e, WEBHOOK_TRANSIENT_ERRORS):
+                logger.exception(
+                    "Webhook: echec non transitoire, abandon (object_id=%s, aspect_type=%s): %s",
+                    event.get("object_id"), event.get("aspect_type"), e,
+                )
+                return
+            if attempt == WEBHOOK_MAX_ATTEMPTS:
+                logger.error(
+                    "Webhook: abandon apres %s tentatives (object_id=%s, aspect_type=%s): %s",
+                    attempt, event.get("object_id"), event.get("aspect_type"), e,
+                )
+                return
+            delay = min(WEBHOOK_RETRY_BASE_DELAY_S * 2 ** (attempt - 1), WEBHOOK_RETRY_MAX_DELAY_S)
+            delay *= random.uniform(0.5, 1.0)
+            logger.warning(
+                "Webhook: tentative %s/%s echouee (object_id=%s): %s, reprise dans %.1fs",
+                attempt, WEBHOOK_MAX_ATTEMPTS, event.get("object_id"), e, delay,
+            )
+            time.sleep(delay)
+
+
+def _buffer_key(object_id) -> str:
+    return f"strava:webhook:{object_id}"
+
+
+def _flush_marker_key(object_id) -> str:
+    return f"strava:webhook:{object_id}:flush"
+
+
+def merge_webhook_events(events: List[dict]) -> dict:
+    """Fusionne les evenements d'une meme activite en celui a traiter (le plus recent a priorite egale)."""
+    merged = events[0]
+    for event in events[1:]:
+        if _ASPECT_PRIORITY.get(event.get("aspect_type"), 0) >= _ASPECT_PRIORITY.get(merged.get("aspect_type"), 0):
+            merged = event
+    return merged
+
+
+def _flush_buffered_events(object_id, fallback_event: dict) -> None:
+    """Vide le tampon Redis d'une activite et soumet l'evenement fusionne au pool.
+
+    Appele par le minuteur a l'echeance de la fenetre : le tampon est lu tout
+    de suite (quelques ms), seul le traitement attend un thread libre du pool ;
+    une file d'attente chargee ne laisse donc pas expirer le tampon.
+    Le marqueur est supprime dans la meme transaction que la lecture du tampon :
+    un evenement arrive ensuite programme un nouveau vidage. Redis indisponible :
+    fallback_event (l'evenement qui a programme le vidage) est traite directement.
+    """
+    key = _buffer_key(object_id)
+    try:
+        pipe = get_redis_client().pipeline()
+        pipe.delete(_flush_marker_key(object_id))
+        pipe.lrange(key, 0, -1)
+        pipe.delete(key)
+        _, raw_events, _ = pipe.execute()
+    except redis.RedisError as e:
+        logger.error("Webhook: lecture du tampon %s impossible, traitement direct: %s", key, e)
+        _webhook_executor.submit(process_webhook_event_with_retry, fallback_event)
+        return
+    if not raw_events:
+        logger.warning(
+            "Webhook: tampon %s vide au vidage programme (expire ?), evenement perdu pour object_id=%s",
+            key, object_id,
+        )
+        return
+    events = [orjson.loads(raw) for raw in raw_events]
+    if len(events) > 1:
+        logger.info("Webhook: %s evenements fusionnes pour object_id=%s", len(events), object_id)
+    _webhook_executor.submit(process_webhook_event_with_retry, merge_webhook_events(events))
+
+
+def _schedule_flush(object_id, event: dict) -> None:
+    """Programme le vidage du tampon de l'activite apres WEBHOOK_DEBOUNCE_S."""
+    timer = threading.Timer(WEBHOOK_DEBOUNCE_S, _flush_buffered_events, args=(object_id, event))
+    timer.daemon = True
+    timer.start()
+
+
+def submit_webhook_event(event: dict) -> None:
+    """Planifie le traitement d'un evenement webhook sur le pool dedie (fire-and-forget).
+
+    Les evenements activity sont mis en tampon dans Redis ; celui qui pose le
+    marqueur de vidage programme le traitement unique de la rafale apres
+    WEBHOOK_DEBOUNCE_S. Sans Redis, l'evenement est traite immediatement.
+    """
+    if event.get("object_type") != "activity":
+        _webhook_executor.submit(process_webhook_event_with_retry, event)
+        return
+
+    object_id = event.get("object_id")
+    key = _buffer_key(object_id)
+    try:
+        pipe = get_redis_client().pipeline()
+        pipe.rpush(key, orjson.dumps(event))
+        pipe.expire(key, WEBHOOK_BUFFER_TTL_S)
+        pipe.set(_flush_marker_key(object_id), "1", nx=True, ex=WEBHOOK_FLUSH_MARKER_TTL_S)
+        _, _, scheduled = pipe.execute()
+    except redis.RedisError as e:
+        logger.warning("Webhook: tampon Redis indisponible, traitement immediat: %s", e)
+        _webhook_executor.submit(process_webhook_event_with_retry, event)
+        return
+
+    if scheduled:
+        _schedule_flush(object_id, event)
@@ -28,9 +28,35 @@ HOURLY_PARAMS = (
     "surface_pressure,precipitation,cloud_cover,weather_code"
 )
 
-# Delai entre appels (tache 2.2.3)
+# Delai entre appels (tache 2.2.3), respecte par chaque appel concurrent
 REQUEST_DELAY_S = 0.1
 
+# Appels Open-Meteo simultanes lors d'un enrichissement en masse
+WEATHER_CONCURRENCY = 8
+
+# Client HTTP partage (pool de connexions keep-alive reutilise entre les
+# appels), cree a la premiere utilisation et ferme a l'arret de l'API
+_client: Optional[httpx.AsyncClient] = None
+
+
+def get_weather_client() -> httpx.AsyncClient:
+    """Retourne le client Open-Meteo partage."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=15.0,
+            limits=httpx.Limits(max_connections=WEATHER_CONCURRENCY * 2, max_keepalive_connections=WEATHER_CONCURRENCY),
+        )
+    return _client
+
+
+async def close_weather_client() -> None:
+    """Ferme le client partage (arret de l'application)."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
 # Seuil pour choisir Historical vs Forecast (jours)
 HISTORICAL_THRESHOLD_DAYS = 5
 
@@ -182,27 +208,19 @@ async def fetch_weather_for_activity(
 
     lat, lon = gps
 
-    owns_client = client is None
-    if owns_client:
-        client = httpx.AsyncClient()
+    data = await _call_open_meteo(lat, lon, activity.start_date, client or get_weather_client())
+    if data is None:
+        return False
+
+    weather = _build_weather_from_response(data, activity)
+    if weather is None:
+        logger.warning(f"Activite {activity.id}: reponse Open-Meteo vide ou invalide")
+        return False
 
-    try:
-        data = await _call_open_meteo(lat, lon, activity.start_date, client)
-        if data is None:
-            return False
-
-        weather = _build_weather_from_response(data, activity)
-        if weather is None:
-            logger.warning(f"Activite {activity.id}: reponse Open-Meteo vide ou invalide")
-            return False
-
-        session.add(weather)
-        session.commit()
-        logger.info(f"Activite {activity.id}: meteo stockee ({weather.temperature_c}°C)")
-        return True
-    finally:
-        if owns_client:
-            await client.aclose()
+    session.add(weather)
+    session.commit()
+    logger.info(f"Activite {activity.id}: meteo stockee ({weather.temperature_c}°C)")
+    return True
 
 
 async def enrich_all_weather(
@@ -211,34 +229,48 @@ async def enrich_all_weather(
 ) -> Dict[str, Any]:
     """Enrichit toutes les activites avec GPS pas encore enrichies en meteo.
 
+    Les appels Open-Meteo partent en parallele (WEATHER_CONCURRENCY au plus)
+    sur le client partage ; les ecritures restent sur la session unique.
     Retourne un resume {processed, skipped, errors}.
     """
-    query = select(Activity).where(Activity.streams_data.is_not(None))
+    # Meteo deja presente connue des la lecture (jointure externe) plutot
+    # qu'une requete de verification par activite
+    query = (
+        select(Activity, ActivityWeather.id)
+        .outerjoin(ActivityWeather, ActivityWeather.activity_id == Activity.id)
+        .where(Activity.streams_data.is_not(None))
+    )
     if user_id:
         query = query.where(Activity.user_id == user_id)
 
-    activities = session.exec(query).all()
+    rows = session.exec(query).all()
+    pending = [activity for activity, weather_id in rows if weather_id is None]
 
     processed = 0
-    skipped = 0
+    skipped = len(rows) - len(pending)
     errors = 0
 
-    async with httpx.AsyncClient() as client:
-        for activity in activities:
-            if is_weather_fetched(session, activity.id):
-                skipped += 1
-                continue
+    client = get_weather_client()
+    semaphore = asyncio.Semaphore(WEATHER_CONCURRENCY)
+
+    async def _enrich(activity: Activity) -> None:
+        nonlocal processed, skipped, errors
+        async with semaphore:
             try:
                 ok = await fetch_weather_for_activity(session, activity, client)
                 if ok:
                     processed += 1
                 else:
                     skipped += 1
-                # Delai entre appels (tache 2.2.3)
-                await asyncio.sleep(REQUEST_DELAY_S)
             except Exception as e:
                 logger.error(f"Erreur meteo activite {activity.id}: {e}")
                 errors += 1
+            # Delai entre appels (tache 2.2.3)
+            await asyncio.sleep(REQUEST_DELAY_S)
+
+    async with asyncio.TaskGroup() as tg:
+        for activity in pending:
+            tg.create_task(_enrich(activity))
 
     return {"processed": processed, "skipped": skipped, "errors": errors}
 
@@ -11,6 +11,7 @@ from typing import Optional, List
 
 from app.domain.entities import User, WorkoutPlan, WorkoutPlanCreate, WorkoutPlanUpdate
 from app.domain.entities.workout_plan import WorkoutType
+from app.domain.errors import NotFoundError
 
 logger = logging.getLogger(__name__)
 
@@ -55,7 +56,7 @@ class WorkoutPlanService:
             )
         ).first()
         if not plan:
-            raise ValueError("Workout plan not found")
+            raise NotFoundError("Workout plan not found")
         return plan
 
     def update(
@@ -16,10 +16,12 @@ from slowapi.errors import RateLimitExceeded
 import sentry_sdk
 
 from app.core.settings import get_settings
-from app.api.routers import router, limiter
+from app.api.routers import router, limiter, ORJSONResponse
 from app.core.database import create_db_and_tables
 from app.core.redis import check_redis_health
+from app.domain.errors import DomainError, NotFoundError, ProcessingError
 from app.domain.services.auto_enrichment_service import auto_enrichment_service
+from app.domain.services.weather_service import close_weather_client
 
 settings = get_settings()
 
@@ -93,6 +95,7 @@ async def lifespan(app: FastAPI):
     # Shutdown
     auto_enrichment_service.stop_worker()
     logger.info("🛑 Worker d'enrichissement arrete")
+    await close_weather_client()
 
 app = FastAPI(
     title="AthlétIQ API",
@@ -100,7 +103,8 @@ app = FastAPI(
     version="2.0.0",
     docs_url="/docs" if settings.ENVIRONMENT != "production" else None,
     redoc_url="/redoc" if settings.ENVIRONMENT != "production" else None,
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # Rate limiting
@@ -124,6 +128,25 @@ async def _custom_rate_limit_handler(request: Request, exc: RateLimitExceeded) -
 
 app.add_exception_handler(RateLimitExceeded, _custom_rate_limit_handler)
 
+
+async def _domain_error_handler(request: Request, exc: DomainError) -> JSONResponse:
+    """Erreur metier levee par un service : 404 si introuvable, 500 si le traitement a echoue, 400 sinon.
+
+    Les autres exceptions (ValueError, RuntimeError comprises) restent des 500
+    generiques via global_exception_handler, sans exposer leur message.
+    """
+    if isinstance(exc, NotFoundError):
+        status_code = 404
+    elif isinstance(exc, ProcessingError):
+        logger.error(f"Erreur de traitement: {exc}")
+        status_code = 500
+    else:
+        status_code = 400
+    return JSONResponse(status_code=status_code, content={"detail": str(exc)})
+
+
+app.add_exception_handler(DomainError, _domain_error_handler)
+
 # Middlewares de securite en production
 if settings.ENVIRONMENT == "production":
     class HTTPSRedirectMiddleware(BaseHTTPMiddleware):
@@ -166,7 +189,7 @@ app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.ALLOWED_ORIGINS,
     allow_credentials=True,
-    allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
+    allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
     allow_headers=["*"],
     expose_headers=["*"],
 )
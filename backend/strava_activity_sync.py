@@ -249,6 +249,25 @@ def fetch_segment_details(segment_id: int, token: str) -> Dict:
 
 # --- SQLite utilitaires ----------------------------------------------------
 
+# WAL : les lectures de activity_detail.db ne sont pas bloquées pendant
+# l'ingestion ; synchronous=NORMAL suffit en WAL (pas de fsync par commit) ;
+# cache de 64 Mo, fichier mappé en mémoire (256 Mo), tables temporaires en RAM
+_DETAIL_DB_PRAGMAS = """
+PRAGMA journal_mode=WAL;
+PRAGMA synchronous=NORMAL;
+PRAGMA cache_size=-65536;
+PRAGMA mmap_size=268435456;
+PRAGMA temp_store=MEMORY;
+"""
+
+
+def connect_detail_db() -> sqlite3.Connection:
+    """Ouvre activity_detail.db avec les réglages d'ingestion."""
+    conn = sqlite3.connect(DETAIL_DB)
+    conn.executescript(_DETAIL_DB_PRAGMAS)
+    return conn
+
+
 def ensure_processed_table(conn: sqlite3.Connection) -> None:
     conn.execute(
         """
@@ -792,7 +811,7 @@ def main(max_activities: int = None) -> None:
                     logging.info(f"📥 {len(new_ids)} activité(s) à synchroniser")
                     token = get_access_token()
                     
-                    with sqlite3.connect(DETAIL_DB) as dst_conn:
+                    with connect_detail_db() as dst_conn:
                         for aid in new_ids:
                             try:
                                 process_activity_complete(aid, token, dst_conn)
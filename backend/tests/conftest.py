@@ -0,0 +1,102 @@
+"""
+Fixtures partagees des tests.
+"""
+from unittest.mock import patch
+
+import pytest
+import redis
+
+from app.core import jobs
+from app.domain.services import strava_webhook_handler
+
+
+class FakePipeline:
+    """Pipeline Redis minimal : execute les commandes en file sur FakeRedis."""
+
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.commands.append((name, args, kwargs))
+
+    def execute(self):
+        self.client._check()
+        return [getattr(self.client, name)(*args, **kwargs) for name, args, kwargs in self.commands]
+
+
+class FakeRedis:
+    """Sous-ensemble de redis.Redis utilise par l'application, en memoire.
+
+    down : toute commande leve redis.ConnectionError. clock / advance() :
+    horloge simulee pour l'expiration des cles (expire, setex, set ex=).
+    """
+
+    def __init__(self):
+        self.data = {}
+        self.deadlines = {}
+        self.clock = 0.0
+        self.down = False
+
+    def _check(self):
+        if self.down:
+            raise redis.ConnectionError("Redis down")
+
+    def advance(self, seconds: float) -> None:
+        """Fait avancer l'horloge simulee et expire les cles echues."""
+        self.clock += seconds
+        for key, deadline in list(self.deadlines.items()):
+            if deadline <= self.clock:
+                self.data.pop(key, None)
+                del self.deadlines[key]
+
+    def pipeline(self):
+        return FakePipeline(self)
+
+    def get(self, key):
+        self._check()
+        return self.data.get(key)
+
+    def setex(self, key, ttl, value):
+        return self.set(key, value, ex=ttl)
+
+    def set(self, key, value, nx=False, ex=None):
+        self._check()
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        if ex is not None:
+            self.deadlines[key] = self.clock + ex
+        return True
+
+    def delete(self, *keys):
+        self._check()
+        for key in keys:
+            self.deadlines.pop(key, None)
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    def rpush(self, key, value):
+        self._check()
+        self.data.setdefault(key, []).append(value)
+        return len(self.data[key])
+
+    def lrange(self, key, start, end):
+        self._check()
+        return list(self.data.get(key, []))
+
+    def expire(self, key, ttl):
+        self._check()
+        if key not in self.data:
+            return False
+        self.deadlines[key] = self.clock + ttl
+        return True
+
+
+@pytest.fixture
+def fake_redis():
+    """FakeRedis a la place du client partage, y compris dans les modules qui l'importent directement."""
+    client = FakeRedis()
+    with patch("app.core.redis.get_redis_client", return_value=client), \
+         patch.object(jobs, "get_redis_client", return_value=client), \
+         patch.object(strava_webhook_handler, "get_redis_client", return_value=client):
+        yield client
@@ -0,0 +1,143 @@
+"""
+Tests pour le cache des statuts OAuth et l'upsert des identifiants (auth_service).
+Couvre : invalidation par callback / refresh, is_expired recalcule, _upsert_user_auth.
+"""
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from app.auth.google_oauth import GoogleTokens, google_oauth
+from app.auth.strava_oauth import StravaTokens, strava_oauth
+from app.domain.entities import GoogleAuth, StravaAuth, User
+from app.domain.services import auth_service as auth_module
+from app.domain.services.auth_service import _upsert_user_auth, auth_service
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    SQLModel.metadata.create_all(engine, tables=[User.__table__, StravaAuth.__table__, GoogleAuth.__table__])
+    with Session(engine) as session:
+        yield session
+
+
+@pytest.fixture
+def user(session):
+    user = User(email="runner@example.com", full_name="Runner", hashed_password="x")
+    session.add(user)
+    session.commit()
+    session.refresh(user)
+    return user
+
+
+def _add_google_auth(session, user, expires_at, scope="calendar"):
+    session.add(GoogleAuth(
+        user_id=user.id,
+        google_user_id="g-1",
+        access_token_encrypted=google_oauth.encrypt_token("access"),
+        refresh_token_encrypted=google_oauth.encrypt_token("refresh"),
+        expires_at=expires_at,
+        scope=scope,
+    ))
+    session.commit()
+
+
+class TestStatusCacheInvalidation:
+
+    def test_strava_callback_invalidates_status(self, session, user, fake_redis):
+        assert auth_service.get_strava_status(session, str(user.id)) == {"connected": False}
+
+        tokens = StravaTokens(
+            access_token="access", refresh_token="refresh",
+            expires_at=int((datetime.now() + timedelta(hours=6)).timestamp()),
+            scope="read,activity:read_all", athlete_id=42,
+        )
+        with patch.object(strava_oauth, "exchange_code_for_tokens", return_value=tokens):
+            auth_service.handle_strava_callback(session, "code", str(user.id))
+
+        status = auth_service.get_strava_status(session, str(user.id))
+        assert status["connected"] is True
+        assert status["athlete_id"] == 42
+        assert status["is_expired"] is False
+
+    def test_google_refresh_invalidates_status(self, session, user, fake_redis):
+        _add_google_auth(session, user, expires_at=datetime.now() - timedelta(minutes=5))
+        assert auth_service.get_google_status(session, str(user.id))["is_expired"] is True
+
+        new_tokens = GoogleTokens(
+            access_token="new-access", refresh_token="new-refresh",
+            expires_at=int((datetime.now() + timedelta(hours=1)).timestamp()),
+            scope="calendar", google_user_id="g-1",
+        )
+        with patch.object(google_oauth, "refresh_access_token", return_value=new_tokens):
+            auth_service.refresh_google_token(session, str(user.id))
+
+        status = auth_service.get_google_status(session, str(user.id))
+        assert status["is_expired"] is False
+        assert status["expires_at"] == datetime.fromtimestamp(new_tokens.expires_at).isoformat()
+
+    def test_is_expired_recomputed_on_cache_hit(self, session, user, fake_redis):
+        expires_at = datetime.now() + timedelta(minutes=30)
+        _add_google_auth(session, user, expires_at=expires_at)
+        assert auth_service.get_google_status(session, str(user.id))["is_expired"] is False
+
+        # La ligne disparait sans invalidation : la lecture suivante vient du cache
+        session.delete(session.exec(select(GoogleAuth)).one())
+        session.commit()
+
+        class Later(datetime):
+            @classmethod
+            def now(cls, tz=None):
+                return expires_at + timedelta(minutes=1)
+
+        with patch.object(auth_module, "datetime", Later):
+            status = auth_service.get_google_status(session, str(user.id))
+
+        assert status["connected"] is True
+        assert status["is_expired"] is True
+
+    def test_status_served_without_redis(self, session, user, fake_redis):
+        fake_redis.down = True
+        assert auth_service.get_strava_status(session, str(user.id)) == {"connected": False}
+
+
+class TestUpsertUserAuth:
+
+    def _upsert(self, session, user_id, athlete_id, scope):
+        _upsert_user_auth(session, StravaAuth, user_id, insert_only={"strava_athlete_id": athlete_id}, values={
+            "access_token_encrypted": f"access-{scope}",
+            "refresh_token_encrypted": f"refresh-{scope}",
+            "expires_at": datetime(2030, 1, 1),
+            "scope": scope,
+        })
+        session.commit()
+
+    def test_inserts_missing_row(self, session, user):
+        self._upsert(session, user.id, 42, "read")
+
+        row = session.exec(select(StravaAuth)).one()
+        assert row.user_id == user.id
+        assert row.strava_athlete_id == 42
+        assert row.scope == "read"
+
+    def test_updates_existing_row_in_place(self, session, user):
+        user_id = user.id
+        self._upsert(session, user_id, 42, "read")
+        first = session.exec(select(StravaAuth)).one()
+        first_id, first_created_at = first.id, first.created_at
+        session.expunge_all()
+
+        self._upsert(session, user_id, 99, "read,activity:read_all")
+
+        rows = session.exec(select(StravaAuth)).all()
+        assert len(rows) == 1
+        row = rows[0]
+        assert row.id == first_id
+        assert row.created_at == first_created_at
+        assert row.scope == "read,activity:read_all"
+        assert row.access_token_encrypted == "access-read,activity:read_all"
+        # insert_only : ecrit a la creation seulement
+        assert row.strava_athlete_id == 42
@@ -0,0 +1,47 @@
+"""
+Tests pour la traduction des erreurs en reponses HTTP (app.main).
+Couvre : erreurs metier (app.domain.errors) et exceptions inattendues.
+"""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.domain.errors import DomainError, InvalidRequestError, NotFoundError, ProcessingError
+from app.main import _domain_error_handler, global_exception_handler
+
+
+def _client_raising(exc: Exception) -> TestClient:
+    app = FastAPI()
+    app.add_exception_handler(DomainError, _domain_error_handler)
+    app.add_exception_handler(Exception, global_exception_handler)
+
+    @app.get("/boom")
+    def boom():
+        raise exc
+
+    return TestClient(app, raise_server_exceptions=False)
+
+
+@pytest.mark.parametrize("exc, status_code", [
+    (NotFoundError("Activite non trouvee"), 404),
+    (InvalidRequestError("Cette activite n'est pas liee a Strava"), 400),
+    (ProcessingError("Echec de l'enrichissement de l'activite"), 500),
+])
+def test_domain_errors_expose_their_message(exc, status_code):
+    response = _client_raising(exc).get("/boom")
+
+    assert response.status_code == status_code
+    assert response.json() == {"detail": str(exc)}
+
+
+@pytest.mark.parametrize("exc", [
+    ValueError("badly formed hexadecimal UUID string"),
+    UnicodeDecodeError("utf-8", b"\xff", 0, 1, "invalid start byte"),
+    RuntimeError("secret internal state"),
+    NotImplementedError("secret internal state"),
+])
+def test_unexpected_errors_are_generic_500(exc):
+    response = _client_raising(exc).get("/boom")
+
+    assert response.status_code == 500
+    assert str(exc) not in response.text
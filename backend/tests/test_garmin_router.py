@@ -0,0 +1,144 @@
+"""
+Tests pour les routes Garmin.
+Couvre : mise en commun des syncs concurrentes (_coalesced), pagination de /garmin/daily.
+"""
+import asyncio
+import importlib
+from contextlib import contextmanager
+from datetime import date, timedelta
+from unittest.mock import patch
+from uuid import uuid4
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, create_engine
+
+from app.api.routers._shared import current_user_uuid
+from app.domain.entities import User
+from app.domain.entities.garmin_daily import GarminDaily
+
+# Le paquet app.api.routers reexporte l'APIRouter sous le meme nom que le module
+garmin_router = importlib.import_module("app.api.routers.garmin_router")
+
+
+@contextmanager
+def _fake_session(engine):
+    yield "own-session"
+
+
+@pytest.fixture
+def own_session():
+    with patch.object(garmin_router, "Session", _fake_session):
+        yield
+
+
+def test_concurrent_callers_share_one_sync(own_session):
+    calls = []
+
+    async def sync(session):
+        calls.append(session)
+        await asyncio.sleep(0.01)
+        return {"synced": 1}
+
+    async def scenario():
+        inflight = {}
+        user = uuid4()
+        results = await asyncio.gather(
+            garmin_router._coalesced(inflight, user, sync),
+            garmin_router._coalesced(inflight, user, sync),
+        )
+        return results, inflight
+
+    results, inflight = asyncio.run(scenario())
+
+    assert results == [{"synced": 1}, {"synced": 1}]
+    assert calls == ["own-session"]
+    assert inflight == {}
+
+
+def test_first_caller_cancellation_does_not_cancel_sync(own_session):
+    release = None
+
+    async def sync(session):
+        await release.wait()
+        return {"synced": 1}
+
+    async def scenario():
+        nonlocal release
+        release = asyncio.Event()
+        inflight = {}
+        user = uuid4()
+        first = asyncio.ensure_future(garmin_router._coalesced(inflight, user, sync))
+        await asyncio.sleep(0)
+        joined = asyncio.ensure_future(garmin_router._coalesced(inflight, user, sync))
+        await asyncio.sleep(0)
+
+        # Deconnexion du client qui a lance la sync
+        first.cancel()
+        await asyncio.sleep(0)
+        assert user in inflight
+
+        release.set()
+        return await joined, first.cancelled(), inflight
+
+    joined_result, first_cancelled, inflight = asyncio.run(scenario())
+
+    assert first_cancelled
+    assert joined_result == {"synced": 1}
+    assert inflight == {}
+
+
+# ============================================================
+# Pagination de /garmin/daily
+# ============================================================
+
+@pytest.fixture
+def daily_client():
+    """Client sur la route /garmin/daily, 5 jours de donnees en base SQLite memoire."""
+    garmin_sync_service = importlib.import_module("app.domain.services.garmin_sync_service")
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    SQLModel.metadata.create_all(engine, tables=[User.__table__, GarminDaily.__table__])
+    with Session(engine) as session:
+        user = User(email="runner@example.com", full_name="Runner", hashed_password="x")
+        session.add(user)
+        session.commit()
+        user_id = user.id
+        for offset in range(5):
+            session.add(GarminDaily(user_id=user_id, date=date(2026, 1, 1) + timedelta(days=offset)))
+        session.commit()
+
+    app = FastAPI()
+    app.include_router(garmin_router.router)
+    app.dependency_overrides[current_user_uuid] = lambda: user_id
+    with patch.object(garmin_sync_service, "engine", engine):
+        yield TestClient(app)
+
+
+def test_daily_truncated_page_returns_next_cursor(daily_client):
+    response = daily_client.get("/garmin/daily", params={"limit": 2})
+
+    assert [row["date"] for row in response.json()] == ["2026-01-05", "2026-01-04"]
+    assert response.headers["X-Next-Before"] == "2026-01-04"
+    assert "before=2026-01-04" in response.headers["Link"]
+
+
+def test_daily_cursor_walks_all_pages(daily_client):
+    dates, params = [], {"limit": 2}
+    while True:
+        response = daily_client.get("/garmin/daily", params=params)
+        dates += [row["date"] for row in response.json()]
+        if "X-Next-Before" not in response.headers:
+            break
+        params["before"] = response.headers["X-Next-Before"]
+
+    assert dates == ["2026-01-05", "2026-01-04", "2026-01-03", "2026-01-02", "2026-01-01"]
+
+
+def test_daily_complete_page_has_no_cursor(daily_client):
+    response = daily_client.get("/garmin/daily", params={"limit": 5})
+
+    assert len(response.json()) == 5
+    assert "X-Next-Before" not in response.headers
+    assert "Link" not in response.headers
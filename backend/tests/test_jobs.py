@@ -0,0 +1,112 @@
+"""
+Tests pour le suivi des travaux de fond (app.core.jobs).
+Couvre : transitions d'etat, verrou exclusif, controle du proprietaire, Redis indisponible.
+"""
+import asyncio
+
+import pytest
+
+from app.core import jobs
+
+
+USER = "user-1"
+
+
+def test_create_job_is_queued(fake_redis):
+    job = jobs.create_job(USER, "segment_all")
+
+    stored = jobs.get_job(job["task_id"], USER)
+    assert stored["status"] == "queued"
+    assert stored["kind"] == "segment_all"
+
+
+def test_run_job_succeeded(fake_redis):
+    job = jobs.create_job(USER, "segment_all")
+    seen = []
+
+    def work(value):
+        seen.append(jobs.get_job(job["task_id"], USER)["status"])
+        return {"value": value}
+
+    jobs.run_job(job, work, 3)
+
+    assert seen == ["running"]
+    stored = jobs.get_job(job["task_id"], USER)
+    assert stored["status"] == "succeeded"
+    assert stored["result"] == {"value": 3}
+
+
+def test_run_job_failed(fake_redis):
+    job = jobs.create_job(USER, "segment_all")
+
+    def work():
+        raise ValueError("boom")
+
+    jobs.run_job(job, work)
+
+    stored = jobs.get_job(job["task_id"], USER)
+    assert stored["status"] == "failed"
+    assert stored["error"] == "boom"
+
+
+def test_run_job_async_succeeded(fake_redis):
+    job = jobs.create_job(USER, "weather_enrich")
+
+    async def work():
+        return {"enriched": 2}
+
+    asyncio.run(jobs.run_job_async(job, work))
+
+    stored = jobs.get_job(job["task_id"], USER)
+    assert stored["status"] == "succeeded"
+    assert stored["result"] == {"enriched": 2}
+
+
+def test_get_job_checks_owner(fake_redis):
+    job = jobs.create_job(USER, "segment_all")
+
+    assert jobs.get_job(job["task_id"], "other-user") is None
+    assert jobs.get_job("unknown", USER) is None
+
+
+def test_exclusive_job_rejects_second_run(fake_redis):
+    assert jobs.create_exclusive_job(USER, "features_compute") is not None
+    assert jobs.create_exclusive_job(USER, "features_compute") is None
+    # Le verrou est par utilisateur et par type de travail
+    assert jobs.create_exclusive_job("user-2", "features_compute") is not None
+    assert jobs.create_exclusive_job(USER, "segment_all") is not None
+
+
+@pytest.mark.parametrize("fails", [False, True])
+def test_exclusive_lock_released_after_run(fake_redis, fails):
+    job = jobs.create_exclusive_job(USER, "features_compute")
+
+    def work():
+        if fails:
+            raise RuntimeError("boom")
+        return {}
+
+    jobs.run_job(job, work)
+
+    assert jobs.create_exclusive_job(USER, "features_compute") is not None
+
+
+def test_exclusive_lock_released_after_async_failure(fake_redis):
+    job = jobs.create_exclusive_job(USER, "weather_enrich")
+
+    async def work():
+        raise RuntimeError("boom")
+
+    asyncio.run(jobs.run_job_async(job, work))
+
+    assert jobs.get_job(job["task_id"], USER)["status"] == "failed"
+    assert jobs.create_exclusive_job(USER, "weather_enrich") is not None
+
+
+def test_create_job_raises_when_redis_down(fake_redis):
+    fake_redis.down = True
+
+    with pytest.raises(jobs.JobStoreUnavailableError):
+        jobs.create_job(USER, "segment_all")
+    with pytest.raises(jobs.JobStoreUnavailableError):
+        jobs.create_exclusive_job(USER, "segment_all")
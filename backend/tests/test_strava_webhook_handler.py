@@ -0,0 +1,181 @@
+"""
+Tests pour le traitement des webhooks Strava.
+Couvre : reprises de process_webhook_event_with_retry selon la reponse Strava,
+merge_webhook_events, mise en tampon et vidage des rafales (submit_webhook_event).
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+from sqlalchemy.exc import OperationalError
+
+from app.domain.services import strava_webhook_handler as handler
+from app.domain.services.strava_webhook_handler import merge_webhook_events
+from app.domain.services.strava_sync_service import strava_sync_service
+
+
+def _strava_response(status_code: int) -> MagicMock:
+    """Reponse requests simulee de l'API Strava."""
+    response = MagicMock(status_code=status_code)
+    if status_code >= 400:
+        response.raise_for_status.side_effect = requests.HTTPError(f"{status_code} Error")
+    return response
+
+
+@pytest.fixture
+def webhook_env():
+    """Proprietaire connu, activite absente de la base, token valide, sans attente entre reprises."""
+    with patch.object(handler, "_get_user_id_by_strava_athlete", return_value="00000000-0000-0000-0000-000000000001"), \
+         patch.object(handler, "_get_activity_by_strava_id", return_value=None), \
+         patch.object(strava_sync_service, "get_user_strava_tokens", return_value=("token", 42)), \
+         patch.object(handler.time, "sleep") as sleep:
+        yield sleep
+
+
+CREATE_EVENT = {"object_type": "activity", "aspect_type": "create", "object_id": 123, "owner_id": 42}
+
+
+def test_strava_503_is_retried(webhook_env):
+    with patch("app.domain.services.strava_sync_service.requests.get", return_value=_strava_response(503)) as get:
+        handler.process_webhook_event_with_retry(CREATE_EVENT)
+
+    assert get.call_count == handler.WEBHOOK_MAX_ATTEMPTS
+    assert webhook_env.call_count == handler.WEBHOOK_MAX_ATTEMPTS - 1
+
+
+def test_strava_404_is_not_retried(webhook_env):
+    with patch("app.domain.services.strava_sync_service.requests.get", return_value=_strava_response(404)) as get:
+        handler.process_webhook_event_with_retry(CREATE_EVENT)
+
+    assert get.call_count == 1
+    webhook_env.assert_not_called()
+
+
+
+def test_non_transient_error_is_attempted_once(webhook_env):
+    with patch.object(handler, "handle_activity_create", side_effect=KeyError("id")) as create:
+        handler.process_webhook_event_with_retry(CREATE_EVENT)
+
+    create.assert_called_once_with(42, 123)
+    webhook_env.assert_not_called()
+
+
+def test_transient_db_error_is_retried(webhook_env):
+    error = OperationalError("SELECT 1", {}, Exception("server closed the connection"))
+    with patch.object(handler, "handle_activity_create", side_effect=[error, None]) as create:
+        handler.process_webhook_event_with_retry(CREATE_EVENT)
+
+    assert create.call_count == 2
+    webhook_env.assert_called_once()
+
+# ============================================================
+# Regroupement des rafales
+# ============================================================
+
+def _event(aspect_type: str, object_id: int = 123) -> dict:
+    return {"object_type": "activity", "aspect_type": aspect_type, "object_id": object_id, "owner_id": 42}
+
+
+class TestMergeWebhookEvents:
+
+    def test_single_event(self):
+        assert merge_webhook_events([_event("update")]) == _event("update")
+
+    def test_delete_wins_over_create_and_update(self):
+        events = [_event("create"), _event("delete"), _event("update")]
+        assert merge_webhook_events(events)["aspect_type"] == "delete"
+
+    def test_create_wins_over_update(self):
+        events = [_event("update"), _event("create"), _event("update")]
+        assert merge_webhook_events(events)["aspect_type"] == "create"
+
+    def test_latest_wins_at_equal_priority(self):
+        first = {**_event("update"), "updates": {"title": "a"}}
+        last = {**_event("update"), "updates": {"title": "b"}}
+        assert merge_webhook_events([first, last]) is last
+
+
+class TestWebhookBuffer:
+
+    def test_burst_schedules_a_single_flush(self, fake_redis):
+        with patch.object(handler, "_schedule_flush") as schedule:
+            handler.submit_webhook_event(_event("update"))
+            handler.submit_webhook_event(_event("update"))
+            handler.submit_webhook_event(_event("create"))
+
+        schedule.assert_called_once_with(123, _event("update"))
+        assert len(fake_redis.data[handler._buffer_key(123)]) == 3
+
+    def test_lapsed_marker_is_rescheduled_by_next_event(self, fake_redis):
+        with patch.object(handler, "_schedule_flush") as schedule:
+            handler.submit_webhook_event(_event("update"))
+            # Le processus qui avait programme le vidage est mort : le marqueur expire
+            fake_redis.delete(handler._flush_marker_key(123))
+            handler.submit_webhook_event(_event("create"))
+
+        assert schedule.call_count == 2
+        assert len(fake_redis.data[handler._buffer_key(123)]) == 2
+
+    def test_flush_submits_merged_event_and_clears_buffer(self, fake_redis):
+        with patch.object(handler, "_schedule_flush"):
+            handler.submit_webhook_event(_event("update"))
+            handler.submit_webhook_event(_event("delete"))
+
+        with patch.object(handler, "_webhook_executor") as executor:
+            handler._flush_buffered_events(123, _event("update"))
+
+        executor.submit.assert_called_once_with(handler.process_webhook_event_with_retry, _event("delete"))
+        assert handler._buffer_key(123) not in fake_redis.data
+        assert handler._flush_marker_key(123) not in fake_redis.data
+
+    def test_event_after_flush_schedules_new_flush(self, fake_redis):
+        with patch.object(handler, "_schedule_flush") as schedule, \
+             patch.object(handler, "_webhook_executor"):
+            handler.submit_webhook_event(_event("update"))
+            handler._flush_buffered_events(123, _event("update"))
+            handler.submit_webhook_event(_event("update"))
+
+        assert schedule.call_count == 2
+
+    def test_flush_with_empty_buffer_logs_warning(self, fake_redis, caplog):
+        with patch.object(handler, "_webhook_executor") as executor:
+            handler._flush_buffered_events(123, _event("update"))
+
+        executor.submit.assert_not_called()
+        assert any(record.levelname == "WARNING" and "vide" in record.message for record in caplog.records)
+
+    def test_flush_delayed_past_buffer_ttl_keeps_events(self, fake_redis):
+        # Pool occupe (reprises en cours) : le traitement attend bien apres
+        # l'expiration du tampon, mais celui-ci a ete lu a l'echeance du minuteur
+        release = threading.Event()
+        processed = []
+        executor = ThreadPoolExecutor(max_workers=1)
+        executor.submit(release.wait)
+        with patch.object(handler, "_webhook_executor", executor), \
+             patch.object(handler, "_schedule_flush"), \
+             patch.object(handler, "process_webhook_event_with_retry", side_effect=processed.append):
+            handler.submit_webhook_event(_event("update"))
+            handler.submit_webhook_event(_event("delete"))
+            handler._flush_buffered_events(123, _event("update"))
+
+            fake_redis.advance(handler.WEBHOOK_BUFFER_TTL_S + 1)
+            release.set()
+            executor.shutdown(wait=True)
+
+        assert processed == [_event("delete")]
+
+    def test_flush_submits_event_directly_when_redis_fails(self, fake_redis):
+        fake_redis.down = True
+        with patch.object(handler, "_webhook_executor") as executor:
+            handler._flush_buffered_events(123, _event("create"))
+
+        executor.submit.assert_called_once_with(handler.process_webhook_event_with_retry, _event("create"))
+
+    def test_submit_processes_event_directly_when_redis_fails(self, fake_redis):
+        fake_redis.down = True
+        with patch.object(handler, "_webhook_executor") as executor:
+            handler.submit_webhook_event(_event("update"))
+
+        executor.submit.assert_called_once_with(handler.process_webhook_event_with_retry, _event("update"))
@@ -52,9 +52,6 @@ export default function ActivityTypeEditor({ activity, onSave, onCancel }: Activ
 
     try {
       // Appeler l'API pour mettre à jour le type d'activité
-      const formData = new FormData()
-      formData.append('activity_type', selectedType)
-      
       // Utiliser l'API URL complète
       const VITE_API_URL = (import.meta as any).env?.VITE_API_URL
       const apiUrl = VITE_API_URL ? `${VITE_API_URL}/api/v1` : '/api/v1'
@@ -62,7 +59,8 @@ export default function ActivityTypeEditor({ activity, onSave, onCancel }: Activ
       const response = await fetch(`${apiUrl}/activities/${activity.id}/type`, {
         method: 'PATCH',
         credentials: 'include',
-        body: formData
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ activity_type: selectedType })
       })
 
       if (!response.ok) {
@@ -498,9 +498,7 @@ class ActivityService {
   }
 
   async updateActivityType(activityId: string, activityType: string): Promise<any> {
-    const formData = new FormData()
-    formData.append('activity_type', activityType)
-    const response = await this.api.patch(`/activities/${activityId}/type`, formData)
+    const response = await this.api.patch(`/activities/${activityId}/type`, { activity_type: activityType })
     return response.data
   }
 